@@ -0,0 +1,58 @@
+"""
+Benchmark Nepali digit conversion on 1M mixed Devanagari/ASCII cells.
+
+Compares the per-cell str.replace loop with the translation-table cell
+function and the column-wise Series conversion.
+
+Usage: python benchmarks/bench_nepali_digits.py [n_cells]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_pipeline.core.utils import convert_nepali_to_english, convert_nepali_series
+from data_pipeline.darta.config import NEPALI_TO_ENGLISH_DIGITS
+
+
+def replace_loop(text, digit_map):
+    """Previous implementation: one str.replace per digit."""
+    if pd.isna(text):
+        return text
+    text_str = str(text)
+    for nepali, english in digit_map.items():
+        text_str = text_str.replace(nepali, english)
+    return text_str
+
+
+def make_cells(n: int) -> pd.Series:
+    rng = np.random.default_rng(0)
+    samples = np.array(['११०११९-०६९-०७२', '९८४१२३४५६७', '2079/05/12', '२०७९-०५-१२',
+                        '01-4412345', '008/073-74', 'abc १२ def'], dtype=object)
+    cells = pd.Series(samples[rng.integers(0, len(samples), n)])
+    cells[rng.random(n) < 0.05] = None
+    return cells
+
+
+def timed(label: str, fn) -> pd.Series:
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cells = make_cells(n)
+    print(f"{n:,} cells")
+
+    baseline = timed("per-cell str.replace", lambda: cells.apply(replace_loop, args=(NEPALI_TO_ENGLISH_DIGITS,)))
+    per_cell = timed("per-cell translate", lambda: cells.apply(convert_nepali_to_english,
+                                                                args=(NEPALI_TO_ENGLISH_DIGITS,)))
+    column = timed("column translate", lambda: convert_nepali_series(cells, NEPALI_TO_ENGLISH_DIGITS))
+
+    assert baseline.equals(per_cell) and baseline.equals(column), "results differ"
@@ -0,0 +1,64 @@
+"""
+Benchmark trade.query latency on a large columnar history mirror.
+
+Writes the columnar mirror of a synthetic clustered history (N rows over
+12 fiscal years) and times a few selective queries against it, cold (first
+touch of the memory-mapped slice) and warm.
+
+Usage: python benchmarks/bench_query.py [n_rows]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_pipeline.trade.columnar import write_columns
+from data_pipeline.trade.history_index import cluster_history
+from data_pipeline.trade.query import query
+
+
+def make_history(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    countries = np.array(['IN', 'CN', 'US', 'DE', 'JP', 'AE', 'TH', 'BD', 'KR', 'FR'])
+    return pd.DataFrame({
+        'Year': rng.integers(2070, 2082, n),
+        'Month': rng.integers(1, 13, n),
+        'Direction': pd.Categorical(rng.choice(['I', 'E'], n)),
+        'HS_Code': rng.integers(1_000_000, 99_999_999, n),
+        'Country': pd.Categorical(countries[rng.integers(0, len(countries), n)]),
+        'Value': rng.random(n) * 1000,
+        'Quantity': rng.random(n) * 10,
+        'Unit': pd.Categorical(rng.choice(['kg', 'pcs'], n)),
+        'Revenue': rng.random(n),
+    })
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 6_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'done.csv'
+        csv_path.write_text('placeholder\n')
+
+        start = time.perf_counter()
+        write_columns(cluster_history(make_history(n)), csv_path)
+        print(f"mirror of {n:,} rows written in {time.perf_counter() - start:.1f}s")
+
+        cases = {
+            "HS 8703 from CN, FY 2080 m4-9": dict(years=2080, months=range(4, 10), direction='I',
+                                                 hs_prefix='8703', countries='CN'),
+            "chapter 84 imports, FY 2081": dict(years=2081, direction='I', hs_prefix='84'),
+            "CN by month, FY 2079": dict(years=2079, countries='CN', group_by=['Month']),
+        }
+        query(csv_path, years=2081, hs_prefix='01')  # open the mirror once
+        for label, kwargs in cases.items():
+            timings = []
+            for _ in range(2):  # first call pages the slice in, second is warm
+                start = time.perf_counter()
+                result = query(csv_path, **kwargs)
+                timings.append(1000 * (time.perf_counter() - start))
+            print(f"{label:<32} {len(result):>9,} rows  cold {timings[0]:7.1f} ms  warm {timings[1]:7.1f} ms")
@@ -0,0 +1,77 @@
+"""
+Benchmark a full fiscal year of monthly differencing: pandas vs sparse engine.
+
+Builds twelve growing import/export cumulatives over the same HS x Country
+keys, then compares the month-by-month calculate_monthly_combined /
+advance_cumulative loop (what backfill runs) with one
+difference_fiscal_year call, and checks both produce the same records.
+
+Usage: python benchmarks/bench_sparse_engine.py [n_keys]
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_pipeline.trade.calculator import (
+    calculate_previous_cumulatives,
+    calculate_monthly_combined,
+    advance_cumulative
+)
+from data_pipeline.trade.sparse_engine import difference_fiscal_year
+from bench_monthly_values import timed
+
+FISCAL_MONTHS = [4, 5, 6, 7, 8, 9, 10, 11, 12, 1, 2, 3]
+
+
+def make_year(n: int):
+    """{month: {'import': df, 'export': df}} with non-decreasing cumulatives."""
+    rng = np.random.default_rng(0)
+    countries = np.array(['IN', 'CN', 'US', 'DE', 'JP', 'AE', 'TH', 'BD'])
+    year = {}
+    for trade_type, scale in (('import', 1.0), ('export', 0.3)):
+        keys = pd.DataFrame({
+            'HS_Code': pd.Series(rng.integers(1_000_000, 99_999_999, int(n * scale))).astype(str),
+            'Country': countries[rng.integers(0, len(countries), int(n * scale))],
+        }).drop_duplicates()
+        flows = rng.random((12, len(keys))) < 0.4
+        values = np.cumsum(flows * rng.integers(1, 10_000, (12, len(keys))), axis=0)
+        quantities = np.cumsum(flows * rng.integers(1, 500, (12, len(keys))), axis=0)
+
+        for i, month in enumerate(FISCAL_MONTHS):
+            seen = values[i] > 0
+            frame = keys[seen].assign(Value=values[i][seen].astype(float),
+                                      Quantity=quantities[i][seen].astype(float), Unit='kg')
+            if trade_type == 'import':
+                frame['Revenue'] = frame['Value'] * 0.1
+            year.setdefault(month, {})[trade_type] = frame.reset_index(drop=True)
+    return year
+
+
+def pandas_year(year_frames):
+    running = calculate_previous_cumulatives(pd.DataFrame(columns=['Direction']))
+    months = []
+    for month in FISCAL_MONTHS:
+        monthly = calculate_monthly_combined(year_frames[month], running, 2082, month)
+        running = {t: advance_cumulative(running[t], monthly, t) for t in running}
+        months.append(monthly)
+    return pd.concat(months, ignore_index=True)
+
+
+def canonical(df):
+    return df.sort_values(['Month', 'Direction', 'HS_Code', 'Country']).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    year_frames = make_year(n)
+    print(f"{sum(len(df) for m in year_frames.values() for df in m.values()):,} cumulative rows over 12 months")
+
+    expected = timed("pandas month loop", lambda: pandas_year(year_frames))
+    empty = calculate_previous_cumulatives(pd.DataFrame(columns=['Direction']))
+    result = timed("sparse fiscal year", lambda: difference_fiscal_year(year_frames, empty, 2082))
+
+    pd.testing.assert_frame_equal(canonical(result), canonical(expected), check_dtype=False)
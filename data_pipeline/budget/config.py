@@ -1,5 +1,7 @@
 """Budget-specific configuration constants."""
 
+import re
+
 STANDARD_COLUMNS = [
     "Year", "Project_Code", "Sub_Project_Code", "Economic_Code",
     "District_Code", "Component_Code", "Donor_Code", 
@@ -25,3 +27,16 @@ SHEET_PATTERNS = {
     "province": ["province", "Province", "PROVINCE", "provience"],
     "local": ["local", "Local", "LOCAL"]
 }
+
+GOVERNMENT_LEVEL_KEYWORDS = {
+    'Federal': ['federal', 'फेडरल', 'federel', 'fedarel'],
+    'Province': ['province', 'प्रदेश', 'provience', 'provine', 'provinc'],
+    'Local': ['local', 'स्थानीय', 'lokal', 'lokl']
+}
+
+BUDGET_HEADER_SIGNATURE = {
+    'fields': {name: rf'^{re.escape(source.lower())}$' for source, name in COLUMN_MAPPING.items()},
+    'required': ['Year'],
+}
+
+HEADER_SCAN_ROWS = 10
@@ -6,35 +6,37 @@ from pathlib import Path
 from typing import List
 
 from ..core.io import BaseExcelReader
-from ..core.utils import extract_fiscal_year, clean_year_value, standardize_column_names, fuzzy_string_match
-from .config import STANDARD_COLUMNS, COLUMN_MAPPING, COLUMNS_TO_REMOVE, SHEET_PATTERNS
+from ..core.utils import (
+    extract_fiscal_year, clean_year_value, standardize_column_names, FuzzyMatcher,
+    detect_header_row, frame_from_header_row, apply_unique, persistent_memo, mapping_version
+)
+from .config import (
+    STANDARD_COLUMNS, COLUMN_MAPPING, COLUMNS_TO_REMOVE, SHEET_PATTERNS, GOVERNMENT_LEVEL_KEYWORDS,
+    BUDGET_HEADER_SIGNATURE, HEADER_SCAN_ROWS
+)
 
 logger = logging.getLogger(__name__)
 
 
+_LEVEL_MATCHER = FuzzyMatcher({
+    term: level for level, terms in GOVERNMENT_LEVEL_KEYWORDS.items() for term in terms
+})
+
+
+@persistent_memo(version=lambda: mapping_version(GOVERNMENT_LEVEL_KEYWORDS))
 def get_government_level(sheet_name: str) -> str:
     """Determine government level from sheet name using fuzzy matching."""
     sheet_clean = sheet_name.lower().strip()
     
-    keywords = {
-        'Federal': ['federal', 'फेडरल', 'federel', 'fedarel'],
-        'Province': ['province', 'प्रदेश', 'provience', 'provine', 'provinc'],
-        'Local': ['local', 'स्थानीय', 'lokal', 'lokl']
-    }
-    
-    best_match = 'Unknown'
-    best_ratio = 0.6
+    for level, terms in GOVERNMENT_LEVEL_KEYWORDS.items():
+        if any(term in sheet_clean for term in terms):
+            return level
     
-    for level, terms in keywords.items():
-        for term in terms:
-            if term in sheet_clean:
-                return level
-            ratio = fuzzy_string_match(term, sheet_clean)
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_match = level
+    matches = _LEVEL_MATCHER.search(sheet_clean, threshold=0.6, limit=1)
+    if matches and matches[0][2] > 0.6:
+        return matches[0][1]
     
-    return best_match
+    return 'Unknown'
 
 
 class BudgetExcelReader(BaseExcelReader):
@@ -64,7 +66,9 @@ class BudgetExcelReader(BaseExcelReader):
         all_data = []
         for sheet in sheet_names:
             try:
-                df = self.read_sheet(sheet, skip_rows=0, header=0)
+                raw = self.xl_file.parse(sheet, header=None)
+                header_row, _ = detect_header_row(raw.head(HEADER_SCAN_ROWS), BUDGET_HEADER_SIGNATURE)
+                df = frame_from_header_row(raw, raw.index[0] if header_row is None else header_row)
                 df = standardize_column_names(df)
                 
                 for col in COLUMNS_TO_REMOVE + [c for c in df.columns if "SUBSTR" in str(c).upper()]:
@@ -85,7 +89,7 @@ class BudgetExcelReader(BaseExcelReader):
             raise ValueError(f"No data extracted from {self.excel_path.name}")
         
         combined = pd.concat(all_data, ignore_index=True)
-        combined["BUD_YEAR"] = combined["BUD_YEAR"].apply(clean_year_value)
+        combined["BUD_YEAR"] = apply_unique(combined["BUD_YEAR"], clean_year_value)
         combined = combined.rename(columns=COLUMN_MAPPING)
         
         available_cols = [col for col in STANDARD_COLUMNS if col in combined.columns]
@@ -5,7 +5,7 @@ import logging
 from pathlib import Path
 
 from ..core.io import read_csv, merge_with_base
-from ..core.utils import clean_year_value
+from ..core.utils import clean_year_value, apply_unique
 from .excel_reader import extract_budget_data
 from .config import STANDARD_COLUMNS
 
@@ -26,7 +26,7 @@ def load_csv(csv_path: Path) -> pd.DataFrame:
 def standardize_data(df: pd.DataFrame) -> pd.DataFrame:
     """Standardize CSV data."""
     if 'Year' in df.columns:
-        df['Year'] = df['Year'].apply(clean_year_value)
+        df['Year'] = apply_unique(df['Year'], clean_year_value)
     
     df = df.dropna(how='all')
     available_cols = [col for col in STANDARD_COLUMNS if col in df.columns]
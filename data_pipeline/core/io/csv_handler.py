@@ -8,11 +8,11 @@ from typing import Optional
 logger = logging.getLogger(__name__)
 
 
-def read_csv(csv_path: Path, encoding: str = 'utf-8-sig') -> pd.DataFrame:
+def read_csv(csv_path: Path, encoding: str = 'utf-8-sig', dtype: Optional[dict] = None) -> pd.DataFrame:
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
     
-    df = pd.read_csv(csv_path, encoding=encoding)
+    df = pd.read_csv(csv_path, encoding=encoding, dtype=dtype)
     logger.info(f"Read {csv_path.name}: {len(df):,} records")
     
     return df
@@ -10,18 +10,31 @@ from .data_utils import (
     get_file_type,
     fuzzy_string_match,
     convert_nepali_to_english,
+    convert_nepali_series,
+    make_translation_table,
 )
 
 from .column_matcher import find_column
+from .fuzzy_matcher import FuzzyMatcher
+from .header_detector import (
+    detect_header_row,
+    header_row_mask,
+    frame_from_header_row
+)
 from .logging_config import setup_logging, get_logger
+from .persistent_cache import persistent_memo, mapping_version, get_memo_store
 
 from .functional_utils import (
     pipe,
     compose,
     with_column,
+    FilterExpr,
     create_filter,
     combine_filters,
-    filter_by_column
+    filter_by_column,
+    all_of,
+    any_of,
+    negate
 )
 
 from .dataframe_transforms import (
@@ -32,7 +45,10 @@ from .dataframe_transforms import (
     add_composite_key,
     remove_nulls,
     remove_rows_containing,
-    apply_to_column
+    apply_unique,
+    apply_to_column,
+    map_column,
+    drop_matching_keys
 )
 
 __all__ = [
@@ -43,17 +59,30 @@ __all__ = [
     'find_data_start_row',
     'find_target_sheet',
     'find_column',
+    'FuzzyMatcher',
+    'detect_header_row',
+    'header_row_mask',
+    'frame_from_header_row',
     'get_file_type',
     'fuzzy_string_match',
     'convert_nepali_to_english',
+    'convert_nepali_series',
+    'make_translation_table',
     'setup_logging',
     'get_logger',
+    'persistent_memo',
+    'mapping_version',
+    'get_memo_store',
     'pipe',
     'compose',
     'with_column',
+    'FilterExpr',
     'create_filter',
     'combine_filters',
     'filter_by_column',
+    'all_of',
+    'any_of',
+    'negate',
     'to_numeric_safe',
     'clean_numerics',
     'clean_hs_codes_fn',
@@ -61,5 +90,8 @@ __all__ = [
     'add_composite_key',
     'remove_nulls',
     'remove_rows_containing',
-    'apply_to_column'
+    'apply_unique',
+    'apply_to_column',
+    'map_column',
+    'drop_matching_keys'
 ]
\ No newline at end of file
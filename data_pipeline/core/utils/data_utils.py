@@ -1,13 +1,21 @@
 """Shared data utilities."""
 
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+_TRANSLATION_TABLES: Dict[int, Tuple[dict, dict, bool]] = {}
+
+# Longer cells are converted with str.translate instead of widening the matrix
+NEPALI_MATRIX_MAX_WIDTH = 256
+# Code points per matrix chunk (4 bytes each)
+NEPALI_MATRIX_CHUNK_CELLS = 1 << 22
+
 
 def extract_fiscal_year(filename: str) -> Optional[str]:
     """Extract fiscal year from filename."""
@@ -56,12 +64,13 @@ def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
 
 def find_data_start_row(df_sample: pd.DataFrame) -> int:
     """Find row where data headers start in Excel."""
-    for row_idx, row in df_sample.iterrows():
-        row_str = ' '.join(str(val).lower() for val in row)
-        row_str = row_str.replace('_', '').replace(' ', '')
-        if 'hscode' in row_str or 'code' in row_str:
-            return row_idx
-    return 0
+    if df_sample.empty:
+        return 0
+    cells = df_sample.apply(
+        lambda col: col.astype(str).str.lower().str.replace('_', '', regex=False).str.replace(' ', '', regex=False)
+    )
+    is_header = cells.apply(lambda col: col.str.contains('code', regex=False)).any(axis=1)
+    return is_header.idxmax() if is_header.any() else 0
 
 
 def find_target_sheet(sheet_names: list, keywords: list) -> Optional[str]:
@@ -90,12 +99,79 @@ def fuzzy_string_match(text1: str, text2: str) -> float:
     return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
 
+def _compiled_table(char_map: dict) -> Tuple[dict, dict, bool]:
+    cached = _TRANSLATION_TABLES.get(id(char_map))
+    if cached is None or cached[0] is not char_map:
+        ascii_passthrough = not any(key.isascii() for key in char_map)
+        cached = (char_map, str.maketrans(char_map), ascii_passthrough)
+        _TRANSLATION_TABLES[id(char_map)] = cached
+    return cached
+
+
+def make_translation_table(char_map: dict) -> dict:
+    """Compile a single-character mapping into a str.translate table (cached per mapping)."""
+    return _compiled_table(char_map)[1]
+
+
 def convert_nepali_to_english(text: str, digit_map: dict) -> str:
     """Convert Nepali numerals to English using provided mapping."""
     if pd.isna(text):
         return text
     
+    _, table, ascii_passthrough = _compiled_table(digit_map)
     text_str = str(text)
-    for nepali, english in digit_map.items():
-        text_str = text_str.replace(nepali, english)
-    return text_str
+    if ascii_passthrough and text_str.isascii():
+        return text_str
+    return text_str.translate(table)
+
+
+def _translate_matrix(text: list, source: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """Substitute mapped code points of strings laid out as a UCS-4 matrix."""
+    array = np.array(text, dtype=str)
+    width = max(array.dtype.itemsize // 4, 1)
+    codes = array.astype(f'<U{width}').view(np.uint32).reshape(len(array), width)
+    
+    position = np.minimum(np.searchsorted(source, codes), len(source) - 1)
+    hit = source[position] == codes
+    codes[hit] = target[position[hit]]
+    return codes.reshape(-1).view(f'<U{width}').astype(object)
+
+
+def convert_nepali_series(series: pd.Series, digit_map: dict) -> pd.Series:
+    """Convert Nepali numerals across a whole Series in vectorized passes.
+    
+    Values are laid out as fixed-width UCS-4 code point matrices and every
+    mapped character is substituted at once; nulls are kept as-is. Rows are
+    processed in chunks of about NEPALI_MATRIX_CHUNK_CELLS code points, and
+    cells longer than NEPALI_MATRIX_MAX_WIDTH go through str.translate, so
+    one long cell does not widen the matrix for the whole column.
+    """
+    notna = series.notna().to_numpy()
+    if not notna.any():
+        return series.copy()
+    
+    text = pd.Series(series.to_numpy()[notna]).astype(str)
+    lengths = text.str.len().to_numpy()
+    converted = np.empty(len(text), dtype=object)
+    
+    long = lengths > NEPALI_MATRIX_MAX_WIDTH
+    if long.any():
+        table = make_translation_table(digit_map)
+        converted[long] = [value.translate(table) for value in text[long]]
+    
+    source = np.array([ord(k) for k in digit_map], dtype=np.uint32)
+    target = np.array([ord(v) for v in digit_map.values()], dtype=np.uint32)
+    order = np.argsort(source)
+    source, target = source[order], target[order]
+    
+    short = np.flatnonzero(~long)
+    if len(short):
+        rows = max(NEPALI_MATRIX_CHUNK_CELLS // max(int(lengths[short].max()), 1), 1)
+        values = text.to_numpy()
+        for start in range(0, len(short), rows):
+            chunk = short[start:start + rows]
+            converted[chunk] = _translate_matrix(values[chunk].tolist(), source, target)
+    
+    result = series.to_numpy(dtype=object, copy=True)
+    result[notna] = converted
+    return pd.Series(result, index=series.index, name=series.name)
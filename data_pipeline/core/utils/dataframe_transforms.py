@@ -1,9 +1,13 @@
 """Composable DataFrame transformation functions."""
 
+import numpy as np
 import pandas as pd
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
 from .functional_utils import with_column, apply_if_exists
 
+PARALLEL_MIN_UNIQUES = 1_000
+
 
 def to_numeric_safe(series: pd.Series) -> pd.Series:
     """Convert to numeric with error handling."""
@@ -26,7 +30,7 @@ def clean_hs_codes_fn(df: pd.DataFrame) -> pd.DataFrame:
     return with_column(
         df, 
         'HS_Code',
-        lambda s: s.astype(str).str.strip().str.replace('.0', '', regex=False)
+        lambda s: s.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
     )
 
 
@@ -45,7 +49,8 @@ def add_composite_key(*columns: str) -> Callable:
     """Returns function that creates composite key from columns."""
     def transform(df: pd.DataFrame) -> pd.DataFrame:
         result = df.copy()
-        result['_key'] = result[list(columns)].astype(str).agg('|'.join, axis=1)
+        parts = [result[col].astype(str) for col in columns]
+        result['_key'] = parts[0].str.cat(parts[1:], sep='|') if parts[1:] else parts[0]
         return result
     return transform
 
@@ -72,12 +77,67 @@ def remove_rows_containing(column: str, substring: str) -> Callable:
     return transform
 
 
-def apply_to_column(column: str, func: Callable) -> Callable:
-    """Returns function that applies func to each element in specific column."""
+def apply_unique(series: pd.Series, func: Callable, processes: Optional[int] = None) -> pd.Series:
+    """Apply func once per distinct value and broadcast results back by code.
+    
+    func must be deterministic. With processes > 1 and enough distinct
+    values, the work is fanned out to a process pool (func must then be
+    picklable, i.e. defined at module level).
+    """
+    codes, uniques = pd.factorize(series)
+    
+    if processes and processes > 1 and len(uniques) >= PARALLEL_MIN_UNIQUES:
+        chunksize = max(1, len(uniques) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(func, uniques, chunksize=chunksize))
+    else:
+        results = [func(value) for value in uniques]
+    
+    # Slot -1 holds the result for nulls, which factorize codes as -1
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:len(uniques)] = results
+    missing = codes == -1
+    if missing.any():
+        values[-1] = func(series.iloc[missing.argmax()])
+    
+    return pd.Series(values[codes], index=series.index, name=series.name).infer_objects()
+
+
+def apply_to_column(column: str, func: Callable, processes: Optional[int] = None) -> Callable:
+    """Returns function that applies func to each distinct value in specific column."""
     def transform(df: pd.DataFrame) -> pd.DataFrame:
         if column not in df.columns:
             return df
         result = df.copy()
-        result[column] = result[column].apply(func)
+        result[column] = apply_unique(result[column], func, processes)
         return result
     return transform
+
+
+def map_column(column: str, func: Callable[[pd.Series], pd.Series]) -> Callable:
+    """Returns function that replaces a column with func(column Series)."""
+    def transform(df: pd.DataFrame) -> pd.DataFrame:
+        if column not in df.columns:
+            return df
+        result = df.copy()
+        result[column] = func(result[column])
+        return result
+    return transform
+
+
+def drop_matching_keys(df: pd.DataFrame, keys: pd.DataFrame,
+                       columns: List[str]) -> Tuple[pd.DataFrame, pd.Series]:
+    """Anti-join: drop rows of df whose values in columns appear in keys.
+    
+    Returns the remaining rows and the number of removed rows per key
+    combination (one grouped count).
+    """
+    rows = pd.MultiIndex.from_frame(df[columns])
+    targets = pd.MultiIndex.from_frame(keys[columns].drop_duplicates())
+    mask = rows.isin(targets)
+    
+    if not mask.any():
+        return df, pd.Series(dtype='int64')
+    
+    removed = df.loc[mask].groupby(columns).size()
+    return df.loc[~mask], removed
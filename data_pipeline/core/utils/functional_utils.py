@@ -1,9 +1,16 @@
 """Functional programming utilities for composable data operations."""
 
+import operator
 from functools import reduce
-from typing import Callable, List, Any
+from typing import Callable, List, Any, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
 
 def pipe(data: Any, *functions: Callable) -> Any:
     """Apply functions in sequence (left to right).
@@ -28,45 +35,189 @@ def with_column(df: pd.DataFrame, column: str, transform_fn: Callable) -> pd.Dat
     return result
 
 
-def create_filter(column: str, operator: str, value: Any) -> Callable:
-    """Create DataFrame filter function.
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '>': operator.gt,
+}
+
+_NUMEXPR_MIN_ROWS = 10_000
+
+
+class FilterExpr:
+    """Boolean filter expression over DataFrame columns.
+    
+    Leaves compare a column against a value; ``&``, ``|`` and ``~`` build
+    AND/OR/NOT nodes. The whole tree is evaluated in one vectorized pass
+    (through numexpr when it is installed and every leaf is numeric).
+    Calling the expression returns the boolean mask.
+    
+    Example:
+        fiscal = create_filter('Month', '>=', 4) | create_filter('Month', '<=', 2)
+        rows = (create_filter('Year', '==', 2081) & fiscal).select(df)
+    """
+    
+    def __init__(self, kind: str, *children: Any, column: Optional[str] = None,
+                 op: Optional[str] = None, value: Any = None):
+        self.kind = kind
+        self.children = children
+        self.column = column
+        self.op = op
+        self.value = value
+    
+    def __and__(self, other) -> 'FilterExpr':
+        return all_of(self, other)
+    
+    def __or__(self, other) -> 'FilterExpr':
+        return any_of(self, other)
+    
+    def __invert__(self) -> 'FilterExpr':
+        return negate(self)
+    
+    def __call__(self, df: pd.DataFrame) -> pd.Series:
+        return pd.Series(self.mask(df), index=df.index)
+    
+    def __repr__(self) -> str:
+        if self.kind == 'leaf':
+            return f"({self.column} {self.op} {self.value!r})"
+        if self.kind == 'not':
+            return f"~{self.children[0]!r}"
+        if self.kind == 'fn':
+            return f"<{getattr(self.children[0], '__name__', 'filter')}>"
+        joiner = ' & ' if self.kind == 'and' else ' | '
+        return '(' + joiner.join(repr(c) for c in self.children) + ')'
+    
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Evaluate the expression to a boolean numpy array."""
+        if len(df) >= _NUMEXPR_MIN_ROWS and numexpr is not None:
+            compiled = self._to_numexpr(df)
+            if compiled is not None:
+                expression, local_dict = compiled
+                return numexpr.evaluate(expression, local_dict=local_dict)
+        return self._evaluate(df)
+    
+    def indices(self, df: pd.DataFrame) -> np.ndarray:
+        """Return positional indices of matching rows."""
+        return np.flatnonzero(self.mask(df))
+    
+    def select(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a copy of the matching rows, safe for the caller to modify."""
+        mask = self.mask(df)
+        if mask.all():
+            return df.copy()
+        return df.iloc[np.flatnonzero(mask)].copy()
+    
+    def _evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        if self.kind == 'leaf':
+            if self.op == 'in':
+                return df[self.column].isin(self.value).to_numpy()
+            result = _COMPARISONS[self.op](df[self.column], self.value)
+            return result.to_numpy(dtype=bool, na_value=False)
+        if self.kind == 'fn':
+            return np.array(self.children[0](df), dtype=bool)
+        if self.kind == 'not':
+            return ~self.children[0]._evaluate(df)
+        
+        result = self.children[0]._evaluate(df)
+        for child in self.children[1:]:
+            if self.kind == 'and':
+                result &= child._evaluate(df)
+            else:
+                result |= child._evaluate(df)
+        return result
+    
+    def _to_numexpr(self, df: pd.DataFrame) -> Optional[Tuple[str, dict]]:
+        """Compile to a numexpr expression, or None if any leaf is not numeric."""
+        local_dict = {}
+        
+        def build(node: 'FilterExpr') -> Optional[str]:
+            if node.kind == 'leaf':
+                if node.op == 'in' or not _is_number(node.value):
+                    return None
+                column = df[node.column]
+                if not isinstance(column.dtype, np.dtype) or column.dtype.kind not in 'iuf':
+                    return None
+                name = f"c{len(local_dict)}"
+                local_dict[name] = column.to_numpy()
+                local_dict[f"v_{name}"] = node.value
+                return f"({name} {node.op} v_{name})"
+            if node.kind == 'fn':
+                return None
+            parts = [build(child) for child in node.children]
+            if any(part is None for part in parts):
+                return None
+            if node.kind == 'not':
+                return f"(~{parts[0]})"
+            joiner = ' & ' if node.kind == 'and' else ' | '
+            return '(' + joiner.join(parts) + ')'
+        
+        expression = build(self)
+        return (expression, local_dict) if expression is not None else None
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+def _as_expr(filter_fn: Any) -> FilterExpr:
+    if isinstance(filter_fn, FilterExpr):
+        return filter_fn
+    if callable(filter_fn):
+        return FilterExpr('fn', filter_fn)
+    raise TypeError(f"Not a filter: {filter_fn!r}")
+
+
+def _flatten(kind: str, filters: Tuple[Any, ...]) -> List[FilterExpr]:
+    flat = []
+    for f in filters:
+        expr = _as_expr(f)
+        flat.extend(expr.children if expr.kind == kind else [expr])
+    return flat
+
+
+def all_of(*filters: Any) -> FilterExpr:
+    """AND together filters (FilterExpr or mask-returning callables)."""
+    return FilterExpr('and', *_flatten('and', filters))
+
+
+def any_of(*filters: Any) -> FilterExpr:
+    """OR together filters (FilterExpr or mask-returning callables)."""
+    return FilterExpr('or', *_flatten('or', filters))
+
+
+def negate(filter_fn: Any) -> FilterExpr:
+    """Negate a filter."""
+    return FilterExpr('not', _as_expr(filter_fn))
+
+
+def create_filter(column: str, operator: str, value: Any) -> FilterExpr:
+    """Create DataFrame filter expression.
     
     Example:
         year_filter = create_filter('Year', '==', 2082)
-        filtered = year_filter(df)
+        mask = year_filter(df)
     """
-    ops = {
-        '==': lambda df: df[column] == value,
-        '!=': lambda df: df[column] != value,
-        '<=': lambda df: df[column] <= value,
-        '>=': lambda df: df[column] >= value,
-        '<': lambda df: df[column] < value,
-        '>': lambda df: df[column] > value,
-        'in': lambda df: df[column].isin(value if isinstance(value, list) else [value])
-    }
-    
-    if operator not in ops:
+    if operator == 'in':
+        value = list(value) if isinstance(value, (list, tuple, set)) else [value]
+    elif operator not in _COMPARISONS:
         raise ValueError(f"Unsupported operator: {operator}")
     
-    return ops[operator]
+    return FilterExpr('leaf', column=column, op=operator, value=value)
 
 
 def combine_filters(*filters: Callable) -> Callable:
-    """Combine multiple filters with AND logic."""
-    def apply_all(df: pd.DataFrame) -> pd.DataFrame:
-        if not filters:
-            return df
-        mask = filters[0](df)
-        for f in filters[1:]:
-            mask &= f(df)
-        return df[mask].copy()
-    return apply_all
+    """Combine multiple filters with AND logic into a row-selecting transform."""
+    if not filters:
+        return lambda df: df
+    return all_of(*filters).select
 
 
 def filter_by_column(column: str, operator: str, value: Any) -> Callable:
     """Create reusable column filter."""
-    filter_fn = create_filter(column, operator, value)
-    return lambda df: df[filter_fn(df)].copy()
+    return create_filter(column, operator, value).select
 
 
 def safe_copy_transform(transform_fn: Callable) -> Callable:
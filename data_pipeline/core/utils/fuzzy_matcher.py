@@ -0,0 +1,135 @@
+"""Indexed fuzzy string matching against a fixed vocabulary."""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import pandas as pd
+
+from .dataframe_transforms import apply_unique
+
+
+def default_normalizer(text: Any) -> str:
+    """Lowercase and strip a value for matching."""
+    return str(text).strip().lower()
+
+
+def _ngrams(text: str, n: int) -> set:
+    """Return the set of padded character n-grams of text."""
+    padded = ' ' * (n - 1) + text + ' ' * (n - 1)
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def _char_masks(text: str) -> Dict[str, int]:
+    """Bit mask of positions for each character (for bit-parallel LCS)."""
+    masks: Dict[str, int] = defaultdict(int)
+    for i, char in enumerate(text):
+        masks[char] |= 1 << i
+    return dict(masks)
+
+
+def _lcs_length(masks: Dict[str, int], length: int, other: str) -> int:
+    """Longest common subsequence length using the Allison-Dix bit-parallel scan."""
+    full = (1 << length) - 1
+    v = full
+    for char in other:
+        u = v & masks.get(char, 0)
+        v = ((v + u) | (v - u)) & full
+    return length - bin(v).count('1')
+
+
+def similarity(text1: str, text2: str) -> float:
+    """Normalized indel similarity: 2 * LCS / (len1 + len2)."""
+    total = len(text1) + len(text2)
+    if total == 0:
+        return 1.0
+    if not text1 or not text2:
+        return 0.0
+    return 2.0 * _lcs_length(_char_masks(text1), len(text1), text2) / total
+
+
+class FuzzyMatcher:
+    """Fuzzy matcher over a pre-indexed candidate vocabulary.
+
+    Candidates are indexed by character trigrams, so a query only scores
+    the candidates that share at least one trigram with it. Scores are the
+    normalized indel similarity (2 * LCS / total length), computed with a
+    bit-parallel LCS and skipped early when the length difference alone
+    rules out the threshold.
+
+    Example:
+        matcher = FuzzyMatcher({'Kathmandu': '27', 'Lalitpur': '25'})
+        matcher.best('kathmandu valley', threshold=0.6)   # '27'
+    """
+
+    def __init__(self, choices: Union[Mapping[str, Any], Iterable[str]],
+                 normalizer: Callable[[Any], str] = default_normalizer,
+                 ngram: int = 3):
+        self.normalizer = normalizer
+        self.ngram = ngram
+
+        items = choices.items() if isinstance(choices, Mapping) else ((c, c) for c in choices)
+
+        self._choices: List[str] = []
+        self._values: List[Any] = []
+        self._keys: List[str] = []
+        self._exact: Dict[str, int] = {}
+        self._index: Dict[str, List[int]] = defaultdict(list)
+
+        for choice, value in items:
+            key = normalizer(choice)
+            idx = len(self._keys)
+            self._choices.append(choice)
+            self._values.append(value)
+            self._keys.append(key)
+            self._exact.setdefault(key, idx)
+            for gram in _ngrams(key, ngram):
+                self._index[gram].append(idx)
+
+        self._index = dict(self._index)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, query: Any, threshold: float = 0.0,
+               limit: Optional[int] = 5) -> List[Tuple[str, Any, float]]:
+        """Return up to `limit` (choice, value, score) tuples scoring >= threshold, best first."""
+        key = self.normalizer(query)
+
+        exact = self._exact.get(key)
+        if exact is not None and limit == 1:
+            return [(self._choices[exact], self._values[exact], 1.0)]
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in _ngrams(key, self.ngram):
+            for idx in self._index.get(gram, ()):
+                shared[idx] += 1
+
+        if not shared or not key:
+            return []
+
+        masks = _char_masks(key)
+        length = len(key)
+        results = []
+
+        for idx in shared:
+            candidate = self._keys[idx]
+            total = length + len(candidate)
+            if 2.0 * min(length, len(candidate)) / total < threshold:
+                continue
+            score = 2.0 * _lcs_length(masks, length, candidate) / total
+            if score >= threshold:
+                results.append((score, idx))
+
+        results.sort(key=lambda r: (-r[0], r[1]))
+        if limit is not None:
+            results = results[:limit]
+
+        return [(self._choices[idx], self._values[idx], score) for score, idx in results]
+
+    def best(self, query: Any, threshold: float = 0.0) -> Optional[Any]:
+        """Return the value of the best match scoring >= threshold, or None."""
+        matches = self.search(query, threshold=threshold, limit=1)
+        return matches[0][1] if matches else None
+
+    def match_series(self, series: pd.Series, threshold: float = 0.0) -> pd.Series:
+        """Match every value in a Series, querying each distinct value once."""
+        return apply_unique(series, lambda value: None if pd.isna(value) else self.best(value, threshold))
@@ -0,0 +1,104 @@
+"""Vectorized header-row detection for sheets and extracted tables.
+
+A header signature describes the columns a dataset is expected to have:
+
+    {
+        'fields': {'HS_Code': r'hscode|hs_code|code', 'Value': r'value'},
+        'required': ['HS_Code'],
+    }
+
+`fields` maps canonical column names to regexes matched against normalized
+header cells (lowercased, stripped, spaces as underscores, dots removed);
+order matters when a cell matches several fields. `required` lists the
+fields a row must contain to count as a header; when empty, any row
+matching at least one field qualifies.
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+
+HeaderSignature = Dict[str, Any]
+
+
+def normalize_header_cells(frame: pd.DataFrame) -> pd.DataFrame:
+    """Normalize every cell for header matching, column by column."""
+    return frame.apply(
+        lambda col: col.where(col.notna(), '').astype(str).str.strip().str.lower()
+        .str.replace(r'\s+', '_', regex=True).str.replace('.', '', regex=False)
+    )
+
+
+def score_header_rows(frame: pd.DataFrame, signature: HeaderSignature) -> pd.DataFrame:
+    """Return a rows x fields boolean frame: does the row contain each field."""
+    cells = normalize_header_cells(frame)
+    return pd.DataFrame({
+        field: cells.apply(lambda col: col.str.contains(pattern, regex=True)).any(axis=1)
+        for field, pattern in signature['fields'].items()
+    }, index=frame.index)
+
+
+def header_row_mask(frame: pd.DataFrame, signature: HeaderSignature) -> pd.Series:
+    """Boolean Series marking rows that contain every required field."""
+    if frame.empty:
+        return pd.Series(False, index=frame.index)
+    return _qualifying_rows(score_header_rows(frame, signature), signature)
+
+
+def _qualifying_rows(hits: pd.DataFrame, signature: HeaderSignature) -> pd.Series:
+    required = signature.get('required', list(signature['fields']))
+    if not required:
+        return hits.any(axis=1)
+    return hits[required].all(axis=1)
+
+
+def map_header_columns(header: pd.Series, signature: HeaderSignature) -> Dict[Any, str]:
+    """Map column labels to canonical fields from a header row.
+    
+    Each cell takes the first field it matches; later cells matching an
+    already assigned field are left unmapped.
+    """
+    cells = normalize_header_cells(header.to_frame().T).iloc[0]
+    mapping = {}
+    assigned = set()
+    for label, cell in cells.items():
+        if not cell:
+            continue
+        for field, pattern in signature['fields'].items():
+            if re.search(pattern, cell):
+                if field not in assigned:
+                    mapping[label] = field
+                    assigned.add(field)
+                break
+    return mapping
+
+
+def detect_header_row(sample: pd.DataFrame,
+                      signature: HeaderSignature) -> Tuple[Optional[Any], Dict[Any, str]]:
+    """Find the header row in a raw (header=None) sample.
+
+    Every row is scored at once; the row containing all required fields
+    and the most signature fields wins (earliest on ties).
+
+    Returns:
+        (row label, {column label: canonical field}), or (None, {}) if no row qualifies.
+    """
+    if sample.empty:
+        return None, {}
+
+    hits = score_header_rows(sample, signature)
+    scores = hits.sum(axis=1).where(_qualifying_rows(hits, signature))
+
+    if scores.isna().all():
+        return None, {}
+
+    header_row = scores.idxmax()
+    return header_row, map_header_columns(sample.loc[header_row], signature)
+
+
+def frame_from_header_row(raw: pd.DataFrame, header_row: Any) -> pd.DataFrame:
+    """Use a detected row of a raw sheet as the header and return the rows below it."""
+    position = raw.index.get_loc(header_row)
+    df = raw.iloc[position + 1:].reset_index(drop=True)
+    df.columns = raw.iloc[position].tolist()
+    return df.infer_objects()
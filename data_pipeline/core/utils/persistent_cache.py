@@ -0,0 +1,246 @@
+"""Persistent on-disk memoization for resolver functions across runs.
+
+Results are stored in a small SQLite database keyed by function, a
+version string and the pickled call arguments. The version is typically
+derived from the mapping tables a resolver depends on (see
+`mapping_version`) and is computed once per process, so editing a mapping
+invalidates that resolver's entries on the next run. The store is
+size-bounded with least-recently-used eviction; access times of cache hits
+are written in batches rather than on every read.
+
+Set DATA_PIPELINE_CACHE_DIR to relocate the store, or
+DATA_PIPELINE_NO_CACHE=1 to bypass it.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = 'DATA_PIPELINE_CACHE_DIR'
+CACHE_DISABLE_ENV = 'DATA_PIPELINE_NO_CACHE'
+DEFAULT_MAX_ENTRIES = 100_000
+EVICTION_CHECK_INTERVAL = 500
+ACCESS_FLUSH_INTERVAL = 1000
+
+_MISSING = object()
+_STORES: Dict[Path, 'MemoStore'] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def default_cache_dir() -> Path:
+    """Directory for persistent caches (DATA_PIPELINE_CACHE_DIR or ~/.cache/data_pipeline)."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    return Path(configured) if configured else Path.home() / '.cache' / 'data_pipeline'
+
+
+def cache_disabled() -> bool:
+    return os.environ.get(CACHE_DISABLE_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def mapping_version(*mappings: Any) -> str:
+    """Stable short hash of mapping tables (or any repr-able values)."""
+    digest = hashlib.sha1()
+    for mapping in mappings:
+        items = sorted(mapping.items(), key=repr) if isinstance(mapping, dict) else mapping
+        digest.update(repr(items).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class MemoStore:
+    """SQLite-backed memo table with LRU eviction."""
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._purged = set()
+        self._touched: Dict[Tuple[str, bytes], float] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are not shared across forked worker processes
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                " func TEXT NOT NULL, version TEXT NOT NULL, key BLOB NOT NULL,"
+                " value BLOB NOT NULL, accessed REAL NOT NULL,"
+                " PRIMARY KEY (func, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS memo_accessed ON memo (accessed)")
+            conn.commit()
+            self._conn, self._pid, self._purged, self._touched = conn, os.getpid(), set(), {}
+        return self._conn
+
+    def get(self, func: str, version: str, key: bytes) -> Any:
+        """Return the stored value, or _MISSING."""
+        with self._lock:
+            conn = self._connection()
+            self._purge_stale(conn, func, version)
+            row = conn.execute(
+                "SELECT value FROM memo WHERE func = ? AND key = ? AND version = ?",
+                (func, key, version)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            # Access times are only needed for eviction; record them in batches
+            self._touched[(func, key)] = time.time()
+            if len(self._touched) >= ACCESS_FLUSH_INTERVAL:
+                self._flush_access(conn)
+                conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, func: str, version: str, key: bytes, value: Any):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO memo (func, version, key, value, accessed) VALUES (?, ?, ?, ?, ?)",
+                (func, version, key, payload, time.time())
+            )
+            self._flush_access(conn)
+            conn.commit()
+            self._puts += 1
+            if self._puts % EVICTION_CHECK_INTERVAL == 0:
+                self._evict(conn)
+
+    def flush(self):
+        """Write pending access times of cache hits."""
+        with self._lock:
+            if not self._touched or self._pid != os.getpid():
+                return
+            try:
+                conn = self._connection()
+                self._flush_access(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Could not record cache access times: {e}")
+
+    def clear(self, func: Optional[str] = None):
+        with self._lock:
+            conn = self._connection()
+            self._touched = {}
+            if func is None:
+                conn.execute("DELETE FROM memo")
+            else:
+                conn.execute("DELETE FROM memo WHERE func = ?", (func,))
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+
+    def _flush_access(self, conn: sqlite3.Connection):
+        if self._touched:
+            conn.executemany("UPDATE memo SET accessed = ? WHERE func = ? AND key = ?",
+                             [(accessed, func, key) for (func, key), accessed in self._touched.items()])
+            self._touched = {}
+
+    def _purge_stale(self, conn: sqlite3.Connection, func: str, version: str):
+        """Drop a function's entries from other mapping versions (once per process)."""
+        if (func, version) in self._purged:
+            return
+        removed = conn.execute("DELETE FROM memo WHERE func = ? AND version != ?", (func, version)).rowcount
+        conn.commit()
+        if removed:
+            logger.info(f"Invalidated {removed:,} cached results for {func}")
+        self._purged.add((func, version))
+
+    def _evict(self, conn: sqlite3.Connection):
+        self._flush_access(conn)
+        count = conn.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM memo WHERE rowid IN (SELECT rowid FROM memo ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            conn.commit()
+            logger.debug(f"Evicted {excess:,} least recently used cache entries")
+
+
+def get_memo_store(path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> MemoStore:
+    """Shared MemoStore for a database path (default: memo.sqlite in the cache dir)."""
+    path = Path(path) if path else default_cache_dir() / 'memo.sqlite'
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = MemoStore(path, max_entries)
+            atexit.register(store.flush)
+        return store
+
+
+def persistent_memo(version: Union[str, Callable[[], str], None] = None,
+                    path: Optional[Path] = None,
+                    max_entries: int = DEFAULT_MAX_ENTRIES,
+                    key: Optional[Callable[..., Any]] = None) -> Callable:
+    """Decorator persisting a function's results across runs.
+
+    Args:
+        version: String (or zero-argument callable returning one) that
+            changes whenever the function's lookup tables change. A
+            callable is evaluated on the first call only; call the
+            wrapper's refresh_version() after changing tables at runtime.
+        path: SQLite file; defaults to memo.sqlite in the cache directory.
+        max_entries: Store-wide entry bound for LRU eviction.
+        key: Callable taking the call's arguments and returning the
+            picklable cache key, for arguments too large to pickle per call
+            (default: all arguments).
+
+    Example:
+        @persistent_memo(version=lambda: mapping_version(DISTRICT_MAPPING))
+        def resolve_district(name): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        resolved = {}
+
+        def current_version() -> str:
+            if 'version' not in resolved:
+                resolved['version'] = version() if callable(version) else (version or '')
+            return resolved['version']
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if cache_disabled():
+                return func(*args, **kwargs)
+
+            current = current_version()
+            try:
+                call_key = key(*args, **kwargs) if key is not None else (args, sorted(kwargs.items()))
+                digest = hashlib.sha1(pickle.dumps(call_key, protocol=4)).digest()
+                store = get_memo_store(path, max_entries)
+                cached = store.get(name, current, digest)
+            except (sqlite3.Error, OSError, pickle.PicklingError, TypeError) as e:
+                logger.debug(f"Persistent cache unavailable for {name}: {e}")
+                return func(*args, **kwargs)
+
+            if cached is not _MISSING:
+                return cached
+
+            result = func(*args, **kwargs)
+            try:
+                store.put(name, current, digest, result)
+            except (sqlite3.Error, OSError, pickle.PicklingError) as e:
+                logger.debug(f"Could not persist result for {name}: {e}")
+            return result
+
+        wrapper.cache_name = name
+        wrapper.refresh_version = resolved.clear
+        return wrapper
+    return decorator
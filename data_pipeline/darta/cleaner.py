@@ -3,19 +3,33 @@
 import pandas as pd
 import re
 import logging
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from .config import NEPALI_TO_ENGLISH_DIGITS, REG_NUMBER_SEPARATORS, PROVINCE_MAPPING, DISTRICT_MAPPING
-from ..core.utils import convert_nepali_to_english as _convert_nepali, fuzzy_string_match
+from ..core.utils import (
+    convert_nepali_to_english as _convert_nepali,
+    convert_nepali_series,
+    FuzzyMatcher,
+    apply_unique,
+    persistent_memo,
+    mapping_version
+)
 
 logger = logging.getLogger(__name__)
 
+_MAPPING_MATCHERS: Dict[int, Tuple[dict, FuzzyMatcher, str]] = {}
+
 
 def convert_nepali_to_english(text: str) -> str:
     """Convert Nepali numerals to English numerals."""
     return _convert_nepali(text, NEPALI_TO_ENGLISH_DIGITS)
 
 
+def convert_nepali_column(series: pd.Series) -> pd.Series:
+    """Convert Nepali numerals in a whole column at once."""
+    return convert_nepali_series(series, NEPALI_TO_ENGLISH_DIGITS)
+
+
 def clean_registration_number(reg_no: str) -> str:
     """
     Extract registration number before separator.
@@ -73,30 +87,50 @@ def parse_date_components(date_str: str) -> dict:
     return {'year': None, 'month': None, 'day': None}
 
 
-def fuzzy_find_code(name: str, mapping: dict, threshold: float = 0.75) -> Optional[str]:
-    """Find code using fuzzy matching."""
-    if pd.isna(name):
-        return None
-    
+def _mapping_entry(mapping: dict) -> Tuple[dict, FuzzyMatcher, str]:
+    """(mapping, FuzzyMatcher over its keys, mapping_version), built once per mapping."""
+    cached = _MAPPING_MATCHERS.get(id(mapping))
+    if cached is None or cached[0] is not mapping or len(cached[1]) != len(mapping):
+        cached = (mapping, FuzzyMatcher(mapping), mapping_version(mapping))
+        _MAPPING_MATCHERS[id(mapping)] = cached
+    return cached
+
+
+def _mapping_matcher(mapping: dict) -> FuzzyMatcher:
+    """Return a FuzzyMatcher indexing mapping's keys, built once per mapping."""
+    return _mapping_entry(mapping)[1]
+
+
+@persistent_memo(version=lambda: mapping_version(PROVINCE_MAPPING, DISTRICT_MAPPING),
+                 key=lambda name, mapping, threshold=0.75: (name, _mapping_entry(mapping)[2], threshold))
+def _resolve_code(name: str, mapping: dict, threshold: float = 0.75) -> Optional[str]:
+    """Code of the exact key, else of the best fuzzy match, else None."""
     name_clean = str(name).strip()
     
     if name_clean in mapping:
         return mapping[name_clean]
     
-    best_match = None
-    best_ratio = threshold
-    
-    for key, code in mapping.items():
-        ratio = fuzzy_string_match(name_clean, key)
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = code
-    
-    if best_match:
-        return best_match
+    return _mapping_matcher(mapping).best(name_clean, threshold=threshold) or None
+
+
+def fuzzy_find_code(name: str, mapping: dict, threshold: float = 0.75) -> Optional[str]:
+    """Find code using fuzzy matching."""
+    if pd.isna(name):
+        return None
     
-    logger.warning(f"No mapping found for: {name}")
-    return None
+    code = _resolve_code(name, mapping, threshold)
+    if code is None:
+        logger.warning(f"No mapping found for: {name}")
+    return code
+
+
+def map_codes(names: pd.Series, mapping: dict, threshold: float = 0.75) -> pd.Series:
+    """Map a Series of names to codes, resolving each distinct name once (persistently memoized)."""
+    codes = apply_unique(names, lambda name: None if pd.isna(name) else _resolve_code(name, mapping, threshold))
+    unmatched = names[names.notna() & codes.isna()].unique()
+    if len(unmatched):
+        logger.warning(f"No mapping found for: {', '.join(map(str, unmatched))}")
+    return codes
 
 
 def clean_phone_number(phone: str) -> str:
@@ -156,7 +190,7 @@ def apply_province_code(df: pd.DataFrame) -> pd.DataFrame:
     """Map province names to codes."""
     df = df.copy()
     if 'province' in df.columns:
-        df['province_code'] = df['province'].apply(lambda x: fuzzy_find_code(x, PROVINCE_MAPPING))
+        df['province_code'] = map_codes(df['province'], PROVINCE_MAPPING)
         logger.info(f"Mapped {df['province_code'].notna().sum()}/{len(df)} province codes")
     return df
 
@@ -165,7 +199,7 @@ def apply_district_code(df: pd.DataFrame) -> pd.DataFrame:
     """Map district names to codes."""
     df = df.copy()
     if 'district' in df.columns:
-        df['district_code'] = df['district'].apply(lambda x: fuzzy_find_code(x, DISTRICT_MAPPING))
+        df['district_code'] = map_codes(df['district'], DISTRICT_MAPPING)
         logger.info(f"Mapped {df['district_code'].notna().sum()}/{len(df)} district codes")
     return df
 
@@ -176,17 +210,21 @@ def process_darta_data(df: pd.DataFrame) -> pd.DataFrame:
     
     df = df.copy()
     
+    for col in ['reg_no', 'director_phone', 'editor_phone', 'nregdate']:
+        if col in df.columns:
+            df[col] = convert_nepali_column(df[col])
+    
     if 'reg_no' in df.columns:
-        df['reg_no'] = df['reg_no'].apply(clean_registration_number)
+        df['reg_no'] = apply_unique(df['reg_no'], clean_registration_number)
     
     if 'director_phone' in df.columns:
-        df['director_phone'] = df['director_phone'].apply(clean_phone_number)
+        df['director_phone'] = apply_unique(df['director_phone'], clean_phone_number)
     
     if 'editor_phone' in df.columns:
-        df['editor_phone'] = df['editor_phone'].apply(clean_phone_number)
+        df['editor_phone'] = apply_unique(df['editor_phone'], clean_phone_number)
     
     if 'nregdate' in df.columns:
-        date_components = df['nregdate'].apply(parse_date_components)
+        date_components = apply_unique(df['nregdate'], parse_date_components)
         df['year'] = date_components.apply(lambda x: x['year'])
         df['month'] = date_components.apply(lambda x: x['month'])
         df['day'] = date_components.apply(lambda x: x['day'])
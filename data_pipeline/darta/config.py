@@ -120,3 +120,8 @@ EXPECTED_COLUMNS = [
 ]
 
 REG_NUMBER_SEPARATORS = ['/', '-', '_']
+
+DARTA_HEADER_SIGNATURE = {
+    'fields': {'reg_no': r'reg_no', 'province': r'province', 'district': r'district'},
+    'required': ['reg_no', 'province', 'district'],
+}
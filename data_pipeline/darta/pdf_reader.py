@@ -5,6 +5,9 @@ import pandas as pd
 import logging
 from pathlib import Path
 
+from .config import DARTA_HEADER_SIGNATURE
+from ..core.utils import header_row_mask
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,13 +33,15 @@ def extract_tables_from_pdf(pdf_path: Path) -> pd.DataFrame:
                 if not table:
                     continue
                 
-                for row in table:
-                    if not row or all(not cell or str(cell).strip() == '' for cell in row):
+                table_df = pd.DataFrame(table)
+                is_empty = table_df.apply(lambda col: col.fillna('').astype(str).str.strip() == '').all(axis=1)
+                is_header = header_row_mask(table_df, DARTA_HEADER_SIGNATURE)
+                
+                for row, empty, header in zip(table, is_empty, is_header):
+                    if not row or empty:
                         continue
                     
-                    row_text = ' '.join(str(cell).lower() for cell in row if cell)
-                    
-                    if 'reg_no' in row_text and 'province' in row_text and 'district' in row_text:
+                    if header:
                         if not header_found:
                             headers = [str(cell).strip() if cell else '' for cell in row]
                             header_found = True
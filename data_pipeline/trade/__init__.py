@@ -1,6 +1,9 @@
 """Trade data processing module."""
 from .api import process_data
+from .backfill import backfill
+from .query import query
+from .commodity_index import search_commodities
 from .cleaner import clean_monthly_data
 from .config import NEPALI_MONTHS
 
-__all__ = ['process_data', 'clean_monthly_data', 'NEPALI_MONTHS']
+__all__ = ['process_data', 'backfill', 'query', 'search_commodities', 'clean_monthly_data', 'NEPALI_MONTHS']
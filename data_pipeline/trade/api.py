@@ -1,13 +1,30 @@
 import sys
 import logging
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 import pandas as pd
 
 from .excel_reader import read_cumulative_excel
-from .csv_handler import read_done_csv, filter_prev_data, save_updated_csv
-from .calculator import process_trade_type, combine_import_export
+from .csv_handler import filter_prev_data, read_cumulative_csv, save_updated_csv
+from .history_index import period_fingerprint, period_fingerprints, read_fiscal_year
+from .calculator import DIRECTIONS, aggregate_current, difference_keys, monthly_from_differences
+from .store import EMPTY_FINGERPRINT, combine_fingerprints, previous_cumulatives, record_month
+from .incremental import (
+    key_hashes,
+    month_rows,
+    load_input_hashes,
+    save_input_hashes,
+    changed_keys,
+    restrict_to_keys,
+    patch_month
+)
+from .interning import use_dictionaries
+from .reconciliation import reconcile_month, log_reconciliation
+from .rollups import update_rollups
 from .cleaner import clean_monthly_data
+from .config import FISCAL_YEAR_START_MONTH, HISTORY_CSV_DTYPES
+from .periods import fiscal_period
+from .commodity_index import commodity_descriptions, update_commodity_index
 from ..core.io import create_backup, save_csv
 from ..core.utils import setup_logging, get_logger, get_file_type
 
@@ -17,8 +34,25 @@ logger = get_logger(__name__)
 
 def process_data(xlsx_file: Union[str, Path], old_data: Union[str, Path], 
                  output_name: str = 'updateddone.csv',
-                 replace_existing: bool = True) -> pd.DataFrame:
+                 replace_existing: bool = True,
+                 use_snapshots: bool = True,
+                 incremental: bool = True,
+                 month: Optional[int] = None,
+                 chunksize: Optional[int] = None) -> pd.DataFrame:
+    """Difference a cumulative workbook against the history and write the month.
     
+    month is the target (calendar) month of the cumulative input. It is
+    required for CSV inputs and overrides the month detected from an Excel
+    header. chunksize streams a CSV input in chunks of that many rows (see
+    read_cumulative_csv).
+    
+    With incremental=True, rerunning a month against the history it was
+    written to only re-differences the keys whose cumulative input changed
+    and patches those rows (see trade.incremental).
+    
+    The returned history carries a reconciliation report of the month
+    against its cumulative input in attrs['reconciliation'].
+    """
     xlsx_path = Path(xlsx_file)
     old_data_path = Path(old_data)
     
@@ -42,8 +76,8 @@ def process_data(xlsx_file: Union[str, Path], old_data: Union[str, Path],
                            "Please ensure the Excel file has proper headers with fiscal year and month range.")
         
         year = metadata['year']
-        target_month = metadata['target_month']
-        previous_month = metadata['previous_month']
+        target_month = month or metadata['target_month']
+        previous_month = target_month - 1 if target_month > 1 else 12
         
         logger.info(f"Detected metadata: Year={year}, Month={target_month}, "
                    f"Previous={previous_month} ({xlsx_path.name})")
@@ -53,50 +87,96 @@ def process_data(xlsx_file: Union[str, Path], old_data: Union[str, Path],
             raise ValueError("Failed to read import and export data")
     
     elif file_type == 'csv':
-        cumulative_df = pd.read_csv(xlsx_path)
-        if 'Direction' not in cumulative_df.columns:
-            raise ValueError("CSV must have 'Direction' column")
-        
-        # For CSV, try to extract from filename
+        # For CSV, the year comes from the filename and the month must be given
         from .header_parser import _extract_year_from_filename
         year = _extract_year_from_filename(xlsx_path)
         if not year:
             raise ValueError(f"Could not extract year from CSV filename: {xlsx_path.name}")
+        if month is None:
+            raise ValueError(f"CSV input {xlsx_path.name} needs an explicit month, e.g. process_data(..., month=6)")
         
-        # CSV files need month to be specified - use default or raise error
-        logger.warning("CSV input detected - assuming current month for processing")
-        target_month = 6  # Default fallback - ideally this should be a parameter
-        previous_month = 5
-        
-        import_cumulative = cumulative_df[cumulative_df['Direction'] == 'I'].copy() \
-            if 'I' in cumulative_df['Direction'].values else None
-        export_cumulative = cumulative_df[cumulative_df['Direction'] == 'E'].copy() \
-            if 'E' in cumulative_df['Direction'].values else None
+        target_month = month
+        previous_month = target_month - 1 if target_month > 1 else 12
         
+        import_cumulative, export_cumulative = read_cumulative_csv(xlsx_path, chunksize)
         if import_cumulative is None and export_cumulative is None:
             raise ValueError("No data with Direction 'I' or 'E'")
     
-    done_df = read_done_csv(old_data_path)
-    previous_filtered = filter_prev_data(done_df, year, previous_month)
-    
-    import_monthly = pd.DataFrame()
-    if import_cumulative is not None:
-        import_monthly = process_trade_type(import_cumulative, previous_filtered, 'import', year, target_month)
-    
-    export_monthly = pd.DataFrame()
-    if export_cumulative is not None:
-        export_monthly = process_trade_type(export_cumulative, previous_filtered, 'export', year, target_month)
-    
-    monthly_df = combine_import_export(import_monthly, export_monthly)
-    monthly_df = clean_monthly_data(monthly_df)
-    
-    monthly_only_path = old_data_path.parent / 'month.csv'
-    save_csv(monthly_df, monthly_only_path, "Monthly data")
-    
-    create_backup(old_data_path)
-    final_path = save_updated_csv(old_data_path, monthly_df, output_name, replace_existing)
+    with use_dictionaries(old_data_path) as dictionaries:
+        done_df = read_fiscal_year(old_data_path, year)
+        previous_filtered = filter_prev_data(done_df, year, previous_month)
+        
+        cumulatives = {'import': import_cumulative, 'export': export_cumulative}
+        trade_types = [trade_type for trade_type, df in cumulatives.items() if df is not None]
+        
+        # Fingerprints come from the history index's blocks (rows are only hashed without one)
+        first, target = fiscal_period(year, FISCAL_YEAR_START_MONTH), fiscal_period(year, target_month)
+        previous_fingerprints = period_fingerprints(old_data_path, first, fiscal_period(year, previous_month),
+                                                    previous_filtered)
+        previous_fingerprint = combine_fingerprints(EMPTY_FINGERPRINT, *previous_fingerprints.values())
+        year_fingerprint = period_fingerprint(old_data_path, first, first + 11, done_df)
+        
+        previous = previous_cumulatives(old_data_path, previous_filtered, trade_types,
+                                        year, previous_month, use_snapshots, previous_fingerprints)
+        current_aggregated = aggregate_current(cumulatives)
+        hashes = key_hashes(current_aggregated)
+        
+        differences = difference_keys(current_aggregated, previous)
+        
+        stored = None
+        if incremental and replace_existing:
+            stored = load_input_hashes(old_data_path, year, target_month, previous_fingerprint,
+                                       period_fingerprint(old_data_path, target, target,
+                                                          month_rows(done_df, year, target_month)))
+        
+        if stored is not None:
+            keys = changed_keys(stored, hashes)
+            counts = keys['change'].value_counts()
+            logger.info(f"Incremental update for Year={year}, Month={target_month}: "
+                        f"{counts.get('added', 0):,} added, {counts.get('changed', 0):,} changed, "
+                        f"{counts.get('removed', 0):,} removed keys")
+        
+            patch_df = monthly_from_differences(restrict_to_keys(differences, keys), year, target_month)
+            if not patch_df.empty:
+                patch_df = clean_monthly_data(patch_df)
+        
+            create_backup(old_data_path)
+            final_path = patch_month(old_data_path, patch_df, keys, year, target_month, output_name)
+            updated = pd.read_csv(final_path, dtype=HISTORY_CSV_DTYPES)
+            monthly_df = month_rows(updated, year, target_month)
+        else:
+            monthly_df = monthly_from_differences(differences, year, target_month)
+            if monthly_df.empty:
+                raise ValueError("No data to combine - both import and export empty")
+        
+            monthly_df = clean_monthly_data(monthly_df)
+        
+            create_backup(old_data_path)
+            final_path = save_updated_csv(old_data_path, monthly_df, output_name, replace_existing)
+            updated = pd.read_csv(final_path, dtype=HISTORY_CSV_DTYPES)
+        
+        report = reconcile_month(monthly_df, previous, current_aggregated, year, target_month)
+        
+        monthly_only_path = old_data_path.parent / 'month.csv'
+        save_csv(monthly_df, monthly_only_path, "Monthly data")
+        
+        if use_snapshots:
+            for trade_type, prev in previous.items():
+                record_month(old_data_path, year, target_month, trade_type, prev,
+                             previous_fingerprints.get(DIRECTIONS[trade_type], EMPTY_FINGERPRINT), monthly_df)
+        
+        save_input_hashes(old_data_path, year, target_month, hashes, previous_fingerprint,
+                          period_fingerprint(final_path, target, target, month_rows(updated, year, target_month)))
+        
+        update_rollups(old_data_path, final_path, monthly_df, {year: year_fingerprint}, replace_existing)
+        
+        dictionaries.encode_frame(monthly_df)
+        dictionaries.save()
+        update_commodity_index(old_data_path, commodity_descriptions(cumulatives.values()))
     
-    return pd.read_csv(final_path)
+    log_reconciliation(report)
+    updated.attrs['reconciliation'] = report
+    return updated
 
 
 __all__ = ['process_data']
@@ -104,13 +184,15 @@ __all__ = ['process_data']
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Usage: python -m data_pipeline.trade <xlsx_file> <old_data> [output_name]")
+        print("Usage: python -m data_pipeline.trade <xlsx_or_csv_file> <old_data> [output_name] [month]")
         print("Example: python -m data_pipeline.trade data/FTS.xlsx data/done.csv updateddone.csv")
+        print("Example: python -m data_pipeline.trade data/cumulative_2081.csv data/done.csv updateddone.csv 6")
         sys.exit(1)
     
     xlsx = sys.argv[1]
     old = sys.argv[2]
     output = sys.argv[3] if len(sys.argv) > 3 else 'updateddone.csv'
+    month = int(sys.argv[4]) if len(sys.argv) > 4 else None
     
-    result = process_data(xlsx, old, output)
+    result = process_data(xlsx, old, output, month=month)
     print(f"\nDone! Processed {len(result):,} records")
@@ -0,0 +1,239 @@
+"""Backfill trade history from a season of cumulative FTS workbooks.
+
+Instead of calling process_data once per workbook (each call re-reading and
+rewriting the history CSV), backfill detects every workbook's month range,
+parses all workbooks in parallel worker processes, differences consecutive
+cumulatives of each fiscal year in order in memory and writes the history
+once. Only the differencing depends on month order; the parsing does not.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .calculator import (
+    DIRECTIONS,
+    calculate_previous_cumulatives,
+    calculate_monthly_combined,
+    advance_cumulative
+)
+from .cleaner import clean_monthly_data
+from .commodity_index import commodity_descriptions, update_commodity_index
+from .csv_handler import filter_prev_data, save_updated_csv
+from .history_index import period_fingerprint, period_fingerprints, read_fiscal_year
+from .interning import use_dictionaries
+from .excel_reader import read_cumulative_excel
+from .header_parser import extract_header_metadata
+from .config import FISCAL_YEAR_START_MONTH, HISTORY_CSV_DTYPES
+from .periods import fiscal_month_index, fiscal_period
+from .store import EMPTY_FINGERPRINT, invalidate_snapshots, save_snapshot
+from .rollups import update_rollups
+from ..core.io import create_backup
+
+logger = logging.getLogger(__name__)
+
+ParsedWorkbook = Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]
+
+
+def plan_backfill(workbooks: Iterable[Union[str, Path]]) -> Dict[int, List[Tuple[int, int, Path]]]:
+    """Group workbooks by fiscal year as (target_month, previous_month, path), in fiscal order."""
+    plan: Dict[int, Dict[int, Tuple[int, int, Path]]] = {}
+
+    for workbook in workbooks:
+        path = Path(workbook)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+
+        metadata = extract_header_metadata(path)
+        if not metadata:
+            raise ValueError(f"Could not extract year/month metadata from {path.name}")
+
+        year, target = metadata['year'], metadata['target_month']
+        months = plan.setdefault(year, {})
+        if target in months:
+            raise ValueError(f"Both {months[target][2].name} and {path.name} end at "
+                             f"Year={year}, Month={target}")
+        months[target] = (target, metadata['previous_month'], path)
+
+    return {
+        year: sorted(months.values(), key=lambda item: fiscal_month_index(item[0]))
+        for year, months in sorted(plan.items())
+    }
+
+
+def read_workbooks(paths: Iterable[Path], max_workers: Optional[int] = None) -> Dict[Path, ParsedWorkbook]:
+    """(import, export) cumulatives of each workbook, parsed in worker processes.
+
+    max_workers defaults to one process per workbook; 1 parses in-process.
+    """
+    paths = list(dict.fromkeys(Path(path) for path in paths))
+    workers = min(max_workers or len(paths), len(paths))
+    if workers <= 1:
+        return {path: read_cumulative_excel(path) for path in paths}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsed = dict(zip(paths, executor.map(read_cumulative_excel, paths)))
+    logger.info(f"Parsed {len(paths)} workbook(s) in {workers} worker process(es)")
+    return parsed
+
+
+def process_fiscal_year(year: int,
+                        workbooks: List[Tuple[int, int, Path]],
+                        history: pd.DataFrame,
+                        engine: str = 'pandas',
+                        parsed: Optional[Dict[Path, ParsedWorkbook]] = None) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame], pd.DataFrame]:
+    """Monthly rows for one fiscal year's workbooks, differenced in order.
+
+    The first workbook is differenced against the history up to its previous
+    month; each later one against the running cumulative. With
+    engine='sparse' all months are differenced at once by
+    sparse_engine.difference_fiscal_year. parsed holds already parsed
+    workbooks (see read_workbooks); missing ones are parsed in parallel.
+    Returns the monthly rows, the final cumulative per trade type and the
+    workbooks' commodity descriptions.
+    """
+    paths = [path for _, _, path in workbooks]
+    parsed = dict(parsed or {})
+    missing = [path for path in paths if path not in parsed]
+    if missing:
+        parsed.update(read_workbooks(missing))
+
+    first_target, first_previous, _ = workbooks[0]
+    if fiscal_month_index(first_target) == 0 or history.empty:
+        seed = pd.DataFrame(columns=['Direction'])
+    else:
+        seed = filter_prev_data(history, year, first_previous)
+
+    running = calculate_previous_cumulatives(seed)
+    last_index = fiscal_month_index(first_target) - 1
+
+    for target, _, _ in workbooks:
+        if fiscal_month_index(target) != last_index + 1:
+            logger.warning(f"Year={year}: no workbook for the month(s) before Month={target}, "
+                           f"their flows are attributed to Month={target}")
+        last_index = fiscal_month_index(target)
+
+    if engine == 'sparse':
+        return _process_fiscal_year_sparse(year, workbooks, running, parsed)
+
+    monthly_frames, inputs = [], []
+    for target, _, path in workbooks:
+        import_cumulative, export_cumulative = parsed[path]
+        current = {'import': import_cumulative, 'export': export_cumulative}
+        inputs.extend(current.values())
+
+        month_df = calculate_monthly_combined(current, running, year, target)
+        if month_df.empty:
+            raise ValueError(f"No import or export data in {path.name}")
+        month_df = clean_monthly_data(month_df)
+        for trade_type in DIRECTIONS:
+            running[trade_type] = advance_cumulative(running[trade_type], month_df, trade_type)
+
+        logger.info(f"Year={year}, Month={target}: {len(month_df):,} monthly records from {path.name}")
+        monthly_frames.append(month_df)
+
+    return pd.concat(monthly_frames, ignore_index=True), running, commodity_descriptions(inputs)
+
+
+def _process_fiscal_year_sparse(year: int,
+                                workbooks: List[Tuple[int, int, Path]],
+                                running: Dict[str, pd.DataFrame],
+                                parsed: Dict[Path, ParsedWorkbook]) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame], pd.DataFrame]:
+    from .sparse_engine import difference_fiscal_year
+
+    cumulatives = {}
+    for target, _, path in workbooks:
+        import_cumulative, export_cumulative = parsed[path]
+        if all(df is None or df.empty for df in (import_cumulative, export_cumulative)):
+            raise ValueError(f"No import or export data in {path.name}")
+        cumulatives[target] = {'import': import_cumulative, 'export': export_cumulative}
+
+    monthly_df = clean_monthly_data(difference_fiscal_year(cumulatives, running, year))
+    for trade_type in DIRECTIONS:
+        running[trade_type] = advance_cumulative(running[trade_type], monthly_df, trade_type)
+
+    logger.info(f"Year={year}: {len(monthly_df):,} monthly records from {len(workbooks)} workbook(s)")
+    inputs = [df for current in cumulatives.values() for df in current.values()]
+    return monthly_df, running, commodity_descriptions(inputs)
+
+
+def backfill(workbooks: Iterable[Union[str, Path]],
+             old_data: Union[str, Path],
+             output_name: str = 'updateddone.csv',
+             replace_existing: bool = True,
+             max_workers: Optional[int] = None,
+             use_snapshots: bool = True,
+             engine: str = 'pandas') -> pd.DataFrame:
+    """Process many cumulative workbooks and write the history once.
+
+    Args:
+        workbooks: FTS cumulative Excel files, in any order.
+        old_data: History CSV (done.csv).
+        output_name: Name of the updated CSV written next to old_data.
+        replace_existing: Replace existing rows for the processed months.
+        max_workers: Worker processes parsing the workbooks (default: one
+            per workbook).
+        use_snapshots: Store the final cumulative of each year as a snapshot.
+        engine: 'pandas', or 'sparse' to difference each fiscal year at once
+            with the optional scipy engine (pip install data-pipeline[sparse]).
+
+    Example:
+        backfill(sorted(Path('data/2081').glob('FTS_*.xlsx')), 'data/done.csv')
+    """
+    old_data_path = Path(old_data)
+    if not old_data_path.exists():
+        raise FileNotFoundError(f"File not found: {old_data_path}")
+
+    if engine not in ('pandas', 'sparse'):
+        raise ValueError(f"Unknown engine: {engine}")
+
+    plan = plan_backfill(workbooks)
+    if not plan:
+        raise ValueError("No workbooks to backfill")
+
+    for year, items in plan.items():
+        logger.info(f"Backfill Year={year}: months {[target for target, _, _ in items]}")
+
+    with use_dictionaries(old_data_path) as dictionaries:
+        histories = {year: read_fiscal_year(old_data_path, year) for year in plan}
+        before = {}
+        for year, rows in histories.items():
+            start = fiscal_period(year, FISCAL_YEAR_START_MONTH)
+            before[year] = period_fingerprint(old_data_path, start, start + 11, rows)
+
+        parsed = read_workbooks([path for items in plan.values() for _, _, path in items], max_workers)
+        results = {year: process_fiscal_year(year, items, histories[year], engine, parsed)
+                   for year, items in plan.items()}
+
+        monthly_df = pd.concat([monthly for monthly, _, _ in results.values()], ignore_index=True)
+
+        create_backup(old_data_path)
+        final_path = save_updated_csv(old_data_path, monthly_df, output_name, replace_existing)
+        updated = pd.read_csv(final_path, dtype=HISTORY_CSV_DTYPES)
+
+        if use_snapshots:
+            for year, (_, cumulatives, _) in results.items():
+                first, last = plan[year][0][0], plan[year][-1][0]
+                invalidate_snapshots(old_data_path, year, first)
+
+                fingerprints = period_fingerprints(final_path, fiscal_period(year, FISCAL_YEAR_START_MONTH),
+                                                   fiscal_period(year, last))
+                for trade_type, direction in DIRECTIONS.items():
+                    if cumulatives[trade_type].empty:
+                        continue
+                    save_snapshot(old_data_path, year, last, direction, cumulatives[trade_type],
+                                  fingerprints.get(direction, EMPTY_FINGERPRINT))
+
+        update_rollups(old_data_path, final_path, monthly_df, before, replace_existing)
+
+        dictionaries.encode_frame(monthly_df)
+        dictionaries.save()
+        update_commodity_index(old_data_path, commodity_descriptions(
+            descriptions for _, _, descriptions in (results[year] for year in sorted(results))))
+
+    logger.info(f"Backfilled {len(monthly_df):,} monthly records across {len(plan)} fiscal year(s)")
+    return updated
+
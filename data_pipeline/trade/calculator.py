@@ -1,11 +1,18 @@
+import numpy as np
 import pandas as pd
 import logging
+from typing import Dict, List, Optional, Union
 
-from .cleaner import get_iso2_code  
-from ..core.utils import pipe, clean_hs_codes_fn, strip_strings, add_composite_key, apply_to_column
+from .cleaner import convert_country_names
+from .interning import Dictionaries, active_dictionaries
+from ..core.utils import pipe, clean_hs_codes_fn, strip_strings, add_composite_key, map_column
 
 logger = logging.getLogger(__name__)
 
+DIRECTIONS = {'import': 'I', 'export': 'E'}
+DIRECTION_KEY = ['Direction', '_key']
+KEY_ID_BITS = 32
+
 
 def get_trade_agg_dict(trade_type: str, has_revenue: bool) -> dict:
     """Build aggregation dictionary for trade data grouping."""
@@ -21,6 +28,71 @@ def get_trade_agg_dict(trade_type: str, has_revenue: bool) -> dict:
     return agg
 
 
+def key_ids(df: pd.DataFrame, dictionaries: Optional[Dictionaries] = None) -> np.ndarray:
+    """int64 ids of the (HS_Code, Country) pairs of cleaned rows (default: the active dictionaries).
+    
+    HS codes are interned in canonical form (hs_codes.canonical_hs_code), so
+    1012100 read back from a CSV and '01012100' get the same id.
+    """
+    if dictionaries is None:
+        dictionaries = active_dictionaries()
+    hs = dictionaries.encode('hs', df['HS_Code'])
+    country = dictionaries.encode('country', df['Country'])
+    return (hs << KEY_ID_BITS) | (country + 1)
+
+
+def group_by_key(df: pd.DataFrame, leading: List[str], agg_dict: dict,
+                 dictionaries: Optional[Dictionaries] = None) -> pd.DataFrame:
+    """Aggregate cleaned rows by leading columns and _key.
+    
+    HS codes, countries and units are interned (see interning; default: the
+    active dictionaries), so the groupby runs on integer ids; attribute
+    strings and _key are only built for the aggregated rows, with HS codes
+    in canonical form.
+    """
+    if dictionaries is None:
+        dictionaries = active_dictionaries()
+    frame = pd.DataFrame({column: df[column].to_numpy() for column in leading})
+    frame['_id'] = key_ids(df, dictionaries)
+    
+    agg = {column: how for column, how in agg_dict.items() if how == 'sum'}
+    for column in agg:
+        frame[column] = df[column].to_numpy()
+    if 'Unit' in agg_dict:
+        units = dictionaries.encode('unit', df['Unit']).astype(float)
+        frame['Unit'] = np.where(units >= 0, units, np.nan)  # 'first' skips NaN like missing units
+        agg['Unit'] = 'first'
+    
+    grouped = frame.groupby(leading + ['_id'], as_index=False, sort=True, dropna=False).agg(agg)
+    ids = grouped['_id'].to_numpy()
+    country_ids = (ids & ((1 << KEY_ID_BITS) - 1)) - 1
+    
+    result = grouped[leading].copy()
+    result['HS_Code'] = dictionaries.decode('hs', ids >> KEY_ID_BITS)
+    result['Country'] = dictionaries.decode('country', country_ids)
+    result['_key'] = add_composite_key('HS_Code', 'Country')(
+        pd.DataFrame({'HS_Code': result['HS_Code'],
+                      'Country': dictionaries.decode('country', country_ids, np.nan)}))['_key']
+    for column in agg:
+        result[column] = grouped[column].to_numpy()
+    if 'Unit' in agg_dict:
+        units = grouped['Unit'].to_numpy()
+        result['Unit'] = dictionaries.decode('unit', np.where(np.isnan(units), -1, units).astype(np.int64))
+    return result[leading + ['_key'] + list(agg_dict)]
+
+
+def aggregate_cumulative(df: pd.DataFrame, trade_type: str) -> pd.DataFrame:
+    """Aggregate one direction's monthly rows into a cumulative frame keyed by _key."""
+    df = pipe(
+        df,
+        clean_hs_codes_fn,
+        strip_strings('Country')
+    )
+    
+    agg_dict = get_trade_agg_dict(trade_type, 'Revenue' in df.columns)
+    return group_by_key(df, [], agg_dict)
+
+
 def calculate_previous_cumulative(previous_df: pd.DataFrame, 
                                    trade_type: str) -> pd.DataFrame:
     direction = 'I' if trade_type == 'import' else 'E'
@@ -32,21 +104,27 @@ def calculate_previous_cumulative(previous_df: pd.DataFrame,
     
     logger.info(f"Calculating {trade_type} cumulative from {len(df):,} records")
     
-    # Use functional composition
-    df = pipe(
-        df,
-        clean_hs_codes_fn,
-        strip_strings('Country'),
-        add_composite_key('HS_Code', 'Country')
-    )
-    
-    agg_dict = get_trade_agg_dict(trade_type, 'Revenue' in df.columns)
-    cumulative = df.groupby('_key', as_index=False).agg(agg_dict)
+    cumulative = aggregate_cumulative(df, trade_type)
     logger.info(f"Result: {len(cumulative):,} unique keys, total value: {cumulative['Value'].sum():,.2f}")
     
     return cumulative
 
 
+def advance_cumulative(previous_cumulative: pd.DataFrame,
+                       monthly_df: pd.DataFrame,
+                       trade_type: str) -> pd.DataFrame:
+    """Cumulative after a month: previous cumulative plus that month's rows."""
+    direction = 'I' if trade_type == 'import' else 'E'
+    monthly = monthly_df[monthly_df['Direction'] == direction] if 'Direction' in monthly_df.columns else monthly_df
+    
+    parts = [df.drop(columns=['_key', 'Direction'], errors='ignore')
+             for df in (previous_cumulative, monthly) if not df.empty]
+    if not parts:
+        return pd.DataFrame()
+    
+    return aggregate_cumulative(pd.concat(parts, ignore_index=True), trade_type)
+
+
 def calculate_monthly_values(current_cumulative: pd.DataFrame,
                              previous_cumulative: pd.DataFrame,
                              trade_type: str,
@@ -58,61 +136,246 @@ def calculate_monthly_values(current_cumulative: pd.DataFrame,
     current_cumulative = pipe(
         current_cumulative.copy(),
         clean_hs_codes_fn,
-        apply_to_column('Country', get_iso2_code),
-        add_composite_key('HS_Code', 'Country')
+        map_column('Country', convert_country_names)
     )
     
     agg_dict = get_trade_agg_dict(trade_type, 'Revenue' in current_cumulative.columns)
-    current_aggregated = current_cumulative.groupby('_key', as_index=False).agg(agg_dict)
-    current_dict = current_aggregated.set_index('_key').to_dict('index')
+    current_aggregated = group_by_key(current_cumulative, [], agg_dict)
     
-    if not previous_cumulative.empty:
-        previous_dict = previous_cumulative.set_index('_key').to_dict('index')
-    else:
-        previous_dict = {}
+    if previous_cumulative.empty:
         logger.info("No previous month data available")
     
-    all_keys = set(current_dict.keys()) | set(previous_dict.keys())
-    
-    monthly_records = []
-    zero_count = 0
-    
-    for key in all_keys:
-        current_values = current_dict.get(key, {})
-        previous_values = previous_dict.get(key, {})
-        
-        monthly_value = current_values.get('Value', 0) - previous_values.get('Value', 0)
-        monthly_quantity = current_values.get('Quantity', 0) - previous_values.get('Quantity', 0)
-        
-        if monthly_value > 0 or monthly_quantity > 0:
-            record = {
-                'Year': year,
-                'Month': month,
-                'Direction': 'I' if trade_type == 'import' else 'E',
-                'HS_Code': current_values.get('HS_Code') or previous_values.get('HS_Code'),
-                'Country': current_values.get('Country') or previous_values.get('Country'),
-                'Value': monthly_value,
-                'Quantity': monthly_quantity,
-                'Unit': current_values.get('Unit') or previous_values.get('Unit', 'pcs')
-            }
-            
-            if trade_type == 'import':
-                record['Revenue'] = current_values.get('Revenue', 0) - previous_values.get('Revenue', 0)
-            
-            monthly_records.append(record)
-        else:
-            zero_count += 1
-    
-    if not monthly_records:
+    measures = ['Value', 'Quantity'] + (['Revenue'] if trade_type == 'import' else [])
+    monthly = difference_cumulatives(current_aggregated, previous_cumulative, measures)
+    
+    keep = (monthly['Value'] > 0) | (monthly['Quantity'] > 0)
+    zero_count = int((~keep).sum())
+    
+    if not keep.any():
         logger.warning(f"No positive monthly records for {trade_type}")
         return pd.DataFrame()
     
-    monthly_df = pd.DataFrame(monthly_records)
+    monthly = monthly[keep]
+    monthly_df = pd.DataFrame({
+        'Year': year,
+        'Month': month,
+        'Direction': 'I' if trade_type == 'import' else 'E',
+        'HS_Code': monthly['HS_Code'].to_numpy(),
+        'Country': monthly['Country'].to_numpy(),
+        'Value': monthly['Value'].to_numpy(),
+        'Quantity': monthly['Quantity'].to_numpy(),
+        'Unit': monthly['Unit'].to_numpy()
+    })
+    if trade_type == 'import':
+        monthly_df['Revenue'] = monthly['Revenue'].to_numpy()
+    
     logger.info(f"Result: {len(monthly_df):,} records (filtered {zero_count:,} zero/negative), total: {monthly_df['Value'].sum():,.2f}")
     
     return monthly_df
 
 
+def stack_directions(frames: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Concatenate per-trade-type frames with a Direction column."""
+    parts = [df.assign(Direction=DIRECTIONS[trade_type])
+             for trade_type, df in frames.items() if df is not None and not df.empty]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def aggregate_directions(df: pd.DataFrame, country_step=strip_strings('Country')) -> pd.DataFrame:
+    """Clean and aggregate rows of both directions by (Direction, _key) in one groupby."""
+    df = pipe(
+        df,
+        clean_hs_codes_fn,
+        country_step
+    )
+    
+    agg_dict = get_trade_agg_dict('import', 'Revenue' in df.columns)
+    return group_by_key(df, ['Direction'], agg_dict)
+
+
+def split_directions(aggregated: pd.DataFrame,
+                     trade_types=tuple(DIRECTIONS)) -> Dict[str, pd.DataFrame]:
+    """Per-trade-type cumulative frames (the calculate_previous_cumulative layout)."""
+    result = {}
+    for trade_type in trade_types:
+        if aggregated.empty:
+            result[trade_type] = pd.DataFrame()
+            continue
+        part = aggregated[aggregated['Direction'] == DIRECTIONS[trade_type]]
+        drop = ['Direction'] + (['Revenue'] if trade_type == 'export' else [])
+        result[trade_type] = part.drop(columns=drop, errors='ignore').reset_index(drop=True)
+    return result
+
+
+def calculate_previous_cumulatives(previous_df: pd.DataFrame,
+                                   trade_types=tuple(DIRECTIONS)) -> Dict[str, pd.DataFrame]:
+    """Previous cumulatives for several directions from one grouped pass."""
+    if previous_df.empty or 'Direction' not in previous_df.columns:
+        return {trade_type: pd.DataFrame() for trade_type in trade_types}
+    
+    wanted = [DIRECTIONS[trade_type] for trade_type in trade_types]
+    df = previous_df[previous_df['Direction'].isin(wanted)]
+    logger.info(f"Calculating {'/'.join(trade_types)} cumulative from {len(df):,} records")
+    
+    return split_directions(aggregate_directions(df) if not df.empty else pd.DataFrame(), trade_types)
+
+
+def aggregate_current(current_cumulatives: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Clean, country-convert and aggregate current cumulatives by (Direction, _key)."""
+    current = stack_directions(current_cumulatives)
+    if current.empty:
+        return pd.DataFrame()
+    return aggregate_directions(current, map_column('Country', convert_country_names))
+
+
+def difference_keys(current_aggregated: pd.DataFrame,
+                    previous_cumulatives: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Per-(Direction, _key) differences before the positive filter."""
+    if current_aggregated.empty:
+        return pd.DataFrame()
+    
+    previous = stack_directions(previous_cumulatives)
+    return difference_cumulatives(current_aggregated, previous,
+                                  ['Value', 'Quantity', 'Revenue'], key=DIRECTION_KEY)
+
+
+def monthly_from_differences(differences: pd.DataFrame, year: int, month: int) -> pd.DataFrame:
+    """Monthly rows from difference_keys output: positive deltas, imports first."""
+    if differences.empty:
+        return pd.DataFrame()
+    
+    keep = (differences['Value'] > 0) | (differences['Quantity'] > 0)
+    zero_count = int((~keep).sum())
+    
+    order = {direction: i for i, direction in enumerate(DIRECTIONS.values())}
+    monthly = differences[keep]
+    monthly = monthly.iloc[np.argsort(monthly['Direction'].map(order).to_numpy(), kind='stable')]
+    
+    is_import = (monthly['Direction'] == DIRECTIONS['import']).to_numpy()
+    monthly_df = pd.DataFrame({
+        'Year': year,
+        'Month': month,
+        'Direction': monthly['Direction'].to_numpy(),
+        'HS_Code': monthly['HS_Code'].to_numpy(),
+        'Country': monthly['Country'].to_numpy(),
+        'Value': monthly['Value'].to_numpy(),
+        'Quantity': monthly['Quantity'].to_numpy(),
+        'Unit': monthly['Unit'].to_numpy()
+    })
+    if is_import.any():
+        monthly_df['Revenue'] = np.where(is_import, monthly['Revenue'].to_numpy(), np.nan)
+    
+    logger.info(f"Result: {len(monthly_df):,} records (filtered {zero_count:,} zero/negative), "
+                f"total: {monthly_df['Value'].sum():,.2f}")
+    
+    return monthly_df
+
+
+def difference_combined(current_aggregated: pd.DataFrame,
+                        previous_cumulatives: Dict[str, pd.DataFrame],
+                        year: int,
+                        month: int) -> pd.DataFrame:
+    """Monthly rows from aggregated current cumulatives (see aggregate_current)."""
+    return monthly_from_differences(difference_keys(current_aggregated, previous_cumulatives), year, month)
+
+
+def calculate_monthly_combined(current_cumulatives: Dict[str, Optional[pd.DataFrame]],
+                               previous_cumulatives: Dict[str, pd.DataFrame],
+                               year: int,
+                               month: int) -> pd.DataFrame:
+    """Monthly values for imports and exports in one pass.
+    
+    Both current cumulatives are cleaned, country-converted and aggregated
+    together by (Direction, _key), then differenced against the stacked
+    previous cumulatives. Revenue is kept for imports only (NaN for
+    exports). The output matches combine_import_export applied to the
+    per-direction calculate_monthly_values results.
+    """
+    logger.info("Calculating monthly import/export values")
+    return difference_combined(aggregate_current(current_cumulatives), previous_cumulatives, year, month)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """Element-wise Python truthiness ('' / None / 0 are False, NaN is True)."""
+    return values.astype(object).astype(bool)
+
+
+def _take(frame: pd.DataFrame, column: str, positions: np.ndarray, fill) -> np.ndarray:
+    """Column values at positions, with fill where the position is -1 or the column is absent."""
+    if column not in frame.columns or len(frame) == 0:
+        return np.full(len(positions), fill, dtype=object if fill is None else None)
+    values = frame[column].to_numpy()
+    return np.where(positions >= 0, values[positions], fill)
+
+
+def difference_cumulatives(current: pd.DataFrame,
+                           previous: pd.DataFrame,
+                           measures: list,
+                           key: Union[str, List[str]] = '_key',
+                           attributes: dict = None) -> pd.DataFrame:
+    """Subtract previous from current cumulative aggregates, aligned on key.
+    
+    Keys are the outer join of both frames (current order first) and are
+    returned as the leading column(s). A key missing on one side contributes
+    0 to each measure. Attribute columns take the current value when present
+    and truthy, otherwise the previous one, otherwise the given default.
+    """
+    if attributes is None:
+        attributes = {'HS_Code': None, 'Country': None, 'Unit': 'pcs'}
+    
+    key_columns = [key] if isinstance(key, str) else list(key)
+    cur_keys, prev_keys = _packed_keys(current, previous, key_columns)
+    
+    keys = cur_keys.append(prev_keys[~prev_keys.isin(cur_keys)])
+    cur_pos = cur_keys.get_indexer(keys)
+    prev_pos = prev_keys.get_indexer(keys)
+    
+    result = {}
+    
+    for column in key_columns:
+        result[column] = np.where(cur_pos >= 0, _take(current, column, cur_pos, None),
+                                  _take(previous, column, prev_pos, None))
+    
+    for column, default in attributes.items():
+        cur_values = _take(current, column, cur_pos, None)
+        fallback = _take(previous, column, prev_pos, default).astype(object)
+        use_current = (cur_pos >= 0) & _truthy(cur_values)
+        result[column] = np.where(use_current, cur_values.astype(object), fallback)
+    
+    for column in measures:
+        result[column] = _take(current, column, cur_pos, 0) - _take(previous, column, prev_pos, 0)
+    
+    return pd.DataFrame(result)
+
+
+def _packed_keys(current: pd.DataFrame, previous: pd.DataFrame,
+                 key_columns: List[str]) -> tuple:
+    """Key indexes for both frames; multi-column keys are packed into one integer."""
+    if len(key_columns) == 1:
+        column = key_columns[0]
+        return (pd.Index(current[column] if column in current.columns else []),
+                pd.Index(previous[column] if column in previous.columns else []))
+    
+    split = len(current) if not current.empty else 0
+    frames = [df for df in (current, previous) if not df.empty]
+    if frames and key_columns == DIRECTION_KEY and all({'HS_Code', 'Country'} <= set(df.columns) for df in frames):
+        # (Direction, interned HS|Country id) instead of hashing the _key strings
+        directions, uniques = pd.factorize(pd.concat([df['Direction'] for df in frames], ignore_index=True))
+        dictionaries = active_dictionaries()
+        ids = np.concatenate([key_ids(df, dictionaries) for df in frames])
+        packed = ids * (len(uniques) + 1) + (directions + 1)
+        return pd.Index(packed[:split]), pd.Index(packed[split:])
+    
+    frames = [df[key_columns] for df in frames]
+    both = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=key_columns)
+    packed = np.zeros(len(both), dtype='int64')
+    for column in key_columns:
+        codes, uniques = pd.factorize(both[column])
+        packed = packed * (len(uniques) + 1) + (codes + 1)
+    
+    return pd.Index(packed[:split]), pd.Index(packed[split:])
+
+
 def process_trade_type(
     current_cumulative: pd.DataFrame,
     previous_filtered: pd.DataFrame,
@@ -1,13 +1,14 @@
 """Clean and standardize country codes."""
 import pandas as pd
 import pycountry
-from difflib import SequenceMatcher
 import re
 import logging
 from functools import lru_cache
 from typing import Optional
 
 from .config import CUSTOM_COUNTRY_MAPPINGS, COUNTRY_NAME_NORMALIZATIONS
+from .country_index import get_country_index, country_index_version
+from ..core.utils import apply_unique, persistent_memo
 
 logger = logging.getLogger(__name__)
 
@@ -28,24 +29,30 @@ def normalize_country_name(name: str) -> Optional[str]:
 
 def fuzzy_match_country(name: str, threshold: float = 0.85) -> Optional[str]:
     """Find country using fuzzy string matching."""
-    name_lower = name.lower()
-    
-    def get_best_ratio(country):
-        ratios = [SequenceMatcher(None, name_lower, country.name.lower()).ratio()]
-        if hasattr(country, 'common_name'):
-            ratios.append(SequenceMatcher(None, name_lower, country.common_name.lower()).ratio())
-        return max(ratios)
-    
     try:
-        best_match = max(pycountry.countries, key=get_best_ratio)
-        if get_best_ratio(best_match) >= threshold:
-            return best_match.alpha_2
-        return None
+        return get_country_index().fuzzy_lookup(name, threshold=threshold)
     except Exception as e:
         logger.error(f"Error in fuzzy matching for '{name}': {e}")
         return None
 
 
+@persistent_memo(version=country_index_version)
+def _resolve_country_fallback(normalized: str) -> Optional[str]:
+    """Slow path for names missing from the index: fuzzy, then pycountry search."""
+    code = fuzzy_match_country(normalized)
+    if code:
+        return code
+    
+    try:
+        results = pycountry.countries.search_fuzzy(normalized)
+        if results:
+            return results[0].alpha_2
+    except (LookupError, AttributeError):
+        pass
+    
+    return None
+
+
 @lru_cache(maxsize=512)
 def get_iso2_code(country_name: str) -> str:
     """Get ISO 3166-1 alpha-2 code for country name."""
@@ -61,21 +68,11 @@ def get_iso2_code(country_name: str) -> str:
     if not normalized:
         return original_name
     
-    try:
-        country = pycountry.countries.get(name=normalized)
-        if country:
-            return country.alpha_2
-    except (LookupError, AttributeError):
-        pass
-    
-    try:
-        results = pycountry.countries.search_fuzzy(normalized)
-        if results:
-            return results[0].alpha_2
-    except (LookupError, AttributeError):
-        pass
+    code = get_country_index().lookup(normalized)
+    if code:
+        return code
     
-    code = fuzzy_match_country(normalized)
+    code = _resolve_country_fallback(normalized)
     if code:
         return code
     
@@ -83,6 +80,16 @@ def get_iso2_code(country_name: str) -> str:
     return original_name
 
 
+def convert_country_names(names: pd.Series) -> pd.Series:
+    """Map a Series of country names to ISO-2 codes via the country index."""
+    index = get_country_index()
+    codes = index.lookup_series(names).astype(object)
+    misses = codes.isna() & names.notna()
+    if misses.any():
+        codes[misses] = apply_unique(names[misses], get_iso2_code)
+    return codes.where(names.notna(), names)
+
+
 def clean_country_codes(df: pd.DataFrame) -> pd.DataFrame:
     """Convert all country names to ISO-2 codes."""
     if 'Country' not in df.columns:
@@ -96,7 +103,7 @@ def clean_country_codes(df: pd.DataFrame) -> pd.DataFrame:
     if already_iso2:
         logger.info("Countries already in ISO-2 format")
     else:
-        df['Country'] = df['Country'].apply(get_iso2_code)
+        df['Country'] = convert_country_names(df['Country'])
         
         df.loc[df['Country'] == 'Namibia', 'Country'] = 'NA'
         logger.info(f"Converted countries to ISO-2: {df['Country'].nunique()} unique codes")
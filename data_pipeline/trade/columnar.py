@@ -0,0 +1,145 @@
+"""Columnar mirror of a clustered history CSV for indexed queries.
+
+Next to each history CSV written by write_history, the store keeps one
+.npy file per column under STORE_DIR_NAME/columns/<csv name>, in the CSV's
+row order:
+
+- period: fiscal period ordinal (int32). Rows are in clustered order
+  (see history_index), so a year/month range is a searchsorted slice.
+- direction, hs, country, unit: integer codes into sorted dictionaries
+  (<name>_dict.npy). HS codes are normalized, and their dictionary is
+  sorted as strings, so an HS prefix is a contiguous code range.
+- value, quantity, revenue: float64 measures.
+- blocks: (period, direction code, start, stop) of every contiguous
+  (period, direction) block. Within a block rows are sorted by HS code, so
+  an HS prefix inside a block is another binary search.
+
+Columns are memory-mapped on load, so a query only touches the pages of
+its slice. meta.json records the size of the CSV it mirrors; a mirror that
+no longer matches is rebuilt from the CSV on first use.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import HISTORY_CSV_DTYPES
+from .hs_codes import normalize_hs_codes
+from .periods import fiscal_period
+from .store import store_dir
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_DIR_NAME = 'columns'
+COLUMNAR_FORMAT_VERSION = 1
+DICTIONARY_COLUMNS = {'direction': 'Direction', 'hs': 'HS_Code', 'country': 'Country', 'unit': 'Unit'}
+MEASURE_COLUMNS = {'value': 'Value', 'quantity': 'Quantity', 'revenue': 'Revenue'}
+
+
+def columns_dir(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return store_dir(csv_path) / COLUMNS_DIR_NAME / csv_path.name
+
+
+def _encode(values: pd.Series, normalize=None):
+    """Codes into the string-sorted dictionary of distinct values (-1 for missing)."""
+    codes, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=object).astype(str)
+    if normalize is not None:
+        labels = normalize(labels)
+    labels = labels.to_numpy().astype('U')
+
+    dictionary, inverse = np.unique(labels, return_inverse=True)
+    # The appended -1 maps missing values (code -1) to -1
+    mapped = np.append(inverse.ravel(), -1)[codes]
+    dtype = np.int16 if len(dictionary) < np.iinfo(np.int16).max else np.int32
+    return mapped.astype(dtype), dictionary
+
+
+def _blocks(periods: np.ndarray, directions: np.ndarray, hs: np.ndarray) -> np.ndarray:
+    """(period, direction, start, stop) rows of each (period, direction) block."""
+    if len(periods) == 0:
+        return np.zeros((0, 4), dtype=np.int64)
+    boundary = np.ones(len(periods), dtype=bool)
+    boundary[1:] = (periods[1:] != periods[:-1]) | (directions[1:] != directions[:-1])
+    starts = np.flatnonzero(boundary)
+    stops = np.append(starts[1:], len(periods))
+
+    unsorted = (hs[1:] < hs[:-1]) & ~boundary[1:]
+    if unsorted.any():
+        raise ValueError("History rows are not clustered by HS code; use history_index.cluster_history")
+    return np.column_stack([periods[starts], directions[starts], starts, stops]).astype(np.int64)
+
+
+def write_columns(df: pd.DataFrame, csv_path: Path) -> Path:
+    """Write the columnar mirror of a clustered history frame saved at csv_path."""
+    directory = columns_dir(csv_path)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    meta = {
+        'version': COLUMNAR_FORMAT_VERSION,
+        'size': Path(csv_path).stat().st_size,
+        'rows': len(df),
+    }
+
+    periods = fiscal_period(df['Year'], df['Month']) if not df.empty else pd.Series([], dtype='int64')
+    np.save(directory / 'period.npy', periods.to_numpy().astype(np.int32))
+
+    for name, column in DICTIONARY_COLUMNS.items():
+        values = df[column] if column in df.columns else pd.Series([None] * len(df), dtype=object)
+        codes, dictionary = _encode(values, normalize_hs_codes if name == 'hs' else None)
+        np.save(directory / f"{name}.npy", codes)
+        np.save(directory / f"{name}_dict.npy", dictionary)
+
+    np.save(directory / 'blocks.npy', _blocks(np.load(directory / 'period.npy'),
+                                              np.load(directory / 'direction.npy'),
+                                              np.load(directory / 'hs.npy')))
+
+    for name, column in MEASURE_COLUMNS.items():
+        values = pd.to_numeric(df[column], errors='coerce') if column in df.columns \
+            else pd.Series(np.nan, index=df.index)
+        np.save(directory / f"{name}.npy", values.to_numpy(dtype=np.float64))
+
+    tmp_path = directory / 'meta.tmp'
+    tmp_path.write_text(json.dumps(meta), encoding='utf-8')
+    tmp_path.replace(directory / 'meta.json')
+
+    logger.info(f"Wrote columnar mirror of {Path(csv_path).name}: {len(df):,} rows")
+    return directory
+
+
+def load_columns(csv_path: Path, rebuild: bool = True) -> Optional[Dict]:
+    """Memory-mapped columns and sorted dictionaries of a history CSV.
+
+    A missing or stale mirror is rebuilt from the CSV when rebuild is True,
+    otherwise None is returned.
+    """
+    csv_path = Path(csv_path)
+    directory = columns_dir(csv_path)
+    meta_path = directory / 'meta.json'
+
+    meta = None
+    if meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable columnar mirror of {csv_path.name}: {e}")
+
+    if meta is None or meta.get('version') != COLUMNAR_FORMAT_VERSION or meta.get('size') != csv_path.stat().st_size:
+        if not rebuild:
+            return None
+        logger.info(f"Columnar mirror of {csv_path.name} missing or stale, rebuilding")
+        from .history_index import cluster_history
+        write_columns(cluster_history(pd.read_csv(csv_path, encoding='utf-8-sig', dtype=HISTORY_CSV_DTYPES)), csv_path)
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+
+    columns = {name: np.load(directory / f"{name}.npy", mmap_mode='r')
+               for name in ['period', 'blocks', *DICTIONARY_COLUMNS, *MEASURE_COLUMNS]}
+    columns['dictionaries'] = {name: np.load(directory / f"{name}_dict.npy", mmap_mode='r')
+                               for name in DICTIONARY_COLUMNS}
+    columns['rows'] = meta['rows']
+    return columns
@@ -0,0 +1,205 @@
+"""Persistent full-text index over commodity descriptions.
+
+FTS workbooks carry a description per HS code (the Commodity column), but
+done.csv does not keep it. Every processed workbook folds its (HS code,
+description) pairs into an inverted index, token -> HS codes, saved as
+JSON in the store next to the history. A code whose description changes is
+re-indexed under its latest description.
+
+Example:
+    from data_pipeline.trade import search_commodities
+
+    search_commodities('data/done.csv', 'solar')         # codes with a token starting 'solar'
+    search_commodities('data/done.csv', 'solar cell', prefix=False)
+
+Query tokens are AND-ed; with prefix=True the last one also matches longer
+tokens ('sol' finds 'solar'). The sorted token list makes a prefix lookup
+two binary searches, and the loaded index is kept per process until the
+file changes.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .hs_codes import normalize_hs_codes
+from .store import store_dir
+
+logger = logging.getLogger(__name__)
+
+COMMODITY_INDEX_NAME = 'commodities.json'
+COMMODITY_INDEX_VERSION = 1
+STOPWORDS = frozenset({'and', 'or', 'of', 'the', 'for', 'in', 'on', 'with', 'not', 'other', 'than', 'nes', 'etc'})
+
+_LOADED: Dict[Path, Tuple[float, 'CommodityIndex']] = {}
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase alphanumeric tokens of a description, without stopwords."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return []
+    tokens = re.findall(r'[a-z0-9]+', str(text).casefold())
+    return [token for token in tokens if len(token) > 1 and token not in STOPWORDS]
+
+
+def commodity_descriptions(frames: Iterable[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Distinct (HS_Code, Commodity) pairs of cumulative frames, HS codes normalized."""
+    parts = [df[['HS_Code', 'Commodity']] for df in frames
+             if df is not None and not df.empty and {'HS_Code', 'Commodity'} <= set(df.columns)]
+    if not parts:
+        return pd.DataFrame(columns=['HS_Code', 'Commodity'])
+
+    pairs = pd.concat(parts, ignore_index=True).dropna()
+    pairs = pd.DataFrame({
+        'HS_Code': normalize_hs_codes(pairs['HS_Code']).to_numpy(),
+        'Commodity': pairs['Commodity'].astype(str).str.strip().to_numpy(),
+    })
+    pairs = pairs[pairs['Commodity'] != '']
+    # Later rows win, like a republished description
+    return pairs.drop_duplicates('HS_Code', keep='last').reset_index(drop=True)
+
+
+class CommodityIndex:
+    """Inverted index token -> HS codes over the latest description of each code."""
+
+    def __init__(self, descriptions: Optional[Dict[str, str]] = None,
+                 postings: Optional[Dict[str, Iterable[str]]] = None):
+        self.descriptions: Dict[str, str] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self._tokens: Optional[np.ndarray] = None
+
+        if postings is not None:
+            self.descriptions = dict(descriptions or {})
+            self.postings = {token: set(codes) for token, codes in postings.items()}
+        else:
+            for code, text in (descriptions or {}).items():
+                self._add(code, text)
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    def _add(self, code: str, text: str):
+        self.descriptions[code] = text
+        for token in set(tokenize(text)):
+            self.postings.setdefault(token, set()).add(code)
+
+    def _remove(self, code: str):
+        for token in set(tokenize(self.descriptions.pop(code, ''))):
+            codes = self.postings.get(token)
+            if codes is not None:
+                codes.discard(code)
+                if not codes:
+                    del self.postings[token]
+
+    def update(self, descriptions: pd.DataFrame) -> int:
+        """Index (HS_Code, Commodity) pairs; returns the number of new or changed codes."""
+        changed = 0
+        for code, text in zip(descriptions['HS_Code'], descriptions['Commodity']):
+            if self.descriptions.get(code) == text:
+                continue
+            self._remove(code)
+            self._add(code, text)
+            changed += 1
+        if changed:
+            self._tokens = None
+        return changed
+
+    def _prefix_codes(self, prefix: str) -> Set[str]:
+        if self._tokens is None:
+            self._tokens = np.array(sorted(self.postings), dtype='U')
+        lo = int(np.searchsorted(self._tokens, prefix, side='left'))
+        hi = int(np.searchsorted(self._tokens, prefix + '\uffff', side='left'))
+        codes = set()
+        for token in self._tokens[lo:hi]:
+            codes |= self.postings[str(token)]
+        return codes
+
+    def search(self, text: str, prefix: bool = True) -> List[str]:
+        """Sorted HS codes whose description contains every query token."""
+        terms = tokenize(text)
+        result = None
+        for position, term in enumerate(terms):
+            if prefix and position == len(terms) - 1:
+                codes = self._prefix_codes(term)
+            else:
+                codes = self.postings.get(term, set())
+            result = set(codes) if result is None else result & codes
+            if not result:
+                return []
+        return sorted(result) if result is not None else []
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': COMMODITY_INDEX_VERSION,
+            'descriptions': self.descriptions,
+            'postings': {token: sorted(codes) for token, codes in self.postings.items()},
+        }, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'CommodityIndex':
+        data = json.loads(text)
+        if data.get('version') != COMMODITY_INDEX_VERSION:
+            raise ValueError(f"Unsupported commodity index version: {data.get('version')}")
+        return cls(data['descriptions'], data['postings'])
+
+
+def commodity_index_path(history_path: Path) -> Path:
+    return store_dir(history_path) / COMMODITY_INDEX_NAME
+
+
+def load_commodity_index(history_path: Path) -> CommodityIndex:
+    """The stored index (empty if missing or unreadable), cached until the file changes."""
+    path = commodity_index_path(history_path).resolve()
+    if not path.exists():
+        return CommodityIndex()
+
+    mtime = path.stat().st_mtime
+    cached = _LOADED.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        index = CommodityIndex.from_json(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable commodity index {path.name}: {e}")
+        return CommodityIndex()
+
+    _LOADED[path] = (mtime, index)
+    return index
+
+
+def save_commodity_index(history_path: Path, index: CommodityIndex) -> Path:
+    path = commodity_index_path(history_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(index.to_json(), encoding='utf-8')
+    tmp_path.replace(path)
+    _LOADED[path.resolve()] = (path.stat().st_mtime, index)
+    return path
+
+
+def update_commodity_index(history_path: Path, descriptions: pd.DataFrame) -> CommodityIndex:
+    """Fold a run's (HS_Code, Commodity) pairs into the stored index."""
+    index = load_commodity_index(history_path)
+    changed = index.update(descriptions)
+    if changed:
+        save_commodity_index(history_path, index)
+        logger.info(f"Indexed {changed:,} new or changed commodity descriptions ({len(index):,} HS codes)")
+    return index
+
+
+def search_commodities(history_path: Path, text: str, prefix: bool = True) -> List[str]:
+    """HS codes whose commodity description matches every token of text.
+
+    Args:
+        history_path: History CSV (done.csv) whose store holds the index.
+        text: Query, e.g. 'solar' or 'solar cell'.
+        prefix: Let the last query token match longer tokens.
+    """
+    return load_commodity_index(history_path).search(text, prefix)
@@ -71,6 +71,9 @@ COUNTRY_NAME_NORMALIZATIONS: Dict[str, str] = {
     'Cape Verde': 'Cabo Verde',
 }
 
+# Fiscal year runs Shrawan (4) .. Ashad (3)
+FISCAL_YEAR_START_MONTH = 4
+
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / 'data'
 
@@ -82,8 +85,66 @@ UPDATED_CSV_NAME = 'doneupdated.csv'
 CUMULATIVE_CSV = 'ashwin_cumulative.csv'
 MONTHLY_CSV = 'ashwin_monthly.csv'
 
+# Derived data (snapshots, indexes) kept next to the history CSV
+STORE_DIR_NAME = '.trade_store'
+
 EXPECTED_COLUMNS = ['Year', 'Month', 'Direction', 'HS_Code', 'Country', 
                    'Value', 'Quantity', 'Unit', 'Revenue']
 
+# Parse schema for cumulative CSV inputs: HS codes keep their leading zeros
+CUMULATIVE_CSV_DTYPES = {'HS_Code': str, 'Direction': 'category', 'Country': 'category', 'Unit': str}
+CUMULATIVE_MEASURES = ['Value', 'Quantity', 'Revenue']
+# Parse schema for done.csv history: read HS codes as written, not as integers
+HISTORY_CSV_DTYPES = {'HS_Code': str}
+
 IMPORT_SHEET_KEYWORDS = ['4', 'import', 'table 4']
-EXPORT_SHEET_KEYWORDS = ['6', 'export', 'table 6']
\ No newline at end of file
+EXPORT_SHEET_KEYWORDS = ['6', 'export', 'table 6']
+
+HEADER_SCAN_ROWS = 10
+
+TRADE_HEADER_SIGNATURE = {
+    'fields': {
+        'HS_Code': r'hscode|hs_code|code|hs',
+        'Commodity': r'description|commodity|item',
+        'Country': r'partner|country|countries',
+        'Unit': r'^unit$',
+        'Quantity': r'quantity',
+        'Value': r'value',
+        'Revenue': r'revenue',
+    },
+    'required': ['HS_Code'],
+}
+# Summary tables read from the same FTS workbook as Tables 4/6, by name.
+# Sheets are matched by keyword (Table 4/6 sheets excluded) and parsed with
+# the header signature; the first required field is the row key.
+SUMMARY_TABLES = {
+    'by_country': {
+        'keywords': ['country', 'direction'],
+        'signature': {
+            'fields': {
+                'Country': r'partner|country|countries',
+                'Import': r'import',
+                'Export': r'export',
+                'Total': r'total_trade|^total$',
+                'Balance': r'balance|deficit',
+            },
+            'required': ['Country'],
+        },
+    },
+    'by_commodity_group': {
+        'keywords': ['group', 'sitc', 'section'],
+        'signature': {
+            'fields': {
+                'Group': r'group|section|sitc|description|commodity',
+                'Import': r'import',
+                'Export': r'export',
+                'Total': r'total_trade|^total$',
+                'Balance': r'balance|deficit',
+            },
+            'required': ['Group'],
+        },
+    },
+}
+
+# HS digit levels kept in the rollup cube (chapter, heading, subheading)
+ROLLUP_HS_LEVELS = (2, 4, 6)
@@ -0,0 +1,159 @@
+"""Precomputed country lookup index for ISO-2 resolution.
+
+The index maps normalized aliases (official, common and short names,
+alpha-2/alpha-3 codes, CUSTOM_COUNTRY_MAPPINGS and
+COUNTRY_NAME_NORMALIZATIONS) to ISO-2 codes. It is built once from
+pycountry and saved as JSON in the cache directory, keyed by a version of
+the mapping tables, so later runs load it in milliseconds instead of
+touching pycountry's search index.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+import pycountry
+
+from .config import CUSTOM_COUNTRY_MAPPINGS, COUNTRY_NAME_NORMALIZATIONS
+from ..core.utils import FuzzyMatcher, mapping_version
+from ..core.utils.persistent_cache import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def normalize_country_key(name) -> str:
+    """Casefold, fold accents, drop [bracketed] notes and punctuation."""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = re.sub(r'\[.*?\]', ' ', text)
+    text = re.sub(r"[^\w]+", ' ', text)
+    return ' '.join(text.split())
+
+
+def _strip_parenthetical(name: str) -> str:
+    return re.sub(r'\(.*?\)', ' ', name)
+
+
+class CountryIndex:
+    """Alias -> ISO-2 lookup with O(1) exact hits and indexed fuzzy hits."""
+
+    def __init__(self, aliases: Dict[str, str], version: str = ''):
+        self.aliases = aliases
+        self.version = version
+        self._matcher: Optional[FuzzyMatcher] = None
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+    def lookup(self, name) -> Optional[str]:
+        """Exact lookup on the normalized name."""
+        if pd.isna(name):
+            return None
+        return self.aliases.get(normalize_country_key(name))
+
+    def fuzzy_lookup(self, name, threshold: float = 0.85) -> Optional[str]:
+        """Best fuzzy match among name aliases (codes excluded)."""
+        if self._matcher is None:
+            self._matcher = FuzzyMatcher(
+                {key: code for key, code in self.aliases.items() if len(key) > 3},
+                normalizer=normalize_country_key
+            )
+        return self._matcher.best(name, threshold=threshold)
+
+    def lookup_series(self, names: pd.Series) -> pd.Series:
+        """Exact lookup for a whole Series (misses become NaN)."""
+        keys = names.dropna().unique()
+        return names.map({name: self.lookup(name) for name in keys})
+
+    def to_json(self) -> str:
+        return json.dumps({'version': self.version, 'aliases': self.aliases},
+                          ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> 'CountryIndex':
+        data = json.loads(text)
+        return cls(data['aliases'], data.get('version', ''))
+
+
+def country_index_version() -> str:
+    return mapping_version(CUSTOM_COUNTRY_MAPPINGS, COUNTRY_NAME_NORMALIZATIONS,
+                           [getattr(pycountry, '__version__', ''), INDEX_FORMAT_VERSION])
+
+
+def build_country_index() -> CountryIndex:
+    """Build the alias index from pycountry and the custom mapping tables."""
+    aliases: Dict[str, str] = {}
+    stripped: Dict[str, set] = {}
+
+    def add(name, code):
+        key = normalize_country_key(name)
+        if key:
+            aliases.setdefault(key, code)
+        short = normalize_country_key(_strip_parenthetical(str(name)))
+        if short and short != key:
+            stripped.setdefault(short, set()).add(code)
+
+    for name, code in CUSTOM_COUNTRY_MAPPINGS.items():
+        add(name, code)
+
+    countries = list(pycountry.countries)
+    for country in countries:
+        add(country.name, country.alpha_2)
+    for country in countries:
+        for attr in ('common_name', 'official_name'):
+            if hasattr(country, attr):
+                add(getattr(country, attr), country.alpha_2)
+    for country in countries:
+        aliases.setdefault(country.alpha_2.casefold(), country.alpha_2)
+        aliases.setdefault(country.alpha_3.casefold(), country.alpha_2)
+
+    for raw, target in COUNTRY_NAME_NORMALIZATIONS.items():
+        code = aliases.get(normalize_country_key(target)) or aliases.get(normalize_country_key(raw))
+        if code:
+            add(raw, code)
+
+    # Bracket-stripped aliases only where they are unambiguous
+    for short, codes in stripped.items():
+        if len(codes) == 1:
+            aliases.setdefault(short, next(iter(codes)))
+
+    return CountryIndex(aliases, country_index_version())
+
+
+def _index_path(version: str) -> Path:
+    return default_cache_dir() / f"country_index-{version}.json"
+
+
+@lru_cache(maxsize=1)
+def get_country_index() -> CountryIndex:
+    """Load the prebuilt index, building and saving it on first use."""
+    version = country_index_version()
+    path = _index_path(version)
+
+    try:
+        return CountryIndex.from_json(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_country_index()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(index.to_json(), encoding='utf-8')
+        logger.info(f"Built country index: {len(index):,} aliases ({path.name})")
+    except OSError as e:
+        logger.debug(f"Could not save country index: {e}")
+    return index
+
+
+if __name__ == '__main__':
+    index = build_country_index()
+    _index_path(index.version).parent.mkdir(parents=True, exist_ok=True)
+    _index_path(index.version).write_text(index.to_json(), encoding='utf-8')
+    print(f"Wrote {len(index):,} aliases to {_index_path(index.version)}")
@@ -3,98 +3,124 @@
 import pandas as pd
 import logging
 from pathlib import Path
+from typing import Optional, Tuple
 
-from ..core.io import read_csv, save_csv
-from ..core.utils import create_filter, combine_filters
+from ..core.io import read_csv
+from ..core.utils import create_filter, combine_filters, drop_matching_keys
+from .config import FISCAL_YEAR_START_MONTH, CUMULATIVE_CSV_DTYPES, CUMULATIVE_MEASURES, HISTORY_CSV_DTYPES
+from .calculator import DIRECTIONS
+from .periods import PERIOD_COLUMN, add_period_column, fiscal_period, period_slice
+from .history_index import unchanged_fingerprints, write_history
 
 logger = logging.getLogger(__name__)
 
 
 def read_done_csv(csv_path: Path) -> pd.DataFrame:
-    """Read historical done.csv file."""
-    df = read_csv(csv_path)
+    """Read historical done.csv file, sorted on its fiscal period ordinal."""
+    df = add_period_column(read_csv(csv_path, dtype=HISTORY_CSV_DTYPES))
     logger.info(f"Years in done.csv: {sorted(df['Year'].unique().tolist())}")
     return df
 
 
-def filter_prev_data(done_df: pd.DataFrame, year: int, previous_month: int) -> pd.DataFrame:
-    """Filter previous data using functional composition (fiscal year aware)."""
-    year_filter = create_filter('Year', '==', year)
+def _combine_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Sum a chunk's measures per (Direction, HS_Code, Country); other columns keep their first value."""
+    keys = [col for col in ('Direction', 'HS_Code', 'Country') if col in chunk.columns]
+    agg = {col: 'sum' if col in CUMULATIVE_MEASURES else 'first' for col in chunk.columns if col not in keys}
+    return chunk.groupby(keys, as_index=False, sort=False, observed=True, dropna=False).agg(agg)
+
+
+def read_cumulative_csv(csv_path: Path,
+                        chunksize: Optional[int] = None,
+                        encoding: str = 'utf-8-sig') -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Read a cumulative CSV export into (import, export) frames.
     
-    if previous_month >= 4:
-        # Case 1: Mid-year months (4-12)
-        # Fiscal year starts at month 4, so get months from 4 to previous_month
-        fiscal_start_filter = create_filter('Month', '>=', 4)
-        month_filter = create_filter('Month', '<=', previous_month)
-        combined_filter = combine_filters(year_filter, fiscal_start_filter, month_filter)
-        
+    Parses with CUMULATIVE_CSV_DTYPES and splits by Direction in one grouped
+    pass. With chunksize, the file is streamed and each chunk is reduced to
+    one row per (Direction, HS_Code, Country) before the next is read, so
+    memory follows the number of keys rather than the file size.
+    """
+    csv_path = Path(csv_path)
+    header = pd.read_csv(csv_path, encoding=encoding, nrows=0).columns
+    if 'Direction' not in header:
+        raise ValueError("CSV must have 'Direction' column")
+    dtypes = {col: dtype for col, dtype in CUMULATIVE_CSV_DTYPES.items() if col in header}
+    
+    if chunksize:
+        chunks = pd.read_csv(csv_path, encoding=encoding, dtype=dtypes, chunksize=chunksize)
+        df = pd.concat([_combine_chunk(chunk) for chunk in chunks], ignore_index=True)
     else:
-        # Case 2: End-of-year months (1-3)
-        # Get months 4-12 (fiscal year start) AND months 1 to previous_month
-        # Example: For month 2 (Jestha), previous_month=1, get [4-12] + [1]
-        # This requires OR logic: (Month >= 4) OR (Month <= previous_month)
-        
-        # Filter for months >= 4
-        fiscal_start_subset = done_df[(done_df['Year'] == year) & (done_df['Month'] >= 4)]
-        # Filter for months <= previous_month
-        early_months_subset = done_df[(done_df['Year'] == year) & (done_df['Month'] <= previous_month)]
-        # Combine with OR (union)
-        filtered = pd.concat([fiscal_start_subset, early_months_subset]).drop_duplicates()
-        
-        if len(filtered) == 0:
-            logger.warning(f"No data for Year={year}, Months≥4 or ≤{previous_month}")
-        else:
-            months_str = sorted(filtered['Month'].unique())
-            logger.info(f"Filtered {len(filtered):,} records for months {months_str} "
-                       f"(I:{len(filtered[filtered['Direction'] == 'I']):,}, "
-                       f"E:{len(filtered[filtered['Direction'] == 'E']):,})")
-        
+        df = pd.read_csv(csv_path, encoding=encoding, dtype=dtypes)
+    logger.info(f"Read {csv_path.name}: {len(df):,} cumulative records")
+    
+    parts = dict(tuple(df.groupby('Direction', observed=True, sort=False)))
+    frames = {trade_type: parts[direction].reset_index(drop=True) if direction in parts else None
+              for trade_type, direction in DIRECTIONS.items()}
+    return frames['import'], frames['export']
+
+
+def filter_prev_data(done_df: pd.DataFrame, year: int, previous_month: int) -> pd.DataFrame:
+    """Filter previous data using functional composition (fiscal year aware).
+    
+    History sorted on PERIOD_COLUMN (see read_done_csv) is sliced by binary
+    search over fiscal periods; other frames fall back to column filters.
+    """
+    if PERIOD_COLUMN in done_df.columns and done_df[PERIOD_COLUMN].is_monotonic_increasing:
+        filtered = period_slice(done_df, fiscal_period(year, FISCAL_YEAR_START_MONTH),
+                                fiscal_period(year, previous_month))
+        _log_filtered(filtered, year, previous_month)
         return filtered
     
-    # Apply filter for case 1
-    filtered = combined_filter(done_df)
+    year_filter = create_filter('Year', '==', year)
     
-    if len(filtered) == 0:
-        logger.warning(f"No data for Year={year}, Month≥4 and ≤{previous_month}")
+    if previous_month >= 4:
+        # Mid-year months (4-12): fiscal year starts at month 4
+        month_filter = create_filter('Month', '>=', 4) & create_filter('Month', '<=', previous_month)
     else:
-        logger.info(f"Filtered {len(filtered):,} records (I:{len(filtered[filtered['Direction'] == 'I']):,}, "
-                    f"E:{len(filtered[filtered['Direction'] == 'E']):,})")
+        # End-of-year months (1-3): months 4-12 of the fiscal year plus 1..previous_month
+        month_filter = create_filter('Month', '>=', 4) | create_filter('Month', '<=', previous_month)
     
+    filtered = combine_filters(year_filter, month_filter)(done_df)
+    _log_filtered(filtered, year, previous_month)
     return filtered
 
 
+def _log_filtered(filtered: pd.DataFrame, year: int, previous_month: int):
+    if len(filtered) == 0:
+        logger.warning(f"No data for Year={year}, fiscal months up to {previous_month}")
+    else:
+        direction_counts = filtered['Direction'].value_counts()
+        logger.info(f"Filtered {len(filtered):,} records for months {sorted(filtered['Month'].unique())} "
+                    f"(I:{direction_counts.get('I', 0):,}, E:{direction_counts.get('E', 0):,})")
+
+
 def save_updated_csv(
     original_path: Path,
     monthly_df: pd.DataFrame,
     output_name: str = 'doneupdated.csv',
     replace_existing: bool = True
 ) -> Path:
-    """Append monthly data to done.csv, optionally replacing existing year-month data."""
-    done_df = read_csv(original_path)
+    """Append monthly data to done.csv, optionally replacing existing year-month data.
+    
+    The output is clustered by (fiscal period, Direction, HS_Code, Country)
+    and gets a sidecar offset index (see history_index).
+    """
+    done_df = read_csv(original_path, dtype=HISTORY_CSV_DTYPES)
     
     if replace_existing and not monthly_df.empty:
         if all(col in monthly_df.columns for col in ['Year', 'Month', 'Direction']):
-            new_combinations = monthly_df[['Year', 'Month', 'Direction']].drop_duplicates()
+            done_df, removed = drop_matching_keys(done_df, monthly_df, ['Year', 'Month', 'Direction'])
             
-            for _, row in new_combinations.iterrows():
-                year = row['Year']
-                month = row['Month']
-                direction = row['Direction']
-                
-                mask = ((done_df['Year'] == year) & 
-                        (done_df['Month'] == month) & 
-                        (done_df['Direction'] == direction))
-                
-                removed_count = mask.sum()
-                done_df = done_df[~mask]
-                
-                if removed_count > 0:
-                    dir_name = 'Import' if direction == 'I' else 'Export'
-                    logger.info(f"Removed {removed_count:,} {dir_name} records for Year={year}, Month={month}")
+            for (year, month, direction), removed_count in removed.items():
+                dir_name = 'Import' if direction == 'I' else 'Export'
+                logger.info(f"Removed {removed_count:,} {dir_name} records for Year={year}, Month={month}")
     
     updated_df = pd.concat([done_df, monthly_df], ignore_index=True)
     
     logger.info(f"Appended {len(monthly_df):,} new records ({len(done_df):,} -> {len(updated_df):,})")
     
+    # Blocks of months not written keep their fingerprints from the original index
+    months = monthly_df[['Year', 'Month']].drop_duplicates().itertuples(index=False) if not monthly_df.empty else []
+    known = unchanged_fingerprints(original_path, months)
+    
     output_path = original_path.parent / output_name
-    return save_csv(updated_df, output_path, "Updated CSV")
+    return write_history(updated_df, output_path, "Updated CSV", known)
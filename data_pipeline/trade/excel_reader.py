@@ -3,17 +3,20 @@
 import pandas as pd
 import logging
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from ..core.io import BaseExcelReader
 from ..core.utils import (
-    find_data_start_row,
     find_target_sheet,
-    standardize_column_names,
-    remove_total_rows
+    remove_total_rows,
+    detect_header_row,
+    frame_from_header_row
 )
+from ..core.utils.header_detector import map_header_columns, normalize_header_cells
 from ..core.utils.dataframe_transforms import to_numeric_safe
-from .config import IMPORT_SHEET_KEYWORDS, EXPORT_SHEET_KEYWORDS
+from .config import (
+    IMPORT_SHEET_KEYWORDS, EXPORT_SHEET_KEYWORDS, HEADER_SCAN_ROWS, TRADE_HEADER_SIGNATURE, SUMMARY_TABLES
+)
 from .header_parser import extract_header_metadata
 
 logger = logging.getLogger(__name__)
@@ -34,6 +37,76 @@ class TradeExcelReader(BaseExcelReader):
         """Read export data from Excel file (Table 6)."""
         return self._read_trade_data('export', EXPORT_SHEET_KEYWORDS)
     
+    def read_summary_tables(self, tables: Optional[Dict[str, dict]] = None) -> Dict[str, pd.DataFrame]:
+        """Read the configured summary tables (SUMMARY_TABLES) that this workbook has."""
+        tables = SUMMARY_TABLES if tables is None else tables
+        trade_sheets = {find_target_sheet(self.sheet_names, keywords)
+                        for keywords in (IMPORT_SHEET_KEYWORDS, EXPORT_SHEET_KEYWORDS)}
+        candidates = [name for name in self.sheet_names if name not in trade_sheets]
+        
+        result = {}
+        for name, spec in tables.items():
+            df = self._read_summary_table(name, spec, candidates)
+            if df is not None:
+                result[name] = df
+        return result
+    
+    def _parse_table(self, sheet: str, signature: dict, keep_unmapped: bool = False) -> pd.DataFrame:
+        """Parse a sheet once, locate its header row and keep the signature columns.
+        
+        With keep_unmapped, columns matching no field (or a field already
+        taken by an earlier column) are kept under their normalized header
+        names, as the reader did before header signatures; blank headers
+        are always dropped.
+        """
+        raw = self.xl_file.parse(sheet, header=None)
+        header_row, col_map = detect_header_row(raw.head(HEADER_SCAN_ROWS), signature)
+        if header_row is None:
+            header_row, col_map = raw.index[0], map_header_columns(raw.iloc[0], signature)
+        
+        if keep_unmapped:
+            names = normalize_header_cells(raw.loc[[header_row]]).iloc[0]
+            col_map = {label: col_map.get(label, name) for label, name in names.items() if name}
+        
+        df = frame_from_header_row(raw, header_row)
+        df = df.iloc[:, list(col_map)]
+        df.columns = list(col_map.values())
+        return df
+    
+    def _read_summary_table(self, name: str, spec: dict, sheet_names: list) -> Optional[pd.DataFrame]:
+        """Internal function to read one summary table from Excel."""
+        try:
+            target_sheet = find_target_sheet(sheet_names, spec['keywords'])
+            
+            if not target_sheet:
+                logger.warning(f"No {name} sheet found")
+                return None
+            
+            logger.info(f"Reading {name} from {self.excel_path.name}, sheet: {target_sheet}")
+            
+            df = self._parse_table(target_sheet, spec['signature'])
+            key = spec['signature']['required'][0]
+            if key not in df.columns:
+                logger.warning(f"No {key} column in sheet {target_sheet}")
+                return None
+            
+            df = df[df[key].notna()]
+            df = remove_total_rows(df, key_column=key)
+            df = df.dropna(how='all')
+            
+            for col in df.columns:
+                if col != key:
+                    df[col] = to_numeric_safe(df[col])
+            df[key] = df[key].astype(str).str.strip()
+            
+            logger.info(f"Cleaned {name} data: {len(df):,} records")
+            
+            return df.reset_index(drop=True)
+            
+        except Exception as e:
+            logger.error(f"Error reading {name} data: {e}", exc_info=True)
+            return None
+    
     def _read_trade_data(
         self,
         trade_type: str,
@@ -49,47 +122,7 @@ class TradeExcelReader(BaseExcelReader):
             
             logger.info(f"Reading {trade_type} from {self.excel_path.name}, sheet: {target_sheet}")
             
-            # Find data start row
-            df_sample = pd.read_excel(
-                self.excel_path,
-                sheet_name=target_sheet,
-                nrows=10,
-                header=None
-            )
-            skip_rows = find_data_start_row(df_sample)
-            
-            # Read actual data
-            df = pd.read_excel(
-                self.excel_path,
-                sheet_name=target_sheet,
-                skiprows=skip_rows
-            )
-            
-            df = standardize_column_names(df)
-            
-            df.columns = [
-                str(c).lower().strip().replace(' ', '_').replace('.', '') 
-                for c in df.columns
-            ]
-            
-            col_map = {}
-            for col in df.columns:
-                if any(x in col for x in ['hscode', 'hs_code', 'code', 'hs']):
-                    col_map[col] = 'HS_Code'
-                elif any(x in col for x in ['description', 'commodity', 'item']):
-                    col_map[col] = 'Commodity'
-                elif any(x in col for x in ['partner', 'country', 'countries']):
-                    col_map[col] = 'Country'
-                elif col == 'unit':
-                    col_map[col] = 'Unit'
-                elif 'quantity' in col:
-                    col_map[col] = 'Quantity'
-                elif 'value' in col:
-                    col_map[col] = 'Value'
-                elif 'revenue' in col:
-                    col_map[col] = 'Revenue'
-            
-            df = df.rename(columns=col_map)
+            df = self._parse_table(target_sheet, TRADE_HEADER_SIGNATURE, keep_unmapped=True)
             
             if 'Unit' not in df.columns:
                 df['Unit'] = 'pcs'
@@ -135,3 +168,23 @@ def read_cumulative_excel(excel_path: Path) -> Tuple[Optional[pd.DataFrame], Opt
     reader.close()
     
     return import_df, export_df
+
+
+def read_fts_workbook(excel_path: Path,
+                      summary_tables: Optional[Dict[str, dict]] = None) -> Dict[str, Optional[pd.DataFrame]]:
+    """Import, export and summary tables of an FTS workbook from one opened file.
+    
+    Returns named frames: 'import' and 'export' (None if missing) plus every
+    table of summary_tables (default SUMMARY_TABLES) found in the workbook.
+    
+    Example:
+        tables = read_fts_workbook(Path('data/FTS.xlsx'))
+        tables['by_country']
+    """
+    reader = TradeExcelReader(excel_path)
+    try:
+        frames = {'import': reader.read_import_data(), 'export': reader.read_export_data()}
+        frames.update(reader.read_summary_tables(summary_tables))
+    finally:
+        reader.close()
+    return frames
@@ -0,0 +1,268 @@
+"""Clustered trade history with a sidecar offset index.
+
+History CSVs are written sorted by fiscal period, Direction, HS_Code and
+Country, so every (Year, Month, Direction) group is one contiguous block
+of rows. A small JSON sidecar (<name>.csv.idx) records the row and byte
+range of each block. Readers can then load a fiscal year (or any period
+range) by seeking straight to its bytes instead of parsing and masking the
+whole file.
+
+Each block also carries the fingerprint of its rows (see
+store.history_fingerprint), hashed when the block is written, so the
+fingerprint of any period range is combined from the blocks instead of
+hashing the rows again.
+
+The index stores the size of the CSV it describes. If the CSV is changed
+by anything else, the index no longer matches and readers fall back to a
+full read.
+"""
+
+import json
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core.io import save_csv
+from .columnar import write_columns
+from .config import FISCAL_YEAR_START_MONTH, HISTORY_CSV_DTYPES
+from .hs_codes import normalize_hs_codes
+from .periods import PERIOD_COLUMN, add_period_column, fiscal_period
+from .store import EMPTY_FINGERPRINT, Fingerprint, block_fingerprints, combine_fingerprints, direction_fingerprints
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.idx'
+INDEX_FORMAT_VERSION = 2
+GROUP_COLUMNS = ['Year', 'Month', 'Direction']
+
+BlockKey = Tuple[int, int, str]
+
+
+def index_path(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + INDEX_SUFFIX)
+
+
+def _sort_rank(values: pd.Series, normalize=None) -> np.ndarray:
+    """Integer ranks that order values by their string form (factorize, then sort uniques)."""
+    codes, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=object).astype(str)
+    if normalize is not None:
+        labels = normalize(labels)
+    # Fixed-width unicode sorts several times faster than object strings
+    order = np.argsort(labels.to_numpy().astype('U'), kind='stable')
+    ranks = np.empty(len(order) + 1, dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    ranks[-1] = -1  # missing values (code -1) first
+    return ranks[codes]
+
+
+def cluster_history(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows stably sorted by fiscal period, Direction, normalized HS_Code and Country."""
+    if df.empty:
+        return df
+    keys = [fiscal_period(df['Year'], df['Month']).to_numpy(),
+            _sort_rank(df['Direction']),
+            _sort_rank(df['HS_Code'], normalize_hs_codes),
+            _sort_rank(df['Country'])]
+    return df.iloc[np.lexsort(keys[::-1])].reset_index(drop=True)
+
+
+def _line_offsets(path: Path) -> np.ndarray:
+    """Byte offset of the start of every line, plus the file size."""
+    data = np.fromfile(path, dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate([[0], newlines + 1])
+    if starts[-1] == len(data):
+        return starts
+    return np.concatenate([starts, [len(data)]])
+
+
+def build_index(df: pd.DataFrame, csv_path: Path,
+                known_fingerprints: Optional[Dict[BlockKey, Fingerprint]] = None) -> Dict:
+    """Row and byte ranges and fingerprints of every (Year, Month, Direction) block of a clustered CSV.
+    
+    Blocks listed in known_fingerprints (unchanged since a previous index)
+    keep that fingerprint; the rows of all other blocks are hashed.
+    """
+    known_fingerprints = known_fingerprints or {}
+    csv_path = Path(csv_path)
+    offsets = _line_offsets(csv_path)
+    has_bytes = len(offsets) == len(df) + 2
+    if not has_bytes:
+        logger.warning(f"{csv_path.name} has multi-line fields, index stores row ranges only")
+
+    groups = []
+    if not df.empty:
+        boundary = np.zeros(len(df), dtype=bool)
+        boundary[0] = True
+        for column in GROUP_COLUMNS:
+            values = df[column].astype(str).to_numpy()
+            boundary[1:] |= values[1:] != values[:-1]
+        starts = np.flatnonzero(boundary)
+        stops = np.concatenate([starts[1:], [len(df)]])
+        for start, stop in zip(starts, stops):
+            year, month, direction = df.iloc[start][GROUP_COLUMNS]
+            if pd.isna(year) or pd.isna(month):
+                year, month = -1, FISCAL_YEAR_START_MONTH
+            groups.append([int(year), int(month), str(direction), int(start), int(stop),
+                           int(offsets[start + 1]) if has_bytes else None,
+                           int(offsets[stop + 1]) if has_bytes else None,
+                           known_fingerprints.get((int(year), int(month), str(direction)))])
+        _fill_fingerprints(df, groups)
+
+    return {
+        'version': INDEX_FORMAT_VERSION,
+        'size': csv_path.stat().st_size,
+        'rows': len(df),
+        'header_bytes': int(offsets[1]) if len(offsets) > 1 else 0,
+        'groups': groups,
+    }
+
+
+def _fill_fingerprints(df: pd.DataFrame, groups: List[list]):
+    """Hash the rows of the groups that have no fingerprint yet, in one pass."""
+    pending = [group for group in groups if group[7] is None]
+    if not pending:
+        return
+    lengths = np.array([stop - start for _, _, _, start, stop, *_ in pending])
+    positions = np.concatenate([np.arange(start, stop) for _, _, _, start, stop, *_ in pending])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    for group, fingerprint in zip(pending, block_fingerprints(df.iloc[positions], starts)):
+        group[7] = fingerprint
+
+
+def write_history(df: pd.DataFrame, output_path: Path, description: str = "Updated CSV",
+                  known_fingerprints: Optional[Dict[BlockKey, Fingerprint]] = None) -> Path:
+    """Save a clustered history CSV, its sidecar index and its columnar mirror.
+    
+    known_fingerprints are block fingerprints carried over for blocks the
+    write leaves unchanged (see unchanged_fingerprints).
+    """
+    output_path = Path(output_path)
+    clustered = cluster_history(df.drop(columns=[PERIOD_COLUMN], errors='ignore'))
+    save_csv(clustered, output_path, description)
+
+    index = build_index(clustered, output_path, known_fingerprints)
+    sidecar = index_path(output_path)
+    tmp_path = sidecar.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(index), encoding='utf-8')
+    tmp_path.replace(sidecar)
+
+    logger.info(f"Indexed {len(index['groups']):,} (Year, Month, Direction) blocks of {output_path.name}")
+
+    write_columns(clustered, output_path)
+    return output_path
+
+
+def load_index(csv_path: Path) -> Optional[Dict]:
+    """The sidecar index, or None if missing, unreadable or stale."""
+    csv_path = Path(csv_path)
+    sidecar = index_path(csv_path)
+    if not sidecar.exists() or not csv_path.exists():
+        return None
+
+    try:
+        index = json.loads(sidecar.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable index {sidecar.name}: {e}")
+        return None
+
+    if index.get('version') != INDEX_FORMAT_VERSION or index.get('size') != csv_path.stat().st_size:
+        logger.info(f"Index {sidecar.name} does not match {csv_path.name}, ignoring it")
+        return None
+    return index
+
+
+def _byte_ranges(index: Dict, first: int, last: int,
+                 directions: Optional[Iterable[str]]) -> Optional[List[Tuple[int, int]]]:
+    directions = set(directions) if directions is not None else None
+    ranges = []
+    for year, month, direction, _, _, byte_start, byte_stop, _ in index['groups']:
+        if not first <= fiscal_period(year, month) <= last:
+            continue
+        if directions is not None and direction not in directions:
+            continue
+        if byte_start is None:
+            return None
+        if ranges and ranges[-1][1] == byte_start:
+            ranges[-1] = (ranges[-1][0], byte_stop)
+        else:
+            ranges.append((byte_start, byte_stop))
+    return ranges
+
+
+def read_history_range(csv_path: Path, first: int, last: int,
+                       directions: Optional[Iterable[str]] = None,
+                       encoding: str = 'utf-8-sig') -> pd.DataFrame:
+    """History rows with first <= fiscal period <= last, sorted on PERIOD_COLUMN.
+
+    Uses the sidecar index to read only the matching byte ranges; without a
+    valid index the whole file is read and filtered.
+    """
+    csv_path = Path(csv_path)
+    index = load_index(csv_path)
+    ranges = _byte_ranges(index, first, last, directions) if index else None
+
+    if ranges is None:
+        df = add_period_column(pd.read_csv(csv_path, encoding=encoding, dtype=HISTORY_CSV_DTYPES))
+        mask = df[PERIOD_COLUMN].between(first, last)
+        if directions is not None:
+            mask &= df['Direction'].isin(list(directions))
+        return df[mask]
+
+    with open(csv_path, 'rb') as f:
+        chunks = [f.read(index['header_bytes'])]
+        for start, stop in ranges:
+            f.seek(start)
+            chunks.append(f.read(stop - start))
+
+    df = pd.read_csv(BytesIO(b''.join(chunks)), encoding=encoding, dtype=HISTORY_CSV_DTYPES)
+    logger.info(f"Read {len(df):,} of {index['rows']:,} records from {csv_path.name} via index")
+    return add_period_column(df)
+
+
+def read_fiscal_year(csv_path: Path, year: int) -> pd.DataFrame:
+    """All history rows of one fiscal year (Shrawan .. Ashad)."""
+    first = fiscal_period(year, FISCAL_YEAR_START_MONTH)
+    return read_history_range(csv_path, first, first + 11)
+
+
+def unchanged_fingerprints(csv_path: Path, months: Iterable[Tuple[int, int]]) -> Dict[BlockKey, Fingerprint]:
+    """Block fingerprints of a history's valid index, except the blocks of the given (Year, Month) pairs."""
+    index = load_index(csv_path)
+    if index is None:
+        return {}
+    months = {(int(year), int(month)) for year, month in months}
+    return {(year, month, direction): tuple(fingerprint)
+            for year, month, direction, *_, fingerprint in index['groups'] if (year, month) not in months}
+
+
+def period_fingerprints(csv_path: Path, first: int, last: int,
+                        rows: Optional[pd.DataFrame] = None) -> Dict[str, Fingerprint]:
+    """Fingerprint per Direction of the history rows with first <= fiscal period <= last.
+    
+    Combined from the index blocks when the index is valid; otherwise the
+    rows (read with read_history_range if not given) are hashed.
+    """
+    index = load_index(csv_path)
+    if index is None:
+        if rows is None:
+            rows = read_history_range(csv_path, first, last)
+        return direction_fingerprints(rows)
+
+    blocks = {}
+    for year, month, direction, *_, fingerprint in index['groups']:
+        if first <= fiscal_period(year, month) <= last:
+            blocks.setdefault(direction, []).append(tuple(fingerprint))
+    return {direction: combine_fingerprints(*fingerprints) for direction, fingerprints in blocks.items()}
+
+
+def period_fingerprint(csv_path: Path, first: int, last: int,
+                       rows: Optional[pd.DataFrame] = None) -> Fingerprint:
+    """period_fingerprints of all directions combined."""
+    return combine_fingerprints(EMPTY_FINGERPRINT, *period_fingerprints(csv_path, first, last, rows).values())
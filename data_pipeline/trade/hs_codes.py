@@ -0,0 +1,139 @@
+"""HS code normalization and hierarchy helpers.
+
+HS codes are hierarchical: chapter (2 digits), heading (4), subheading (6)
+and national line (8). History read back from CSV stores them as integers,
+which drops the leading zero of chapters 01-09 ('01012100' -> 1012100).
+Genuine HS codes always have an even number of digits, so an odd-length
+code gets its zero back.
+
+pack_hs_codes stores a code as one int64: its digits left-aligned in
+HS_MAX_DIGITS decimal places, shifted left by HS_LENGTH_BITS, with the digit
+count in the low bits. Leading zeros and the 2/4/6/8-digit level survive
+exactly, and packed codes sort like the digit strings. Grouping and joining
+on packed codes avoids hashing Python strings.
+
+HSIndex answers hierarchical lookups (all codes under a chapter, siblings
+of a subheading) with binary searches over the sorted distinct codes.
+"""
+
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+HS_LEVELS = {2: 'chapter', 4: 'heading', 6: 'subheading', 8: 'national line'}
+HS_MAX_DIGITS = 12
+HS_LENGTH_BITS = 4
+INVALID_HS_CODE = -1
+# '.0' left by float parsing; dots inside a code ('8401.00') are kept
+FLOAT_SUFFIX = r'\.0$'
+
+
+def normalize_hs_codes(codes: pd.Series) -> pd.Series:
+    """HS codes as digit strings, restoring a leading zero lost to integer parsing."""
+    codes = codes.astype(str).str.strip().str.replace(FLOAT_SUFFIX, '', regex=True)
+    odd = codes.str.isdigit() & (codes.str.len() % 2 == 1)
+    return codes.mask(odd, '0' + codes)
+
+
+def canonical_hs_code(code) -> str:
+    """normalize_hs_codes for a single value (e.g. as an Interner label)."""
+    code = re.sub(FLOAT_SUFFIX, '', str(code).strip())
+    return '0' + code if code.isdigit() and len(code) % 2 == 1 else code
+
+
+def pack_hs_codes(codes) -> np.ndarray:
+    """Packed int64 HS codes; INVALID_HS_CODE for missing or non-digit codes.
+
+    Codes are cleaned like clean_hs_codes_fn (stripped, float '.0' removed) but not
+    normalized, so '1' and '01' stay distinct.
+    """
+    # Clean the distinct values only
+    ids, uniques = pd.factorize(pd.Series(codes, dtype=object), use_na_sentinel=False)
+    labels = pd.Series(uniques, dtype=object).astype(str).str.strip().str.replace(FLOAT_SUFFIX, '', regex=True)
+    lengths = labels.str.len().to_numpy(dtype=np.int64)
+    valid = labels.str.fullmatch(r'\d+').to_numpy(dtype=bool) & (lengths <= HS_MAX_DIGITS)
+
+    digits = pd.to_numeric(labels.where(valid, '0')).to_numpy(dtype=np.int64)
+    scale = np.power(10, HS_MAX_DIGITS - np.where(valid, lengths, HS_MAX_DIGITS)).astype(np.int64)
+    packed = np.where(valid, ((digits * scale) << HS_LENGTH_BITS) | lengths, INVALID_HS_CODE)
+    return np.append(packed, INVALID_HS_CODE)[ids]
+
+
+def format_hs_codes(packed) -> np.ndarray:
+    """Digit strings of packed HS codes (None for INVALID_HS_CODE)."""
+    ids, uniques = pd.factorize(np.asarray(packed, dtype=np.int64))
+    lengths = np.where(uniques >= 0, uniques & ((1 << HS_LENGTH_BITS) - 1), 0)
+    digits = (uniques >> HS_LENGTH_BITS) // np.power(10, HS_MAX_DIGITS - lengths).astype(np.int64)
+    labels = np.array([str(value).zfill(length) if code >= 0 else None
+                       for code, value, length in zip(uniques, digits, lengths)] + [None], dtype=object)
+    return labels[ids]
+
+
+def truncate_hs_codes(packed, level: int) -> np.ndarray:
+    """Packed codes cut to their first level digits; shorter and invalid codes are kept."""
+    packed = np.asarray(packed, dtype=np.int64)
+    scale = 10 ** (HS_MAX_DIGITS - level)
+    cut = ((((packed >> HS_LENGTH_BITS) // scale) * scale) << HS_LENGTH_BITS) | level
+    keep = (packed < 0) | ((packed & ((1 << HS_LENGTH_BITS) - 1)) <= level)
+    return np.where(keep, packed, cut)
+
+
+def parent_code(code: str) -> str:
+    """Code one HS level up ('87032390' -> '870323', '84' -> '')."""
+    code = str(code)
+    return code[:max(len(code) - 2, 0)]
+
+
+class HSIndex:
+    """Prefix index over a sorted array of distinct normalized HS codes.
+
+    The codes under any prefix are one contiguous slice of the sorted array,
+    found with two binary searches. Positions in the array double as the
+    integer ids of the columnar HS dictionary, so span() is also the key set
+    of a prefix in the history mirror.
+
+    Example:
+        index = HSIndex(history['HS_Code'])
+        index.under('84')          # every code in chapter 84
+        index.siblings('870323')   # other subheadings of heading 8703
+    """
+
+    def __init__(self, codes, presorted: bool = False):
+        if presorted:
+            self.codes = np.asarray(codes)
+        else:
+            codes = normalize_hs_codes(pd.Series(codes, dtype=object).dropna())
+            self.codes = np.unique(codes.to_numpy().astype('U'))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code) -> bool:
+        lo, hi = self.span(code)
+        return hi > lo and self.codes[lo] == str(code)
+
+    def span(self, prefix) -> Tuple[int, int]:
+        """[lo, hi) positions of the codes starting with prefix."""
+        prefix = str(prefix)
+        lo = int(np.searchsorted(self.codes, prefix, side='left'))
+        hi = int(np.searchsorted(self.codes, prefix + '\uffff', side='left'))
+        return lo, hi
+
+    def under(self, prefix) -> np.ndarray:
+        """All codes starting with prefix."""
+        lo, hi = self.span(prefix)
+        return self.codes[lo:hi]
+
+    def children(self, prefix) -> np.ndarray:
+        """Distinct codes one HS level below prefix ('84' -> headings '8401', ...)."""
+        width = len(str(prefix)) + 2
+        below = self.under(prefix).astype(f'U{width}')  # astype truncates to the prefix
+        return np.unique(below[np.char.str_len(below) == width])
+
+    def siblings(self, code) -> np.ndarray:
+        """Codes at the same level and under the same parent as code, excluding it."""
+        code = str(code)
+        children = self.children(parent_code(code))
+        return children[children != code]
@@ -0,0 +1,141 @@
+"""Incremental reprocessing of republished cumulative workbooks.
+
+Customs often republishes a cumulative workbook with a handful of revised
+rows. After a month is processed, a content hash of every aggregated input
+key (Direction, HS_Code|Country) is stored under STORE_DIR_NAME/inputs
+together with fingerprints of the history the month was built on and of
+the month's written rows. When the same month is processed again against
+that history, only the month's rows for added, changed and removed keys
+are rewritten; all other rows are left as they are.
+
+Months written after the patched one are not re-differenced; their
+snapshots are invalidated as usual.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.io import read_csv
+from ..core.utils import pipe, clean_hs_codes_fn, strip_strings, add_composite_key
+from .calculator import DIRECTION_KEY
+from .config import HISTORY_CSV_DTYPES
+from .store import Fingerprint, store_dir, history_fingerprint, fingerprints_match
+from .history_index import unchanged_fingerprints, write_history
+
+logger = logging.getLogger(__name__)
+
+INPUT_HASH_DIR_NAME = 'inputs'
+HASH_COLUMN = '_hash'
+CHANGE_COLUMN = 'change'
+HASHED_COLUMNS = ['HS_Code', 'Country', 'Value', 'Quantity', 'Unit', 'Revenue']
+
+
+def input_hash_path(history_path: Path, year: int, month: int) -> Path:
+    return store_dir(history_path) / INPUT_HASH_DIR_NAME / f"{int(year)}-{int(month):02d}.pkl"
+
+
+def key_hashes(current_aggregated: pd.DataFrame) -> pd.DataFrame:
+    """One uint64 content hash per (Direction, _key) of an aggregated cumulative."""
+    if current_aggregated.empty:
+        return pd.DataFrame(columns=DIRECTION_KEY + [HASH_COLUMN])
+
+    columns = [col for col in HASHED_COLUMNS if col in current_aggregated.columns]
+    hashes = pd.util.hash_pandas_object(current_aggregated[columns], index=False)
+    return pd.DataFrame({
+        'Direction': current_aggregated['Direction'].to_numpy(),
+        '_key': current_aggregated['_key'].to_numpy(),
+        HASH_COLUMN: hashes.to_numpy()
+    })
+
+
+def month_rows(history: pd.DataFrame, year: int, month: int) -> pd.DataFrame:
+    if history.empty:
+        return history
+    return history[(history['Year'] == year) & (history['Month'] == month)]
+
+
+def save_input_hashes(history_path: Path, year: int, month: int, hashes: pd.DataFrame,
+                      previous_fingerprint: Fingerprint,
+                      month_fingerprint: Fingerprint) -> Path:
+    path = input_hash_path(history_path, year, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    stored = hashes.copy()
+    stored.attrs['previous'] = tuple(previous_fingerprint)
+    stored.attrs['month'] = tuple(month_fingerprint)
+
+    tmp_path = path.with_suffix('.tmp')
+    stored.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+    logger.info(f"Saved input hashes {path.name}: {len(stored):,} keys")
+    return path
+
+
+def load_input_hashes(history_path: Path, year: int, month: int,
+                      previous_fingerprint: Fingerprint,
+                      month_fingerprint: Fingerprint) -> Optional[pd.DataFrame]:
+    """Stored hashes, or None if missing or the history has changed since."""
+    path = input_hash_path(history_path, year, month)
+    if not path.exists():
+        return None
+
+    try:
+        stored = pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable input hashes {path.name}: {e}")
+        return None
+
+    if not (fingerprints_match(stored.attrs.get('previous'), previous_fingerprint)
+            and fingerprints_match(stored.attrs.get('month'), month_fingerprint)):
+        logger.info(f"Input hashes {path.name} do not match history, reprocessing the full month")
+        return None
+
+    return stored
+
+
+def changed_keys(stored: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """(Direction, _key) rows that were added, changed or removed, with a change column."""
+    merged = stored.merge(current, on=DIRECTION_KEY, how='outer',
+                          suffixes=('_stored', ''), indicator=True)
+    change = np.select(
+        [merged['_merge'] == 'right_only', merged['_merge'] == 'left_only',
+         merged[HASH_COLUMN + '_stored'] != merged[HASH_COLUMN]],
+        ['added', 'removed', 'changed'],
+        default=''
+    )
+    result = merged.loc[change != '', DIRECTION_KEY].assign(**{CHANGE_COLUMN: change[change != '']})
+    return result.reset_index(drop=True)
+
+
+def restrict_to_keys(frame: pd.DataFrame, keys: pd.DataFrame) -> pd.DataFrame:
+    """Rows of a (Direction, _key) frame whose key is listed in keys."""
+    if frame.empty:
+        return frame
+    mask = pd.MultiIndex.from_frame(frame[DIRECTION_KEY]).isin(pd.MultiIndex.from_frame(keys[DIRECTION_KEY]))
+    return frame[mask]
+
+
+def patch_month(original_path: Path, patch_df: pd.DataFrame, keys: pd.DataFrame,
+                year: int, month: int, output_name: str = 'doneupdated.csv') -> Path:
+    """Replace one month's rows for the given (Direction, _key) pairs with patch_df."""
+    done_df = read_csv(original_path, dtype=HISTORY_CSV_DTYPES)
+
+    rows = month_rows(done_df, year, month)
+    if not rows.empty and not keys.empty:
+        rows = pipe(rows, clean_hs_codes_fn, strip_strings('Country'), add_composite_key('HS_Code', 'Country'))
+        stale = pd.MultiIndex.from_frame(rows[DIRECTION_KEY]).isin(pd.MultiIndex.from_frame(keys[DIRECTION_KEY]))
+        done_df = done_df.drop(index=rows.index[stale])
+        logger.info(f"Removed {int(stale.sum()):,} stale records for Year={year}, Month={month}")
+
+    updated_df = pd.concat([done_df, patch_df], ignore_index=True) if not patch_df.empty else done_df
+    logger.info(f"Patched {len(keys):,} keys with {len(patch_df):,} records "
+                f"({len(done_df):,} -> {len(updated_df):,})")
+
+    output_path = original_path.parent / output_name
+    return write_history(updated_df, output_path, "Patched CSV",
+                         unchanged_fingerprints(original_path, [(year, month)]))
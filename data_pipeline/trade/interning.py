@@ -0,0 +1,192 @@
+"""Persistent interning dictionaries for HS codes, countries and units.
+
+Each dictionary is an append-only list of distinct values; a value's
+position is its integer id. The lists are saved as JSON under
+STORE_DIR_NAME/dictionaries next to the history, so ids stay stable
+across runs: a value keeps its id forever and new values are appended.
+If another process appended values since they were loaded, save merges
+its new values after those (renumbering only its own new values), and the
+shared per-store instance is reloaded once its files change.
+
+The calculator encodes both the cumulative inputs and the history against
+the active dictionaries and groups and joins on the integer ids. process_data
+and backfill activate the dictionaries of the history they write for the
+duration of the run (a context variable, so concurrent runs on different
+histories do not interfere) and save them at the end. Outside such a scope
+each calculator call interns into a temporary in-memory set.
+
+Example:
+    with use_dictionaries('data/done.csv') as dictionaries:
+        ids = dictionaries.encode('country', frame['Country'])
+        dictionaries.save()
+"""
+
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import STORE_DIR_NAME
+from .hs_codes import canonical_hs_code
+
+logger = logging.getLogger(__name__)
+
+DICTIONARY_DIR_NAME = 'dictionaries'
+INTERNED_FIELDS = {'hs': 'HS_Code', 'country': 'Country', 'unit': 'Unit'}
+# HS codes are interned in canonical form, so 1012100 read back from a CSV and '01012100' share an id
+INTERNED_LABELS = {'hs': canonical_hs_code}
+MISSING_ID = -1
+
+_DICTIONARIES: Dict[Path, 'Dictionaries'] = {}
+_DICTIONARIES_LOCK = threading.Lock()
+_ACTIVE: ContextVar[Optional['Dictionaries']] = ContextVar('trade_dictionaries', default=None)
+
+
+class Interner:
+    """Append-only value -> integer code table (MISSING_ID for missing values).
+
+    label, if given, maps each distinct value to the form that is stored
+    (e.g. str, so values survive a JSON round trip).
+    """
+
+    def __init__(self, values=(), label=None):
+        self.values = pd.Index(list(values), dtype=object)
+        self.label = label
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, values) -> np.ndarray:
+        """Codes for values, adding unseen values at the end."""
+        # Look up the distinct values only
+        ids, uniques = pd.factorize(pd.Index(values, dtype=object))
+        if self.label is not None:
+            uniques = pd.Index([self.label(value) for value in uniques], dtype=object)
+        codes = self.values.get_indexer(uniques)
+        missing = codes < 0
+        if missing.any():
+            self.values = self.values.append(pd.Index(pd.unique(uniques[missing]), dtype=object))
+            codes[missing] = self.values.get_indexer(uniques[missing])
+        return np.append(codes, MISSING_ID).astype(np.int64)[ids]
+
+    def decode(self, codes: np.ndarray, missing=None) -> np.ndarray:
+        """Values for codes, with missing for MISSING_ID."""
+        codes = np.asarray(codes, dtype=np.int64)
+        values = np.append(self.values.to_numpy(dtype=object), np.array([missing], dtype=object))
+        return values[np.where(codes >= 0, codes, len(self.values))]
+
+
+class Dictionaries:
+    """The HS, country and unit interners of one store directory."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory is not None else None
+        self.tables, self._saved, self._mtimes = {}, {}, {}
+        for name in INTERNED_FIELDS:
+            values = self._read(name) if self.directory is not None else []
+            self.tables[name] = Interner(values, label=INTERNED_LABELS.get(name, str))
+            self._saved[name] = len(values)
+            self._mtimes[name] = self._mtime(name)
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _mtime(self, name: str) -> Optional[int]:
+        if self.directory is None or not self._path(name).exists():
+            return None
+        return self._path(name).stat().st_mtime_ns
+
+    def is_stale(self) -> bool:
+        """Whether a dictionary file changed since this instance read or wrote it."""
+        return any(self._mtime(name) != mtime for name, mtime in self._mtimes.items())
+
+    def _read(self, name: str) -> list:
+        path = self._path(name)
+        if not path.exists():
+            return []
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def encode(self, name: str, values) -> np.ndarray:
+        return self.tables[name].intern(values)
+
+    def decode(self, name: str, codes: np.ndarray, missing=None) -> np.ndarray:
+        return self.tables[name].decode(codes, missing)
+
+    def encode_frame(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Ids of every interned column present in a frame, keyed by dictionary name."""
+        return {name: self.encode(name, frame[column])
+                for name, column in INTERNED_FIELDS.items() if column in frame.columns}
+
+    def save(self) -> Optional[Path]:
+        """Append new values to the dictionary files.
+
+        Values another writer appended since this instance loaded a file
+        are kept, and this instance's new values are appended after them
+        (their ids change, so save at the end of a run). Raises ValueError
+        if a file no longer starts with the values this instance loaded,
+        i.e. ids were reassigned behind its back.
+        """
+        if self.directory is None:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        for name, table in self.tables.items():
+            if len(table) == self._saved[name]:
+                continue
+            values = table.values.tolist()
+            loaded = values[:self._saved[name]]
+            stored = self._read(name)
+            if stored[:len(loaded)] != loaded:
+                raise ValueError(f"Dictionary {self._path(name)} was changed by another writer")
+            if stored != values[:len(stored)]:
+                known = set(stored)
+                values = stored + [value for value in values[len(loaded):] if value not in known]
+                table.values = pd.Index(values, dtype=object)
+                logger.info(f"Merged {name} dictionary with {len(stored) - len(loaded):,} values "
+                            f"appended by another writer")
+
+            tmp_path = self._path(name).with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(values, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(self._path(name))
+            logger.info(f"Saved {name} dictionary: {len(values):,} values "
+                        f"({len(values) - self._saved[name]:,} new)")
+            self._saved[name] = len(values)
+            self._mtimes[name] = self._mtime(name)
+        return self.directory
+
+
+def dictionary_dir(history_path: Path) -> Path:
+    return Path(history_path).parent / STORE_DIR_NAME / DICTIONARY_DIR_NAME
+
+
+def load_dictionaries(history_path: Path) -> Dictionaries:
+    """Shared Dictionaries of the store next to a history CSV, reloaded when its files change."""
+    directory = dictionary_dir(history_path).resolve()
+    with _DICTIONARIES_LOCK:
+        dictionaries = _DICTIONARIES.get(directory)
+        if dictionaries is None or dictionaries.is_stale():
+            dictionaries = _DICTIONARIES[directory] = Dictionaries(directory)
+        return dictionaries
+
+
+@contextmanager
+def use_dictionaries(history_path: Path) -> Iterator[Dictionaries]:
+    """Make the store's dictionaries the ones the calculator encodes against
+    inside the with block, restoring the previous ones on exit."""
+    token = _ACTIVE.set(load_dictionaries(history_path))
+    try:
+        yield _ACTIVE.get()
+    finally:
+        _ACTIVE.reset(token)
+
+
+def active_dictionaries() -> Dictionaries:
+    """Dictionaries activated by use_dictionaries, else a new temporary set."""
+    dictionaries = _ACTIVE.get()
+    return dictionaries if dictionaries is not None else Dictionaries()
@@ -0,0 +1,57 @@
+"""Fiscal-period ordinals for trade history.
+
+A period ordinal is Year * 12 + position within the fiscal year, with
+Shrawan (4) at position 0 and Ashad (3) at position 11, so the months of a
+fiscal year are one contiguous integer range. History loaded with
+read_done_csv carries it as PERIOD_COLUMN and is sorted on it, which turns
+"fiscal months up to N" into a binary-search slice.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import FISCAL_YEAR_START_MONTH
+
+PERIOD_COLUMN = '_period'
+
+
+def fiscal_month_index(month: Union[int, pd.Series]) -> Union[int, pd.Series]:
+    """Position of a month within the fiscal year (Shrawan = 0 ... Ashad = 11)."""
+    if isinstance(month, pd.Series):
+        return (month.astype(int) - FISCAL_YEAR_START_MONTH) % 12
+    return (int(month) - FISCAL_YEAR_START_MONTH) % 12
+
+
+def fiscal_period(year, month):
+    """Period ordinal for a (Year, Month) pair or for Year/Month Series.
+
+    Rows with a missing or non-numeric Year or Month get -1.
+    """
+    if isinstance(year, pd.Series):
+        years = pd.to_numeric(year, errors='coerce')
+        months = pd.to_numeric(month, errors='coerce')
+        periods = years * 12 + (months - FISCAL_YEAR_START_MONTH) % 12
+        return periods.fillna(-1).astype('int64')
+    return int(year) * 12 + fiscal_month_index(month)
+
+
+def period_to_year_month(period: int) -> Tuple[int, int]:
+    year, index = divmod(int(period), 12)
+    return year, (index + FISCAL_YEAR_START_MONTH - 1) % 12 + 1
+
+
+def add_period_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Add PERIOD_COLUMN and stable-sort the rows on it."""
+    result = df.copy()
+    result[PERIOD_COLUMN] = fiscal_period(result['Year'], result['Month'])
+    return result.sort_values(PERIOD_COLUMN, kind='mergesort')
+
+
+def period_slice(df: pd.DataFrame, first: int, last: int) -> pd.DataFrame:
+    """Rows with first <= PERIOD_COLUMN <= last, via binary search on a sorted frame."""
+    periods = df[PERIOD_COLUMN].to_numpy()
+    start = np.searchsorted(periods, first, side='left')
+    stop = np.searchsorted(periods, last, side='right')
+    return df.iloc[start:stop]
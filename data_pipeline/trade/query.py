@@ -0,0 +1,178 @@
+"""Indexed queries over trade history.
+
+Example:
+    from data_pipeline.trade import query
+
+    # Imports of HS 8703 from China, FY 2081 Shrawan..Chaitra, by month
+    query('data/done.csv', years=2081, months=range(4, 13), direction='I',
+          hs_prefix='8703', countries='CN', group_by=['Month'])
+
+Queries run against the columnar mirror of the history (see columnar):
+year, month and direction pick contiguous (period, direction) blocks, an
+HS prefix is a binary search within each block, and countries are a table
+lookup on small integer codes of the remaining rows. Only matching rows
+are decoded into a DataFrame.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .columnar import load_columns
+from .config import FISCAL_YEAR_START_MONTH
+from .hs_codes import HSIndex
+from .periods import fiscal_month_index, fiscal_period
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ['Year', 'Month', 'Direction', 'HS_Code', 'Country', 'Value', 'Quantity', 'Unit', 'Revenue']
+MEASURES = ['Value', 'Quantity', 'Revenue']
+
+
+def _as_list(values) -> Optional[List]:
+    if values is None:
+        return None
+    if isinstance(values, (str, int, np.integer)):
+        return [values]
+    return list(values)
+
+
+def _period_bounds(years: Optional[List[int]], months: Optional[List[int]]):
+    """Smallest period range covering the requested fiscal years and months."""
+    if years is None:
+        return None
+    positions = [fiscal_month_index(m) for m in months] if months is not None else [0, 11]
+    return fiscal_period(min(years), FISCAL_YEAR_START_MONTH) + min(positions), \
+        fiscal_period(max(years), FISCAL_YEAR_START_MONTH) + max(positions)
+
+
+def _codes_for(dictionary: np.ndarray, values: List[str]) -> np.ndarray:
+    """Codes of the values present in a sorted dictionary."""
+    values = np.asarray([str(v) for v in values])
+    if len(dictionary) == 0 or len(values) == 0:
+        return np.array([], dtype=np.int64)
+    codes = np.minimum(np.searchsorted(dictionary, values), len(dictionary) - 1)
+    return codes[dictionary[codes] == values]
+
+
+def _lookup(size: int, codes) -> np.ndarray:
+    """Boolean table indexed by code (the extra last slot covers missing, -1)."""
+    table = np.zeros(size + 1, dtype=bool)
+    table[np.asarray(codes, dtype=np.int64)] = True
+    return table
+
+
+def _selected_blocks(columns: Dict, years, months, direction) -> np.ndarray:
+    """(start, stop) of the (period, direction) blocks matching the filters."""
+    blocks = columns['blocks']
+    bounds = _period_bounds(years, months)
+    if bounds is not None:
+        first = int(np.searchsorted(blocks[:, 0], bounds[0], side='left'))
+        last = int(np.searchsorted(blocks[:, 0], bounds[1], side='right'))
+        blocks = blocks[first:last]
+
+    blocks = np.asarray(blocks)
+    mask = np.ones(len(blocks), dtype=bool)
+    if years is not None and len(years) > 1:
+        mask &= np.isin(blocks[:, 0] // 12, years)
+    if months is not None:
+        mask &= np.isin(blocks[:, 0] % 12, [fiscal_month_index(m) for m in months])
+    if direction is not None:
+        mask &= np.isin(blocks[:, 1], _codes_for(columns['dictionaries']['direction'], [direction]))
+    return blocks[mask, 2:]
+
+
+def select_rows(columns: Dict,
+                years: Optional[List[int]] = None,
+                months: Optional[List[int]] = None,
+                direction: Optional[str] = None,
+                hs_prefix: Optional[str] = None,
+                countries: Optional[List[str]] = None) -> np.ndarray:
+    """Row ids of the columnar mirror matching the filters."""
+    dictionaries = columns['dictionaries']
+    spans = _selected_blocks(columns, years, months, direction)
+
+    if hs_prefix is not None:
+        lo, hi = HSIndex(dictionaries['hs'], presorted=True).span(hs_prefix)
+        hs = columns['hs']
+        # HS codes are sorted within each block
+        spans = np.array([(start + np.searchsorted(hs[start:stop], lo, side='left'),
+                           start + np.searchsorted(hs[start:stop], hi, side='left'))
+                          for start, stop in spans], dtype=np.int64).reshape(-1, 2)
+
+    spans = spans[spans[:, 1] > spans[:, 0]]
+    if len(spans) == 0:
+        return np.array([], dtype=np.int64)
+    rows = np.concatenate([np.arange(start, stop) for start, stop in spans])
+
+    if countries is not None:
+        table = _lookup(len(dictionaries['country']), _codes_for(dictionaries['country'], countries))
+        rows = rows[table[columns['country'][rows]]]
+    return rows
+
+
+def _decode(codes: np.ndarray, dictionary: np.ndarray) -> np.ndarray:
+    """Dictionary labels for codes, None for missing (-1)."""
+    labels = np.empty(len(codes), dtype=object)
+    present = codes >= 0
+    labels[present] = np.asarray(dictionary[codes[present]]).astype(object)
+    return labels
+
+
+def rows_frame(columns: Dict, rows: np.ndarray, names: Optional[List[str]] = None) -> pd.DataFrame:
+    """Decode selected rows of the columnar mirror into history columns (all by default)."""
+    names = list(names) if names is not None else RESULT_COLUMNS
+    dictionaries = columns['dictionaries']
+    periods = np.asarray(columns['period'][rows]).astype(np.int64) \
+        if {'Year', 'Month'} & set(names) else None
+
+    decoders = {
+        'Year': lambda: periods // 12,
+        'Month': lambda: (periods % 12 + FISCAL_YEAR_START_MONTH - 1) % 12 + 1,
+        'Direction': lambda: _decode(np.asarray(columns['direction'][rows]), dictionaries['direction']),
+        'HS_Code': lambda: _decode(np.asarray(columns['hs'][rows]), dictionaries['hs']),
+        'Country': lambda: _decode(np.asarray(columns['country'][rows]), dictionaries['country']),
+        'Value': lambda: np.asarray(columns['value'][rows]),
+        'Quantity': lambda: np.asarray(columns['quantity'][rows]),
+        'Unit': lambda: _decode(np.asarray(columns['unit'][rows]), dictionaries['unit']),
+        'Revenue': lambda: np.asarray(columns['revenue'][rows]),
+    }
+    return pd.DataFrame({name: decoders[name]() for name in names}, columns=names)
+
+
+def hs_index(history: Union[str, Path]) -> HSIndex:
+    """HSIndex over the distinct HS codes of a history, from its columnar mirror."""
+    return HSIndex(load_columns(Path(history))['dictionaries']['hs'], presorted=True)
+
+
+def query(history: Union[str, Path],
+          years: Union[int, Iterable[int], None] = None,
+          months: Union[int, Iterable[int], None] = None,
+          direction: Optional[str] = None,
+          hs_prefix: Optional[str] = None,
+          countries: Union[str, Iterable[str], None] = None,
+          group_by: Optional[List[str]] = None) -> pd.DataFrame:
+    """Rows (or aggregates) of a trade history matching the filters.
+
+    Args:
+        history: History CSV (done.csv).
+        years: Fiscal year(s).
+        months: Calendar month number(s) within the fiscal year(s).
+        direction: 'I' or 'E'.
+        hs_prefix: HS code prefix, e.g. '84' or '8703'.
+        countries: ISO-2 code(s).
+        group_by: Columns to sum Value, Quantity and Revenue by; None
+            returns the matching rows.
+    """
+    columns = load_columns(Path(history))
+    rows = select_rows(columns, _as_list(years), _as_list(months), direction, hs_prefix, _as_list(countries))
+    if group_by:
+        result = rows_frame(columns, rows, list(group_by) + MEASURES)
+        result = result.groupby(list(group_by), as_index=False)[MEASURES].sum()
+    else:
+        result = rows_frame(columns, rows)
+    logger.debug(f"Query matched {len(rows):,} of {columns['rows']:,} rows")
+    return result
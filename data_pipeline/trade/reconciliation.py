@@ -0,0 +1,123 @@
+"""Reconciliation of written monthly rows against the cumulative input.
+
+After a month is written, the history up to that month should sum back to
+the cumulative workbook for every key: previous cumulative + the month's
+rows as written to done.csv == current cumulative. The written rows are
+the cleaned monthly frame, so keys whose rows clean_monthly_data dropped
+(missing HS code, country or value) show up as unwritten residuals, next
+to keys whose delta was filtered out as zero or negative.
+
+The previous and current cumulatives are already aggregated by the
+pipeline; only the month's rows are aggregated again, and the per-key
+residual is one difference_cumulatives call.
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .calculator import (
+    DIRECTION_KEY,
+    DIRECTIONS,
+    aggregate_directions,
+    difference_cumulatives,
+    stack_directions
+)
+
+logger = logging.getLogger(__name__)
+
+TOTAL_COLUMNS = ['cumulative', 'previous', 'monthly', 'history', 'residual',
+                 'mismatched_keys', 'dropped_negative_keys', 'dropped_negative_value',
+                 'unwritten_keys', 'unwritten_value']
+
+
+def _direction_totals(df: pd.DataFrame) -> pd.Series:
+    if df.empty:
+        return pd.Series(dtype=float)
+    return pd.to_numeric(df['Value'], errors='coerce').groupby(df['Direction'].to_numpy()).sum()
+
+
+def reconcile_month(monthly_df: pd.DataFrame,
+                    previous_cumulatives: Dict[str, pd.DataFrame],
+                    current_aggregated: pd.DataFrame,
+                    year: int,
+                    month: int,
+                    tolerance: float = 1e-6) -> Dict:
+    """Check that history through a month sums back to its cumulative input.
+
+    Args:
+        monthly_df: The month's rows as written (after clean_monthly_data).
+        previous_cumulatives: Cumulative per trade type before the month.
+        current_aggregated: Aggregated current cumulative (calculator.aggregate_current).
+        year, month: Month being written.
+        tolerance: Absolute residual below which a key counts as balanced.
+
+    Returns:
+        Dict with 'year', 'month', 'totals' (Value totals per Direction),
+        'mismatched' (keys whose history does not sum to the cumulative,
+        with their Value/Quantity residuals) and 'balanced'.
+    """
+    previous = stack_directions(previous_cumulatives)
+    written = monthly_df[monthly_df['Direction'].isin(list(DIRECTIONS.values()))] \
+        if not monthly_df.empty else monthly_df
+
+    parts = [df for df in (previous, written) if not df.empty]
+    history = aggregate_directions(pd.concat(parts, ignore_index=True)) if parts else pd.DataFrame()
+    if current_aggregated.empty and history.empty:
+        return {'year': year, 'month': month, 'balanced': True,
+                'totals': pd.DataFrame(columns=TOTAL_COLUMNS), 'mismatched': pd.DataFrame()}
+
+    residuals = difference_cumulatives(current_aggregated, history, ['Value', 'Quantity'], key=DIRECTION_KEY)
+    value = np.nan_to_num(residuals['Value'].to_numpy(dtype=float))
+    quantity = np.nan_to_num(residuals['Quantity'].to_numpy(dtype=float))
+
+    mismatched_mask = (np.abs(value) > tolerance) | (np.abs(quantity) > tolerance)
+    negative_mask = mismatched_mask & (value < 0)
+    unwritten_mask = mismatched_mask & ~negative_mask
+
+    frame = pd.DataFrame({
+        'Direction': residuals['Direction'].to_numpy(),
+        'mismatched_keys': mismatched_mask,
+        'dropped_negative_keys': negative_mask,
+        'dropped_negative_value': np.where(negative_mask, -value, 0.0),
+        'unwritten_keys': unwritten_mask,
+        'unwritten_value': np.where(unwritten_mask, value, 0.0),
+    })
+    totals = frame.groupby('Direction').sum()
+    for column, df in (('cumulative', current_aggregated), ('previous', previous), ('monthly', written)):
+        totals[column] = _direction_totals(df).reindex(totals.index).fillna(0.0)
+    totals['history'] = totals['previous'] + totals['monthly']
+    totals['residual'] = totals['cumulative'] - totals['history']
+    totals = totals.reindex([d for d in DIRECTIONS.values() if d in totals.index])[TOTAL_COLUMNS]
+
+    mismatched = residuals.loc[mismatched_mask, ['Direction', 'HS_Code', 'Country', 'Value', 'Quantity']]
+    mismatched = mismatched.rename(columns={'Value': 'Value_residual', 'Quantity': 'Quantity_residual'})
+
+    return {
+        'year': year,
+        'month': month,
+        'totals': totals,
+        'mismatched': mismatched.reset_index(drop=True),
+        'balanced': not mismatched_mask.any(),
+    }
+
+
+def log_reconciliation(report: Dict):
+    """Log per-direction totals and mismatch counts of a reconciliation report."""
+    label = f"Year={report['year']}, Month={report['month']}"
+    for direction, row in report['totals'].iterrows():
+        logger.info(f"Reconciliation {label} {direction}: cumulative {row['cumulative']:,.2f}, "
+                    f"history {row['history']:,.2f}, residual {row['residual']:,.2f}")
+
+    if report['balanced']:
+        logger.info(f"Reconciliation {label}: history matches the cumulative input")
+        return
+
+    totals = report['totals']
+    logger.warning(f"Reconciliation {label}: {len(report['mismatched']):,} mismatched keys, "
+                   f"{int(totals['dropped_negative_keys'].sum()):,} dropped negative deltas "
+                   f"totalling {totals['dropped_negative_value'].sum():,.2f}, "
+                   f"{int(totals['unwritten_keys'].sum()):,} keys not written "
+                   f"totalling {totals['unwritten_value'].sum():,.2f}")
@@ -0,0 +1,204 @@
+"""Pre-aggregated trade rollups by HS level, country, month and direction.
+
+For each level in ROLLUP_HS_LEVELS the store keeps one small frame under
+STORE_DIR_NAME/rollups with Value, Quantity and Revenue summed by
+(Year, Month, Direction, HS, Country), where HS is the level-digit prefix
+of the normalized HS code. Rows whose HS code is missing or not a digit
+string are kept under UNCLASSIFIED_HS, so every level still sums to the
+history. Dashboards read these frames instead of the full history.
+
+Each process_data / backfill run updates the rollups from its monthly
+rows: the written (Year, Month, Direction) groups are dropped and
+re-aggregated, which mirrors the month replacement of save_updated_csv.
+Every fiscal year in the rollups carries the fingerprint of the history it
+was built from. If the history a run starts from does not match, that
+year is rebuilt from the written history instead of patched.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from ..core.utils import drop_matching_keys
+from .config import FISCAL_YEAR_START_MONTH, HISTORY_CSV_DTYPES, ROLLUP_HS_LEVELS
+from .history_index import period_fingerprint, read_fiscal_year
+from .hs_codes import HSIndex, INVALID_HS_CODE, format_hs_codes, normalize_hs_codes, pack_hs_codes, truncate_hs_codes
+from .periods import fiscal_period
+from .store import EMPTY_FINGERPRINT, Fingerprint, store_dir, history_fingerprint, fingerprints_match
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIR_NAME = 'rollups'
+ROLLUP_KEYS = ['Year', 'Month', 'Direction', 'HS', 'Country']
+ROLLUP_MEASURES = ['Value', 'Quantity', 'Revenue']
+MONTH_KEYS = ['Year', 'Month', 'Direction']
+UNCLASSIFIED_HS = 'unclassified'
+
+
+def rollup_path(history_path: Path, level: int) -> Path:
+    return store_dir(history_path) / ROLLUP_DIR_NAME / f"hs{int(level)}.pkl"
+
+
+def aggregate_rollup(rows: pd.DataFrame, level: int) -> pd.DataFrame:
+    """Sum measures of history rows by (Year, Month, Direction, HS prefix, Country).
+
+    Rows without a valid HS code are summed under HS = UNCLASSIFIED_HS.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ROLLUP_MEASURES)
+
+    # Group on packed HS prefixes; only the aggregated rows are formatted back to strings
+    frame = pd.DataFrame({
+        'Year': rows['Year'].astype(int).to_numpy(),
+        'Month': rows['Month'].astype(int).to_numpy(),
+        'Direction': rows['Direction'].astype(str).to_numpy(),
+        'HS': truncate_hs_codes(pack_hs_codes(normalize_hs_codes(rows['HS_Code'])), level),
+        'Country': rows['Country'].astype(str).to_numpy(),
+    })
+    for measure in ROLLUP_MEASURES:
+        frame[measure] = pd.to_numeric(rows[measure], errors='coerce').fillna(0).to_numpy() \
+            if measure in rows.columns else 0.0
+
+    invalid = frame['HS'].to_numpy() == INVALID_HS_CODE
+    if invalid.any():
+        logger.warning(f"HS{level} rollup: {int(invalid.sum()):,} rows without a valid HS code "
+                       f"(Value {frame.loc[invalid, 'Value'].sum():,.2f}) kept as '{UNCLASSIFIED_HS}'")
+
+    result = frame.groupby(ROLLUP_KEYS, as_index=False, sort=True)[ROLLUP_MEASURES].sum()
+    hs = format_hs_codes(result['HS'].to_numpy())
+    result['HS'] = pd.Series(hs, dtype=object).fillna(UNCLASSIFIED_HS).to_numpy()
+    return result
+
+
+def _compact(rollup: pd.DataFrame) -> pd.DataFrame:
+    """Categorical key columns and narrow integers for a small on-disk footprint."""
+    result = rollup.reset_index(drop=True)
+    result['Year'] = result['Year'].astype('int16')
+    result['Month'] = result['Month'].astype('int8')
+    for column in ('Direction', 'HS', 'Country'):
+        result[column] = result[column].astype(str).astype('category')
+    return result
+
+
+def _expand(rollup: pd.DataFrame) -> pd.DataFrame:
+    """Inverse of _compact, so stored and new rows concatenate cleanly."""
+    return rollup.astype({'Year': 'int64', 'Month': 'int64', 'Direction': str, 'HS': str, 'Country': str})
+
+
+def load_rollup(history_path: Path, level: int) -> Optional[pd.DataFrame]:
+    path = rollup_path(history_path, level)
+    if not path.exists():
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable rollup {path.name}: {e}")
+        return None
+
+
+def _save_rollup(history_path: Path, level: int, rollup: pd.DataFrame,
+                 fingerprints: Dict[int, Fingerprint]) -> Path:
+    path = rollup_path(history_path, level)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    compact = _compact(rollup)
+    compact.attrs['fingerprints'] = dict(fingerprints)
+
+    tmp_path = path.with_suffix('.tmp')
+    compact.to_pickle(tmp_path)
+    tmp_path.replace(path)
+    return path
+
+
+def build_rollups(history_path: Path, history: pd.DataFrame,
+                  levels: Iterable[int] = ROLLUP_HS_LEVELS) -> Dict[int, pd.DataFrame]:
+    """Build every rollup level from a full history frame."""
+    fingerprints = {int(year): history_fingerprint(rows) for year, rows in history.groupby('Year')}
+    result = {}
+    for level in levels:
+        result[level] = aggregate_rollup(history, level)
+        _save_rollup(history_path, level, result[level], fingerprints)
+    logger.info(f"Built rollups at HS levels {list(levels)} for {len(fingerprints)} fiscal year(s)")
+    return result
+
+
+def update_rollups(history_path: Path, output_path: Path, monthly_df: pd.DataFrame,
+                   previous_fingerprints: Dict[int, Fingerprint],
+                   replace_existing: bool = True,
+                   levels: Iterable[int] = ROLLUP_HS_LEVELS):
+    """Fold a run's monthly rows into the rollups.
+
+    Args:
+        history_path: History the run started from (locates the store).
+        output_path: History CSV the run wrote.
+        monthly_df: Monthly rows written by the run.
+        previous_fingerprints: history_fingerprint of each affected fiscal
+            year's rows before the run.
+        replace_existing: Whether the run replaced the months it wrote;
+            appended months are rebuilt from the written history.
+        levels: HS digit levels to maintain.
+    """
+    levels = list(levels)
+    existing = {level: load_rollup(history_path, level) for level in levels}
+    if any(rollup is None for rollup in existing.values()):
+        logger.info("Rollups missing, building them from the full history")
+        build_rollups(history_path, pd.read_csv(output_path, dtype=HISTORY_CSV_DTYPES), levels)
+        return
+
+    fingerprints = dict(existing[levels[0]].attrs.get('fingerprints', {}))
+    years = sorted(int(year) for year in monthly_df['Year'].unique()) if not monthly_df.empty else []
+    stale = [year for year in years
+             if not replace_existing or not fingerprints_match(fingerprints.get(year), previous_fingerprints.get(year, EMPTY_FINGERPRINT))]
+    # Only stale years are read back; written fingerprints come from the history index
+    after = {year: read_fiscal_year(output_path, year) for year in stale}
+
+    fresh = monthly_df[~monthly_df['Year'].isin(stale)] if not monthly_df.empty else monthly_df
+    for year in years:
+        first = fiscal_period(year, FISCAL_YEAR_START_MONTH)
+        fingerprints[year] = period_fingerprint(output_path, first, first + 11, after.get(year))
+
+    for level in levels:
+        rollup = _expand(existing[level])
+        parts = [aggregate_rollup(after[year], level) for year in stale]
+        rollup = rollup[~rollup['Year'].isin(stale)]
+        if not fresh.empty:
+            rollup, _ = drop_matching_keys(rollup, fresh, MONTH_KEYS)
+            parts.append(aggregate_rollup(fresh, level))
+
+        rollup = pd.concat([rollup] + parts, ignore_index=True).sort_values(ROLLUP_KEYS, kind='mergesort')
+        _save_rollup(history_path, level, rollup, fingerprints)
+
+    if stale:
+        logger.info(f"Rebuilt rollups for fiscal year(s) {stale} from the written history")
+    logger.info(f"Updated rollups at HS levels {levels} with {len(monthly_df):,} monthly records")
+
+
+def query_rollup(history_path: Path, level: int,
+                 years: Optional[Iterable[int]] = None,
+                 months: Optional[Iterable[int]] = None,
+                 direction: Optional[str] = None,
+                 hs_prefix: Optional[str] = None,
+                 countries: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Rollup rows at one HS level matching the given filters.
+
+    Example:
+        query_rollup('data/done.csv', 2, years=[2081], direction='I', hs_prefix='84')
+    """
+    rollup = load_rollup(history_path, level)
+    if rollup is None:
+        raise FileNotFoundError(f"No HS{level} rollup next to {history_path}; run process_data or build_rollups")
+
+    mask = pd.Series(True, index=rollup.index)
+    if years is not None:
+        mask &= rollup['Year'].isin(list(years))
+    if months is not None:
+        mask &= rollup['Month'].isin(list(months))
+    if direction is not None:
+        mask &= rollup['Direction'] == direction
+    if hs_prefix is not None:
+        mask &= rollup['HS'].isin(HSIndex(rollup['HS'].unique()).under(hs_prefix))
+    if countries is not None:
+        mask &= rollup['Country'].isin(list(countries))
+    return rollup[mask].reset_index(drop=True)
@@ -0,0 +1,215 @@
+"""Sparse HS x Country engine for monthly trade deltas (optional, needs scipy).
+
+HS codes and countries are interned to integer indices, so each cumulative
+becomes a sparse HS x Country matrix per measure (Value, Quantity,
+Revenue). Duplicate rows are summed by the sparse constructor, which
+replaces the groupby. A fiscal year of cumulatives is stacked into one
+months x keys matrix; each month is differenced against a running
+cumulative that only advances by the kept (positive) deltas, as
+advance_cumulative does for the pandas path, so both engines write the
+same rows even when a cumulative is revised downwards.
+
+Results use the calculate_monthly_combined layout.
+
+Install with: pip install data-pipeline[sparse]
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    sparse = None
+
+from .calculator import DIRECTIONS
+from .cleaner import convert_country_names
+from .hs_codes import canonical_hs_code
+from .interning import Interner
+from .periods import fiscal_month_index
+from ..core.utils import pipe, clean_hs_codes_fn, map_column
+
+logger = logging.getLogger(__name__)
+
+MEASURES = ['Value', 'Quantity', 'Revenue']
+
+
+def sparse_available() -> bool:
+    return sparse is not None
+
+
+def _require_scipy():
+    if sparse is None:
+        raise ImportError("The sparse trade engine needs scipy: pip install data-pipeline[sparse]")
+
+
+class SparseTradeEngine:
+    """Interned HS x Country cumulatives and month-axis differencing.
+
+    Example:
+        engine = SparseTradeEngine()
+        monthly = engine.difference_months([shrawan, bhadra, ashwin], seed=None, trade_type='import')
+    """
+
+    def __init__(self):
+        _require_scipy()
+        self.hs = Interner(label=canonical_hs_code)
+        self.countries = Interner()
+
+    def encode(self, frame: Optional[pd.DataFrame]) -> Dict[str, np.ndarray]:
+        """Interned row/column indices, measures and units of a cleaned frame."""
+        if frame is None or frame.empty:
+            return {'row': np.zeros(0, np.int64), 'col': np.zeros(0, np.int64),
+                    'Unit': np.zeros(0, object), **{m: np.zeros(0) for m in MEASURES}}
+
+        # Missing countries intern to MISSING_ID, so column 0 is the missing country
+        countries = frame['Country'].where(frame['Country'].notna(), None)
+        encoded = {
+            'row': self.hs.intern(frame['HS_Code'].astype(str)),
+            'col': self.countries.intern(countries) + 1,
+            'Unit': frame['Unit'].to_numpy(dtype=object) if 'Unit' in frame.columns
+            else np.full(len(frame), None, dtype=object),
+        }
+        for measure in MEASURES:
+            encoded[measure] = (pd.to_numeric(frame[measure], errors='coerce').fillna(0).to_numpy(dtype=float)
+                                if measure in frame.columns else np.zeros(len(frame)))
+        return encoded
+
+    def _n_cols(self) -> int:
+        return len(self.countries) + 1
+
+    def _packed(self, encoded: Dict[str, np.ndarray]) -> np.ndarray:
+        return encoded['row'] * self._n_cols() + encoded['col']
+
+    def _stack(self, encoded: List[Dict[str, np.ndarray]], measure: str, n_keys: int):
+        """months x keys CSR matrix of one measure (duplicates summed)."""
+        months = np.concatenate([np.full(len(e['row']), i) for i, e in enumerate(encoded)])
+        keys = np.concatenate([self._packed(e) for e in encoded])
+        data = np.concatenate([e[measure] for e in encoded])
+        return sparse.csr_matrix((data, (months, keys)), shape=(len(encoded), n_keys))
+
+    def _units(self, encoded: Dict[str, np.ndarray]) -> pd.Series:
+        """First non-null Unit per packed key (groupby 'first' semantics)."""
+        units = pd.Series(encoded['Unit'], index=self._packed(encoded))
+        units = units[units.notna()]
+        return units[~units.index.duplicated()]
+
+    def difference_months(self, cumulatives: List[pd.DataFrame],
+                          seed: Optional[pd.DataFrame],
+                          trade_type: str) -> List[pd.DataFrame]:
+        """Monthly deltas for consecutive cumulatives of one direction.
+
+        seed is the cumulative before the first month (None at the start of
+        the fiscal year). Each result has HS_Code, Country, Value, Quantity,
+        Unit and Revenue, restricted to keys with a positive Value or
+        Quantity delta against the running cumulative of earlier kept rows.
+        """
+        encoded = [self.encode(seed)] + [self.encode(frame) for frame in cumulatives]
+        n_keys = max(len(self.hs), 1) * self._n_cols()
+
+        matrices = {m: self._stack(encoded, m, n_keys) for m in MEASURES}
+        # The running cumulative starts at the seed and advances by the kept deltas only
+        running = {m: matrix[0] for m, matrix in matrices.items()}
+
+        # Units follow the running cumulative, as advance_cumulative would build it
+        current_units = [self._units(e) for e in encoded[1:]]
+        running_units = self._units(encoded[0])
+        running_keys = pd.Index(np.unique(self._packed(encoded[0])))
+
+        results = []
+        for month in range(len(cumulatives)):
+            deltas = {m: (matrices[m][month + 1] - running[m]).tocsr() for m in MEASURES}
+            value, quantity = deltas['Value'], deltas['Quantity']
+            keys = np.union1d(value.indices[value.data > 0], quantity.indices[quantity.data > 0])
+
+            kept = sparse.csr_matrix((np.ones(len(keys)), (np.zeros(len(keys), dtype=np.int64), keys)),
+                                     shape=(1, n_keys))
+            for measure in MEASURES:
+                running[measure] = (running[measure] + deltas[measure].multiply(kept)).tocsr()
+
+            rows, cols = np.divmod(keys, self._n_cols())
+            monthly = pd.DataFrame({
+                'HS_Code': self.hs.decode(rows),
+                'Country': self.countries.decode(cols - 1),
+            })
+            for measure in MEASURES:
+                monthly[measure] = np.asarray(deltas[measure][0, keys].todense()).ravel() \
+                    if len(keys) else np.zeros(0)
+
+            # Current unit when truthy, else the running cumulative's, else 'pcs'
+            units = current_units[month].reindex(keys).to_numpy(dtype=object)
+            fallback = np.where(pd.Index(keys).isin(running_keys),
+                                running_units.reindex(keys).to_numpy(dtype=object), 'pcs')
+            monthly['Unit'] = np.where(units.astype(bool), units, fallback)
+
+            resolved = pd.Series(monthly['Unit'].to_numpy(), index=keys)
+            running_units = running_units.combine_first(resolved[resolved.notna()])
+            running_keys = running_keys.union(pd.Index(keys))
+
+            if trade_type != 'import':
+                monthly['Revenue'] = np.nan
+            results.append(monthly)
+
+        return results
+
+
+def _prepare_current(frame: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if frame is None or frame.empty:
+        return frame
+    return pipe(frame.copy(), clean_hs_codes_fn, map_column('Country', convert_country_names))
+
+
+def difference_fiscal_year(cumulatives_by_month: Dict[int, Dict[str, Optional[pd.DataFrame]]],
+                           previous_cumulatives: Dict[str, pd.DataFrame],
+                           year: int) -> pd.DataFrame:
+    """Monthly rows for several months of one fiscal year with the sparse engine.
+
+    Args:
+        cumulatives_by_month: {month: {'import': df, 'export': df}} of raw
+            cumulative workbook frames.
+        previous_cumulatives: Cumulative per trade type before the first
+            month (empty frames at the start of the fiscal year).
+        year: Fiscal year.
+
+    Returns:
+        Rows in the calculate_monthly_combined layout, month by month with
+        imports before exports.
+    """
+    _require_scipy()
+    months = sorted(cumulatives_by_month, key=fiscal_month_index)
+    engine = SparseTradeEngine()
+    per_direction = {}
+
+    for trade_type in DIRECTIONS:
+        frames = [_prepare_current(cumulatives_by_month[month].get(trade_type)) for month in months]
+        if all(frame is None or frame.empty for frame in frames):
+            continue
+        seed = previous_cumulatives.get(trade_type)
+        per_direction[trade_type] = engine.difference_months(frames, seed, trade_type)
+
+    parts = []
+    for i, month in enumerate(months):
+        for trade_type, monthly in per_direction.items():
+            if not monthly[i].empty:
+                parts.append(monthly[i].assign(Year=year, Month=month, Direction=DIRECTIONS[trade_type]))
+
+    if not parts:
+        return pd.DataFrame()
+
+    result = pd.concat(parts, ignore_index=True)
+    columns = ['Year', 'Month', 'Direction', 'HS_Code', 'Country', 'Value', 'Quantity', 'Unit']
+    if (result['Direction'] == DIRECTIONS['import']).any():
+        columns.append('Revenue')
+    logger.info(f"Sparse engine: {len(result):,} monthly records for Year={year}, months {months}")
+    return result[columns]
+
+
+def calculate_monthly_sparse(current_cumulatives: Dict[str, Optional[pd.DataFrame]],
+                             previous_cumulatives: Dict[str, pd.DataFrame],
+                             year: int,
+                             month: int) -> pd.DataFrame:
+    """calculate_monthly_combined for one month, backed by the sparse engine."""
+    return difference_fiscal_year({month: current_cumulatives}, previous_cumulatives, year)
@@ -0,0 +1,253 @@
+"""Materialized per-month cumulative snapshots for trade history.
+
+After a month is processed, the cumulative aggregate for each direction
+(fiscal-year-to-date, one row per HS_Code|Country key) is saved next to
+the history file under STORE_DIR_NAME/snapshots, keyed by
+(Year, Month, Direction). The next run loads the previous month's snapshot
+instead of re-aggregating every history row of the fiscal year.
+
+Each snapshot carries a fingerprint of the history rows it was built from:
+row count, Value total and the sum of per-row content hashes over the
+period, key and measure columns. The hash sum does not depend on row order
+and adds up across row sets, so the fingerprint of a month's history is
+the previous fingerprint combined with the month's rows. The history
+index stores the fingerprint of every (Year, Month, Direction) block when
+the history is written (see history_index), so readers combine block
+fingerprints instead of hashing rows again. A snapshot is only used when
+the fingerprint still matches the history being processed, and writing a
+month removes the snapshots for that month and every later month of the
+fiscal year.
+"""
+
+import logging
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import STORE_DIR_NAME
+from .calculator import DIRECTIONS, calculate_previous_cumulatives, advance_cumulative
+from .hs_codes import normalize_hs_codes
+from .periods import fiscal_period
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR_NAME = 'snapshots'
+_SNAPSHOT_PATTERN = re.compile(r'^(\d+)-(\d{2})-([A-Z])\.pkl$')
+
+FINGERPRINT_PERIOD_COLUMNS = ['Year', 'Month']
+FINGERPRINT_KEY_COLUMNS = ['Direction', 'HS_Code', 'Country', 'Unit']
+FINGERPRINT_MEASURES = ['Value', 'Quantity', 'Revenue']
+# Measures are rounded before hashing so CSV round trips hash the same
+FINGERPRINT_DECIMALS = 6
+EMPTY_FINGERPRINT = (0, 0.0, 0)
+
+Fingerprint = Tuple[int, float, int]
+
+
+def store_dir(history_path: Path) -> Path:
+    """Store directory that sits next to a history CSV."""
+    return Path(history_path).parent / STORE_DIR_NAME
+
+
+def snapshot_path(history_path: Path, year: int, month: int, direction: str) -> Path:
+    return store_dir(history_path) / SNAPSHOT_DIR_NAME / f"{int(year)}-{int(month):02d}-{direction}.pkl"
+
+
+def _labels(values: pd.Series, normalize=None) -> pd.Series:
+    """Values as strings ('' for missing), converting the distinct values only."""
+    codes, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=object).astype(str)
+    if normalize is not None:
+        labels = normalize(labels)
+    return pd.Series(np.append(labels.to_numpy(dtype=object), '')[codes], index=values.index)
+
+
+def _row_hashes(rows: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Rounded Value and uint64 content hash of every row, normalized so rows
+    read back from CSV hash like the frames that were written."""
+    canonical = pd.DataFrame(index=rows.index)
+    for column in FINGERPRINT_PERIOD_COLUMNS:
+        canonical[column] = pd.to_numeric(rows[column], errors='coerce').fillna(-1).astype(np.int64) \
+            if column in rows.columns else np.int64(-1)
+    for column in FINGERPRINT_KEY_COLUMNS:
+        canonical[column] = _labels(rows[column], normalize_hs_codes if column == 'HS_Code' else None) \
+            if column in rows.columns else ''
+    for column in FINGERPRINT_MEASURES:
+        canonical[column] = pd.to_numeric(rows[column], errors='coerce').fillna(0).astype(float) \
+            .round(FINGERPRINT_DECIMALS) if column in rows.columns else 0.0
+
+    return canonical['Value'].to_numpy(), pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def history_fingerprint(rows: pd.DataFrame) -> Fingerprint:
+    """Row count, Value total and content hash of the history rows behind a cumulative.
+
+    The content hash is the wrapping uint64 sum of per-row hashes of the
+    period, key and measure columns.
+    """
+    if rows.empty:
+        return EMPTY_FINGERPRINT
+    return block_fingerprints(rows, [0])[0]
+
+
+def block_fingerprints(rows: pd.DataFrame, starts) -> List[Fingerprint]:
+    """history_fingerprint of each block of consecutive rows, blocks beginning at
+    the (ascending) positions in starts, hashing every row once."""
+    if rows.empty:
+        return []
+    values, hashes = _row_hashes(rows)
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.diff(np.append(starts, len(rows)))
+    totals = np.add.reduceat(values, starts)
+    digests = np.add.reduceat(hashes, starts)  # uint64, wraps like the sum
+    return [(int(count), float(total), int(digest)) for count, total, digest in zip(counts, totals, digests)]
+
+
+def direction_fingerprints(rows: pd.DataFrame) -> Dict[str, Fingerprint]:
+    """history_fingerprint of each Direction's rows."""
+    if rows.empty:
+        return {}
+    codes, directions = pd.factorize(rows['Direction'].astype(str))
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+    fingerprints = block_fingerprints(rows.iloc[order], starts)
+    return {directions[codes[order][start]]: fingerprint for start, fingerprint in zip(starts, fingerprints)}
+
+
+def combine_fingerprints(*fingerprints: Fingerprint) -> Fingerprint:
+    """Fingerprint of the union of disjoint row sets."""
+    count = sum(fingerprint[0] for fingerprint in fingerprints)
+    total = sum((fingerprint[1] for fingerprint in fingerprints), 0.0)
+    digest = sum(fingerprint[2] for fingerprint in fingerprints) % (1 << 64)
+    return (count, total, digest)
+
+
+def fingerprints_match(stored, current: Fingerprint) -> bool:
+    # Fingerprints written before the content hash existed never match
+    if not stored or len(stored) != len(current) or stored[0] != current[0] or stored[2] != current[2]:
+        return False
+    return math.isclose(stored[1], current[1], rel_tol=1e-9, abs_tol=1e-6)
+
+
+def load_snapshot(history_path: Path, year: int, month: int, direction: str,
+                  fingerprint: Fingerprint) -> Optional[pd.DataFrame]:
+    """Return the stored cumulative, or None if missing or stale."""
+    path = snapshot_path(history_path, year, month, direction)
+    if not path.exists():
+        return None
+
+    try:
+        snapshot = pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {path.name}: {e}")
+        return None
+
+    if not fingerprints_match(snapshot.attrs.get('fingerprint'), fingerprint):
+        logger.info(f"Snapshot {path.name} does not match history, rebuilding")
+        return None
+
+    return snapshot
+
+
+def save_snapshot(history_path: Path, year: int, month: int, direction: str,
+                  cumulative: pd.DataFrame, fingerprint: Fingerprint) -> Path:
+    path = snapshot_path(history_path, year, month, direction)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    snapshot = cumulative.copy()
+    snapshot.attrs['fingerprint'] = tuple(fingerprint)
+
+    tmp_path = path.with_suffix('.tmp')
+    snapshot.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+    logger.info(f"Saved snapshot {path.name}: {len(snapshot):,} keys")
+    return path
+
+
+def invalidate_snapshots(history_path: Path, year: int, from_month: int,
+                         directions: Iterable[str] = ('I', 'E')) -> int:
+    """Remove snapshots of a fiscal year from from_month onwards."""
+    directory = store_dir(history_path) / SNAPSHOT_DIR_NAME
+    if not directory.exists():
+        return 0
+
+    directions = set(directions)
+    start = fiscal_period(year, from_month)
+    removed = 0
+
+    for path in directory.glob(f"{int(year)}-*.pkl"):
+        match = _SNAPSHOT_PATTERN.match(path.name)
+        if not match or match.group(3) not in directions:
+            continue
+        if fiscal_period(year, int(match.group(2))) >= start:
+            path.unlink(missing_ok=True)
+            removed += 1
+
+    if removed:
+        logger.info(f"Invalidated {removed} snapshot(s) for Year={year} from Month={from_month}")
+    return removed
+
+
+def previous_cumulatives(history_path: Path, previous_filtered: pd.DataFrame,
+                         trade_types: Iterable[str], year: int, previous_month: int,
+                         use_snapshots: bool = True,
+                         fingerprints: Optional[Dict[str, Fingerprint]] = None) -> Dict[str, pd.DataFrame]:
+    """Previous month's cumulative per trade type, from snapshots when valid.
+    
+    fingerprints are the per-Direction fingerprints of previous_filtered
+    (e.g. combined from the history index); they are hashed from the rows
+    when not given. Directions without a valid snapshot are aggregated
+    together in one grouped pass and their snapshots are saved.
+    """
+    trade_types = list(trade_types)
+    if not use_snapshots or previous_filtered.empty:
+        return calculate_previous_cumulatives(previous_filtered, trade_types)
+
+    if fingerprints is None:
+        fingerprints = direction_fingerprints(previous_filtered)
+
+    result = {}
+    for trade_type in trade_types:
+        direction = DIRECTIONS[trade_type]
+        snapshot = load_snapshot(history_path, year, previous_month, direction,
+                                 fingerprints.get(direction, EMPTY_FINGERPRINT))
+        if snapshot is not None:
+            logger.info(f"Loaded {trade_type} cumulative for Year={year}, Month={previous_month} "
+                        f"from snapshot ({len(snapshot):,} keys)")
+            result[trade_type] = snapshot
+
+    missing = [trade_type for trade_type in trade_types if trade_type not in result]
+    if missing:
+        for trade_type, cumulative in calculate_previous_cumulatives(previous_filtered, missing).items():
+            result[trade_type] = cumulative
+            if not cumulative.empty:
+                direction = DIRECTIONS[trade_type]
+                save_snapshot(history_path, year, previous_month, direction,
+                              cumulative, fingerprints.get(direction, EMPTY_FINGERPRINT))
+
+    return {trade_type: result[trade_type] for trade_type in trade_types}
+
+
+def record_month(history_path: Path, year: int, month: int, trade_type: str,
+                 previous: pd.DataFrame, previous_fingerprint: Fingerprint,
+                 monthly_df: pd.DataFrame) -> Optional[Path]:
+    """Invalidate replaced snapshots and store the cumulative for a written month.
+    
+    previous_fingerprint is the fingerprint of the direction's history
+    rows behind previous; the month's rows are added to it.
+    """
+    direction = DIRECTIONS[trade_type]
+    invalidate_snapshots(history_path, year, month, [direction])
+
+    monthly = monthly_df[monthly_df['Direction'] == direction] if not monthly_df.empty else monthly_df
+    cumulative = advance_cumulative(previous, monthly, trade_type)
+    if cumulative.empty:
+        return None
+
+    return save_snapshot(history_path, year, month, direction, cumulative,
+                         combine_fingerprints(previous_fingerprint, history_fingerprint(monthly)))
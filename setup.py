@@ -36,6 +36,9 @@ setup(
         "pycountry>=20.7.0",
         "pdfplumber>=0.10.0"
     ],
+    extras_require={
+        "sparse": ["scipy>=1.7"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -1,9 +1,14 @@
 """Pytest configuration and fixtures."""
 
+import os
+import tempfile
 import pytest
 from pathlib import Path
 import pandas as pd
 
+# Keep persistent resolver caches out of the user's cache directory
+os.environ.setdefault('DATA_PIPELINE_CACHE_DIR', tempfile.mkdtemp(prefix='data_pipeline_cache_'))
+
 
 @pytest.fixture(scope="session")
 def data_dir():
@@ -0,0 +1,85 @@
+"""Tests for darta cleaning - Nepali numerals and code mapping."""
+import pytest
+import pandas as pd
+
+from data_pipeline.core.utils import convert_nepali_series, convert_nepali_to_english
+from data_pipeline.darta.config import NEPALI_TO_ENGLISH_DIGITS
+from data_pipeline.darta import cleaner
+from data_pipeline.darta.cleaner import fuzzy_find_code, map_codes, process_darta_data
+
+
+class TestNepaliDigitConversion:
+    """Test cell and column-level numeral conversion."""
+
+    def test_convert_cell(self):
+        assert convert_nepali_to_english('२०७९-०५-१२', NEPALI_TO_ENGLISH_DIGITS) == '2079-05-12'
+
+    def test_convert_cell_keeps_null(self):
+        assert convert_nepali_to_english(None, NEPALI_TO_ENGLISH_DIGITS) is None
+
+    def test_convert_series_matches_cells(self):
+        series = pd.Series(['११०११९-०६९', 'abc', None, 12, '९८४१ 01'])
+        result = convert_nepali_series(series, NEPALI_TO_ENGLISH_DIGITS)
+        expected = series.apply(convert_nepali_to_english, args=(NEPALI_TO_ENGLISH_DIGITS,))
+        assert result.tolist()[:2] == ['110119-069', 'abc']
+        assert result[series.notna()].tolist() == expected[series.notna()].tolist()
+        assert result.iloc[2] is None
+
+    def test_convert_series_chunks_and_long_cells(self, monkeypatch):
+        from data_pipeline.core.utils import data_utils
+        monkeypatch.setattr(data_utils, 'NEPALI_MATRIX_MAX_WIDTH', 8)
+        monkeypatch.setattr(data_utils, 'NEPALI_MATRIX_CHUNK_CELLS', 16)
+        series = pd.Series(['१२३', '०७९-०५-१२ ' * 5, None, '', 'abc', '९८४१'] * 3)
+        result = convert_nepali_series(series, NEPALI_TO_ENGLISH_DIGITS)
+        expected = series.apply(convert_nepali_to_english, args=(NEPALI_TO_ENGLISH_DIGITS,))
+        assert result[series.notna()].tolist() == expected[series.notna()].tolist()
+        assert result.iloc[1] == '079-05-12 ' * 5
+
+    def test_convert_series_all_null(self):
+        series = pd.Series([None, None])
+        assert convert_nepali_series(series, NEPALI_TO_ENGLISH_DIGITS).isna().all()
+
+    def test_cell_helpers_convert_nepali_input(self):
+        assert cleaner.clean_registration_number('११०११९-०६९-०७२') == '110119'
+        assert cleaner.parse_date_components('२०७९-०५-१२') == {'year': 2079, 'month': 5, 'day': 12}
+        assert cleaner.clean_phone_number('९८४१२३४५६७') == cleaner.clean_phone_number('9841234567')
+
+
+class TestProcessDartaData:
+    """Test the darta cleaning pipeline."""
+
+    def test_process_converts_and_maps(self):
+        df = pd.DataFrame({
+            'reg_no': ['००८/०७३-७४', '780'],
+            'nregdate': ['२०७९-०५-१२', '2080/1/2'],
+            'province': ['Bagmati Province', 'Koshi Provinc'],
+            'district': ['Kathmandu', 'Lalitpurr'],
+            'director_phone': ['९८४११२२३३४', '01-4412345'],
+        })
+        result = process_darta_data(df)
+        assert result['reg_no'].tolist() == ['008', '780']
+        assert result['year'].tolist() == [2079, 2080]
+        assert result['province_code'].tolist() == ['3', '1']
+        assert result['district_code'].tolist() == ['27', '25']
+        assert result['director_phone'].tolist() == ['9841122334', '01-4412345']
+
+
+class TestCodeMapping:
+    """Test persistently memoized name-to-code resolution."""
+
+    def test_map_codes_reuses_stored_results(self, monkeypatch):
+        mapping = {'Kathmandu': '27', 'Lalitpur': '25'}
+        names = pd.Series(['Kathmandu', 'Lalitpurr', 'Lalitpurr', None])
+        assert map_codes(names, mapping).tolist() == ['27', '25', '25', None]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("resolved again instead of read from the store")
+        monkeypatch.setattr(cleaner, '_mapping_matcher', fail)
+        assert map_codes(names, mapping).tolist() == ['27', '25', '25', None]
+
+    def test_cached_miss_still_warns(self, caplog):
+        mapping = {'Kathmandu': '27'}
+        for _ in range(2):
+            caplog.clear()
+            assert fuzzy_find_code('Nowhere', mapping) is None
+            assert 'No mapping found for: Nowhere' in caplog.text
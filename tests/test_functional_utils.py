@@ -4,8 +4,9 @@ import pytest
 import pandas as pd
 from data_pipeline.core.utils import (
     pipe, compose, with_column, create_filter, combine_filters,
-    filter_by_column, clean_numerics, clean_hs_codes_fn,
-    add_composite_key, remove_nulls, apply_to_column, strip_strings
+    filter_by_column, any_of, negate, clean_numerics, clean_hs_codes_fn,
+    add_composite_key, remove_nulls, apply_to_column, strip_strings,
+    apply_unique, drop_matching_keys
 )
 
 
@@ -69,6 +70,38 @@ class TestFilters:
         filter_fn = filter_by_column('Status', '==', 'active')
         result = filter_fn(df)
         assert len(result) == 2
+    
+    def test_or_expression(self):
+        df = pd.DataFrame({'Month': list(range(1, 13))})
+        expr = create_filter('Month', '>=', 10) | create_filter('Month', '<=', 2)
+        assert expr(df).sum() == 5
+        assert any_of(create_filter('Month', '==', 1), create_filter('Month', '==', 2))(df).sum() == 2
+    
+    def test_not_expression(self):
+        df = pd.DataFrame({'Country': ['NP', 'IN', 'CN']})
+        expr = ~create_filter('Country', 'in', ['NP', 'IN'])
+        assert expr.indices(df).tolist() == [2]
+        assert negate(expr)(df).sum() == 2
+    
+    def test_nested_expression_large_frame(self):
+        n = 50_000
+        df = pd.DataFrame({'Year': [2081, 2082] * (n // 2), 'Month': list(range(1, 11)) * (n // 10)})
+        expr = create_filter('Year', '==', 2081) & (create_filter('Month', '>=', 4) | create_filter('Month', '<=', 2))
+        expected = (df['Year'] == 2081) & ((df['Month'] >= 4) | (df['Month'] <= 2))
+        assert expr(df).equals(expected)
+    
+    def test_select_returns_independent_copy(self):
+        df = pd.DataFrame({'Year': [2081, 2081, 2082], 'Value': [1.0, 2.0, 3.0]})
+        for value in (2081, [2081, 2082]):
+            selected = combine_filters(create_filter('Year', 'in', value))(df)
+            assert selected is not df
+            selected['Value'] = 0.0
+        assert df['Value'].tolist() == [1.0, 2.0, 3.0]
+    
+    def test_combine_with_plain_callable(self):
+        df = pd.DataFrame({'Year': [2081, 2082], 'Month': [5, 5]})
+        combined = combine_filters(create_filter('Month', '==', 5), lambda d: d['Year'] > 2081)
+        assert combined(df)['Year'].tolist() == [2082]
 
 
 class TestTransforms:
@@ -133,6 +166,29 @@ class TestTransforms:
         transform = apply_to_column('Value', lambda x: x * 10)
         result = transform(df)
         assert result['Value'].tolist() == [10, 20, 30]
+    
+    def test_apply_unique_calls_once_per_value(self):
+        calls = []
+        def upper(value):
+            calls.append(value)
+            return value.upper() if isinstance(value, str) else value
+        series = pd.Series(['np', 'in', 'np', None, 'in', None], index=list('abcdef'))
+        result = apply_unique(series, upper)
+        assert result.tolist()[:3] == ['NP', 'IN', 'NP']
+        assert result.isna().sum() == 2
+        assert list(result.index) == list('abcdef')
+        assert len(calls) == 3
+    
+    def test_apply_unique_keeps_numeric_dtype(self):
+        result = apply_unique(pd.Series([1, 2, 1]), lambda x: x * 10)
+        assert result.dtype == 'int64'
+    
+    def test_drop_matching_keys(self):
+        df = pd.DataFrame({'Year': [2081, 2081, 2081, 2082], 'Month': [4, 4, 5, 4], 'v': [1, 2, 3, 4]})
+        keys = pd.DataFrame({'Year': [2081, 2082, 2082], 'Month': [4, 4, 4]})
+        remaining, removed = drop_matching_keys(df, keys, ['Year', 'Month'])
+        assert remaining['v'].tolist() == [3]
+        assert removed.to_dict() == {(2081, 4): 2, (2082, 4): 1}
 
 
 class TestIntegration:
@@ -0,0 +1,57 @@
+"""Tests for the indexed fuzzy matcher."""
+import pytest
+import pandas as pd
+from difflib import SequenceMatcher
+
+from data_pipeline.core.utils import FuzzyMatcher
+from data_pipeline.core.utils.fuzzy_matcher import similarity
+
+
+class TestSimilarity:
+    """Test the bit-parallel similarity scorer."""
+
+    def test_identical_strings(self):
+        assert similarity('kathmandu', 'kathmandu') == 1.0
+
+    def test_disjoint_strings(self):
+        assert similarity('abc', 'xyz') == 0.0
+
+    def test_at_least_sequence_matcher_ratio(self):
+        """LCS-based score is never below difflib's greedy ratio."""
+        pairs = [('federal', 'fedarel'), ('lalitpur', 'lalitpurr'), ('viet nam', 'vietnam')]
+        for a, b in pairs:
+            assert similarity(a, b) >= SequenceMatcher(None, a, b).ratio() - 1e-9
+
+
+class TestFuzzyMatcher:
+    """Test candidate indexing and querying."""
+
+    @pytest.fixture
+    def matcher(self):
+        return FuzzyMatcher({'Kathmandu': '27', 'Lalitpur': '25', 'Bhaktapur': '26'})
+
+    def test_exact_match_is_case_insensitive(self, matcher):
+        assert matcher.best('  kathmandu ') == '27'
+
+    def test_best_fuzzy_match(self, matcher):
+        assert matcher.best('Lalitpurr', threshold=0.75) == '25'
+
+    def test_threshold_rejects_weak_matches(self, matcher):
+        assert matcher.best('Pokhara', threshold=0.75) is None
+
+    def test_search_returns_top_k_sorted(self, matcher):
+        results = matcher.search('bhaktapur', limit=2)
+        assert results[0][1] == '26'
+        assert len(results) <= 2
+        assert results == sorted(results, key=lambda r: -r[2])
+
+    def test_iterable_vocabulary(self):
+        matcher = FuzzyMatcher(['federal', 'province', 'local'])
+        assert matcher.best('provinc', threshold=0.6) == 'province'
+
+    def test_match_series(self, matcher):
+        series = pd.Series(['Kathmandu', 'kathmandoo', None, 'Nowhere'])
+        result = matcher.match_series(series, threshold=0.75)
+        assert result.tolist()[:2] == ['27', '27']
+        assert pd.isna(result.iloc[2])
+        assert pd.isna(result.iloc[3])
@@ -0,0 +1,81 @@
+"""Tests for vectorized header-row detection."""
+import re
+
+import pytest
+import pandas as pd
+
+from data_pipeline.core.utils import detect_header_row, header_row_mask, frame_from_header_row
+from data_pipeline.trade.config import TRADE_HEADER_SIGNATURE
+from data_pipeline.budget.config import BUDGET_HEADER_SIGNATURE, COLUMN_MAPPING
+from data_pipeline.darta.config import DARTA_HEADER_SIGNATURE
+from data_pipeline.trade.excel_reader import TradeExcelReader
+
+
+class TestDetectHeaderRow:
+    """Test header detection with dataset signatures."""
+
+    @pytest.fixture
+    def trade_sheet(self):
+        return pd.DataFrame([
+            ['Foreign Trade Statistics', None, None, None, None],
+            ['Table 4: Imports (Shrawan-Ashwin)', None, None, None, None],
+            ['HS Code', 'Description', 'Partner Countries', 'Unit', 'Value (Rs)'],
+            ['01011000', 'Live horses', 'India', 'pcs', 1200],
+            ['01012000', 'Live asses', 'China', 'pcs', 300],
+        ])
+
+    def test_trade_header_and_mapping(self, trade_sheet):
+        row, mapping = detect_header_row(trade_sheet, TRADE_HEADER_SIGNATURE)
+        assert row == 2
+        assert mapping == {0: 'HS_Code', 1: 'Commodity', 2: 'Country', 3: 'Unit', 4: 'Value'}
+
+    def test_frame_from_header_row(self, trade_sheet):
+        df = frame_from_header_row(trade_sheet, 2)
+        assert list(df.columns)[0] == 'HS Code'
+        assert len(df) == 2
+        assert pd.api.types.is_numeric_dtype(df['Value (Rs)'])
+
+    def test_budget_signature(self):
+        sheet = pd.DataFrame([
+            ['Budget 2082/83', None, None],
+            ['BUD_YEAR', 'PROJECT_CODE', 'AMOUNT'],
+            ['2082/83', 'P1', 100],
+        ])
+        row, mapping = detect_header_row(sheet, BUDGET_HEADER_SIGNATURE)
+        assert row == 1
+        assert mapping == {0: 'Year', 1: 'Project_Code', 2: 'Amount'}
+
+    def test_no_header_found(self):
+        sheet = pd.DataFrame([['a', 'b'], ['c', 'd']])
+        assert detect_header_row(sheet, TRADE_HEADER_SIGNATURE) == (None, {})
+
+    def test_darta_header_mask(self):
+        table = pd.DataFrame([
+            ['reg_no', 'medianame', 'province', 'district'],
+            ['१२३', 'Khabar', 'Bagmati Province', 'Kathmandu'],
+            ['reg_no', 'medianame', 'province', 'district'],
+        ])
+        assert header_row_mask(table, DARTA_HEADER_SIGNATURE).tolist() == [True, False, True]
+
+    def test_budget_signature_matches_names_literally(self):
+        for source, name in COLUMN_MAPPING.items():
+            pattern = BUDGET_HEADER_SIGNATURE['fields'][name]
+            assert re.fullmatch(pattern, source.lower())
+            assert not re.fullmatch(pattern, source.lower() + 'x')
+
+    def test_trade_reader_keeps_unmapped_columns(self, tmp_path):
+        path = tmp_path / 'fts.xlsx'
+        table = pd.DataFrame([['01011000', 'Live horses', 'India', 'pcs', 1200, 15, 'ok']],
+                             columns=['HS Code', 'Description', 'Partner Countries', 'Unit',
+                                      'Value (Rs)', 'Value (USD)', 'Remarks'])
+        with pd.ExcelWriter(path) as writer:
+            pd.DataFrame([['Table 4: Imports']]).to_excel(writer, sheet_name='Table 4 Import',
+                                                          header=False, index=False)
+            table.to_excel(writer, sheet_name='Table 4 Import', startrow=2, index=False)
+
+        reader = TradeExcelReader(path)
+        df = reader.read_import_data()
+        reader.close()
+        assert list(df.columns)[:7] == ['HS_Code', 'Commodity', 'Country', 'Unit', 'Value',
+                                        'value_(usd)', 'remarks']
+        assert df['Value'].tolist() == [1200]
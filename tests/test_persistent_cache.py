@@ -0,0 +1,87 @@
+"""Tests for persistent resolver memoization."""
+import pytest
+
+from data_pipeline.core.utils import persistent_memo, mapping_version, get_memo_store
+
+
+class TestPersistentMemo:
+    """Test the SQLite-backed memo decorator."""
+
+    @pytest.fixture
+    def store_path(self, tmp_path):
+        return tmp_path / 'memo.sqlite'
+
+    def test_results_survive_new_wrappers(self, store_path):
+        calls = []
+
+        def resolve(name):
+            calls.append(name)
+            return name.upper()
+
+        first = persistent_memo(version='v1', path=store_path)(resolve)
+        assert first('nepal') == 'NEPAL'
+
+        # A fresh wrapper over the same function simulates a new process
+        second = persistent_memo(version='v1', path=store_path)(resolve)
+        assert second('nepal') == 'NEPAL'
+        assert calls == ['nepal']
+
+    def test_version_change_invalidates(self, store_path):
+        calls = []
+
+        def resolve(name):
+            calls.append(name)
+            return len(calls)
+
+        mapping = {'Kathmandu': '27'}
+        cached = persistent_memo(version=lambda: mapping_version(mapping), path=store_path)(resolve)
+        assert cached('x') == 1
+        assert cached('x') == 1
+
+        mapping['Lalitpur'] = '25'
+        assert cached('x') == 1, "The version is computed once per process"
+        cached.refresh_version()
+        assert cached('x') == 2
+
+    def test_key_function_replaces_arguments(self, store_path):
+        calls = []
+
+        def resolve(name, table):
+            calls.append(name)
+            return table[name]
+
+        cached = persistent_memo(version='v1', path=store_path, key=lambda name, table: name)(resolve)
+        assert cached('a', {'a': 1}) == 1
+        assert cached('a', {'a': 1, 'unpicklable': lambda: None}) == 1
+        assert calls == ['a']
+
+    def test_hits_defer_access_time_writes(self, store_path):
+        store = get_memo_store(store_path)
+        store.put('f', 'v', b'k', 1)
+        before = store._connection().total_changes
+
+        for _ in range(10):
+            assert store.get('f', 'v', b'k') == 1
+        assert store._connection().total_changes == before, "Cache hits do not write"
+
+        store.flush()
+        assert store._connection().total_changes == before + 1
+
+    def test_lru_eviction(self, store_path):
+        store = get_memo_store(store_path, max_entries=10)
+        for i in range(20):
+            store.put('f', 'v', str(i).encode(), i)
+        store._evict(store._connection())
+        assert len(store) == 10
+
+    def test_disabled_by_environment(self, store_path, monkeypatch):
+        monkeypatch.setenv('DATA_PIPELINE_NO_CACHE', '1')
+        calls = []
+        cached = persistent_memo(path=store_path)(lambda x: calls.append(x) or x)
+        cached(1)
+        cached(1)
+        assert calls == [1, 1]
+
+    def test_mapping_version_is_order_independent(self):
+        assert mapping_version({'a': 1, 'b': 2}) == mapping_version({'b': 2, 'a': 1})
+        assert mapping_version({'a': 1}) != mapping_version({'a': 2})
@@ -0,0 +1,87 @@
+"""Tests for fiscal-year backfill from cumulative workbooks."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade.backfill import backfill, plan_backfill, read_workbooks
+from data_pipeline.trade.store import snapshot_path
+
+
+def write_workbook(path, title, imports, exports):
+    """Write a minimal FTS-style workbook with a title row above each table."""
+    with pd.ExcelWriter(path) as writer:
+        for sheet, rows in (('Table 4 Import', imports), ('Table 6 Export', exports)):
+            header = pd.DataFrame([[title, None, None, None]])
+            table = pd.DataFrame(rows, columns=['HS Code', 'Partner Countries', 'Unit', 'Value'])
+            header.to_excel(writer, sheet_name=sheet, header=False, index=False)
+            table.to_excel(writer, sheet_name=sheet, startrow=2, index=False)
+    return path
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    return [
+        write_workbook(tmp_path / 'fts_2081_bhadra.xlsx', 'FY 2081/82 (Shrawan-Bhadra)',
+                       [['1001', 'IN', 'kg', 300], ['1002', 'CN', 'kg', 50]], [['2001', 'US', 'pcs', 40]]),
+        write_workbook(tmp_path / 'fts_2081_shrawan.xlsx', 'FY 2081/82 (Shrawan-Shrawan)',
+                       [['1001', 'IN', 'kg', 100]], [['2001', 'US', 'pcs', 10]]),
+        write_workbook(tmp_path / 'fts_2082_shrawan.xlsx', 'FY 2082/83 (Shrawan-Shrawan)',
+                       [['1001', 'IN', 'kg', 70]], [['2001', 'US', 'pcs', 5]]),
+    ]
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    path = tmp_path / 'done.csv'
+    pd.DataFrame({
+        'Year': [2080, 2081], 'Month': [12, 5], 'Direction': ['I', 'I'],
+        'HS_Code': ['9999', '1001'], 'Country': ['IN', 'IN'],
+        'Value': [1.0, 999.0], 'Quantity': [0.0, 0.0], 'Unit': ['kg', 'kg'], 'Revenue': [0.0, 0.0]
+    }).to_csv(path, index=False)
+    return path
+
+
+class TestBackfill:
+    """Test planning and one-pass backfill."""
+
+    def test_plan_groups_and_orders_by_fiscal_month(self, workbooks):
+        plan = plan_backfill(workbooks)
+        assert list(plan) == [2081, 2082]
+        assert [target for target, _, _ in plan[2081]] == [4, 5]
+
+    def test_backfill_differences_consecutive_months(self, workbooks, history_path):
+        result = backfill(workbooks, history_path, output_name='done_backfilled.csv')
+        rows = result.set_index(['Year', 'Month', 'Direction', 'HS_Code'])['Value']
+
+        assert rows.loc[(2081, 4, 'I', '1001')] == 100
+        assert rows.loc[(2081, 5, 'I', '1001')] == 200, "Month 5 is the second cumulative minus the first"
+        assert rows.loc[(2081, 5, 'I', '1002')] == 50
+        assert rows.loc[(2081, 5, 'E', '2001')] == 30
+        assert rows.loc[(2082, 4, 'E', '2001')] == 5
+        assert (2080, 12, 'I', '9999') in rows.index, "Other history is kept"
+        assert len(result[(result['Year'] == 2081) & (result['Month'] == 5) & (result['Direction'] == 'I')]) == 2
+        assert snapshot_path(history_path, 2081, 5, 'I').exists()
+
+    def test_duplicate_month_is_rejected(self, workbooks, tmp_path):
+        extra = write_workbook(tmp_path / 'copy.xlsx', 'FY 2081/82 (Shrawan-Bhadra)',
+                               [['1001', 'IN', 'kg', 1]], [['2001', 'US', 'pcs', 1]])
+        with pytest.raises(ValueError):
+            plan_backfill(workbooks + [extra])
+
+    def test_sparse_engine_matches_pandas(self, workbooks, history_path):
+        pytest.importorskip('scipy')
+        columns = ['Year', 'Month', 'Direction', 'HS_Code', 'Country', 'Value']
+        expected = backfill(workbooks, history_path, output_name='pandas.csv')[columns]
+        result = backfill(workbooks, history_path, output_name='sparse.csv', engine='sparse')[columns]
+
+        pd.testing.assert_frame_equal(result.sort_values(columns).reset_index(drop=True),
+                                      expected.sort_values(columns).reset_index(drop=True))
+
+    def test_single_year_parses_workbooks_in_parallel(self, workbooks, history_path):
+        one_year = [path for path in workbooks if '2081' in path.name]
+        parsed = read_workbooks(one_year, max_workers=2)
+        assert list(parsed) == one_year
+
+        columns = ['Year', 'Month', 'Direction', 'HS_Code', 'Country', 'Value']
+        serial = backfill(one_year, history_path, output_name='serial.csv', max_workers=1)[columns]
+        parallel = backfill(one_year, history_path, output_name='parallel.csv', max_workers=2)[columns]
+        pd.testing.assert_frame_equal(parallel, serial)
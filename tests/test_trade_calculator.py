@@ -5,7 +5,10 @@ from data_pipeline.trade.calculator import (
     calculate_previous_cumulative,
     calculate_monthly_values,
     process_trade_type,
-    combine_import_export
+    combine_import_export,
+    difference_cumulatives,
+    calculate_previous_cumulatives,
+    calculate_monthly_combined
 )
 
 
@@ -129,6 +132,38 @@ class TestCalculateMonthlyValues:
         # All current items should appear (no previous to subtract)
         assert len(result) > 0, "Should return data for new items"
 
+    
+    def test_monthly_values_and_coalescing(self, current_cumulative, previous_cumulative):
+        """Differences per key, with attributes falling back to previous values."""
+        current = current_cumulative.copy()
+        current['Unit'] = ['', 'kg', 'pcs']
+        previous = previous_cumulative.assign(_key=['1001|IN', '1002|CN'])
+        previous.loc[2] = ['1004|IN', '1004', 'IN', 10, 1, None, 5]
+        
+        result = calculate_monthly_values(current, previous, 'import', 2081, 6)
+        by_hs = result.set_index('HS_Code')
+        
+        assert list(result.columns) == ['Year', 'Month', 'Direction', 'HS_Code', 'Country',
+                                        'Value', 'Quantity', 'Unit', 'Revenue']
+        assert by_hs.loc['1001', ['Value', 'Quantity', 'Revenue']].tolist() == [200, 20, 100]
+        assert by_hs.loc['1001', 'Unit'] == 'kg'
+        assert by_hs.loc['1003', 'Value'] == 200
+        assert '1004' not in by_hs.index, "Negative-only keys should be dropped"
+
+
+class TestDifferenceCumulatives:
+    """Test the aligned outer-join differencing."""
+    
+    def test_outer_join_and_defaults(self):
+        current = pd.DataFrame({'_key': ['a', 'b'], 'HS_Code': ['1', '2'], 'Country': ['IN', 'CN'],
+                                'Value': [10, 5], 'Quantity': [1, 1], 'Unit': ['kg', None]})
+        previous = pd.DataFrame({'_key': ['b', 'c'], 'HS_Code': ['2', '3'], 'Country': ['CN', 'US'],
+                                 'Value': [2, 4], 'Quantity': [1, 1]})
+        result = difference_cumulatives(current, previous, ['Value', 'Quantity'])
+        
+        assert result['HS_Code'].tolist() == ['1', '2', '3']
+        assert result['Value'].tolist() == [10, 3, -4]
+        assert result['Unit'].tolist() == ['kg', 'pcs', 'pcs']
 
 class TestProcessTradeType:
     """Test the main trade type processing function."""
@@ -227,3 +262,50 @@ class TestCombineImportExport:
         
         assert len(result) > 0, "Should return import data"
         assert all(result['Direction'] == 'I'), "Should only have import"
+
+
+class TestCombinedEngine:
+    """Test the single-pass import/export engine against the per-direction path."""
+    
+    @pytest.fixture
+    def history(self):
+        return pd.DataFrame({
+            'Direction': ['I', 'I', 'E', 'E', 'I'],
+            'HS_Code': ['1001', '1002', '1001', '2002', '1001'],
+            'Country': ['IN', 'CN', 'IN', 'US', 'IN'],
+            'Value': [100, 50, 30, 20, 10],
+            'Quantity': [10, 5, 3, 2, 1],
+            'Unit': ['kg', 'kg', 'pcs', 'pcs', 'kg'],
+            'Revenue': [10, 5, 0, 0, 1]
+        })
+    
+    @pytest.fixture
+    def current(self):
+        imports = pd.DataFrame({
+            'HS_Code': ['1001', '1002', '1003'], 'Country': ['India', 'China', 'US'],
+            'Value': [200, 40, 70], 'Quantity': [20, 4, 7], 'Unit': ['kg', 'kg', 'kg'],
+            'Revenue': [30, 4, 7]
+        })
+        exports = pd.DataFrame({
+            'HS_Code': ['1001', '2002'], 'Country': ['India', 'United States'],
+            'Value': [45, 20], 'Quantity': [4, 3], 'Unit': ['pcs', 'pcs']
+        })
+        return {'import': imports, 'export': exports}
+    
+    def test_previous_cumulatives_match_per_direction(self, history):
+        combined = calculate_previous_cumulatives(history)
+        for trade_type in ('import', 'export'):
+            pd.testing.assert_frame_equal(combined[trade_type],
+                                          calculate_previous_cumulative(history, trade_type))
+    
+    def test_monthly_matches_per_direction(self, history, current):
+        previous = calculate_previous_cumulatives(history)
+        expected = combine_import_export(
+            calculate_monthly_values(current['import'], previous['import'], 'import', 2081, 6),
+            calculate_monthly_values(current['export'], previous['export'], 'export', 2081, 6)
+        )
+        result = calculate_monthly_combined(current, previous, 2081, 6)
+        
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        assert result.loc[result['Direction'] == 'E', 'Revenue'].isna().all()
+
@@ -6,8 +6,10 @@ from data_pipeline.trade.cleaner import (
     get_iso2_code,
     clean_country_codes,
     validate_data,
-    clean_monthly_data
+    clean_monthly_data,
+    convert_country_names
 )
+from data_pipeline.trade.country_index import CountryIndex, build_country_index, get_country_index
 
 
 class TestNormalizeCountryName:
@@ -179,3 +181,33 @@ class TestCleanMonthlyData:
         
         assert len(result) > 0, "Should return cleaned data"
         assert 'Year' in result.columns, "Should have Year column"
+
+
+class TestCountryIndex:
+    """Test the precomputed country index."""
+    
+    def test_aliases_are_folded(self):
+        """Accents, case and bracket notes should not matter."""
+        index = get_country_index()
+        assert index.lookup("CÔTE D'IVOIRE") == 'CI'
+        assert index.lookup('Christmas Island [Australia]') == 'CX'
+        assert index.lookup('United Republic of Tanzania') == 'TZ'
+    
+    def test_fuzzy_lookup(self):
+        """Misspelled names should match through the fuzzy index."""
+        assert get_country_index().fuzzy_lookup('Germny') == 'DE'
+    
+    def test_index_round_trips_through_json(self):
+        """Saved index should load back identically."""
+        index = build_country_index()
+        loaded = CountryIndex.from_json(index.to_json())
+        assert loaded.aliases == index.aliases
+        assert loaded.version == index.version
+    
+    def test_convert_country_names(self):
+        """Series conversion should use exact hits and fall back per name."""
+        names = pd.Series(['India', None, 'Germny', 'Viet Nam', 'India'])
+        result = convert_country_names(names)
+        assert result.tolist()[0] == 'IN'
+        assert result.tolist()[2:] == ['DE', 'VN', 'IN']
+        assert pd.isna(result.iloc[1])
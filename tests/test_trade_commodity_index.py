@@ -0,0 +1,78 @@
+"""Tests for the full-text index over commodity descriptions."""
+import pandas as pd
+
+from data_pipeline.trade.backfill import backfill
+from data_pipeline.trade.commodity_index import (
+    CommodityIndex, commodity_descriptions, commodity_index_path, load_commodity_index,
+    search_commodities, tokenize, update_commodity_index
+)
+
+
+def descriptions(pairs):
+    return pd.DataFrame(pairs, columns=['HS_Code', 'Commodity'])
+
+
+def write_workbook(path, title, imports, exports):
+    """FTS-style workbook whose tables carry a description column."""
+    with pd.ExcelWriter(path) as writer:
+        for sheet, rows in (('Table 4 Import', imports), ('Table 6 Export', exports)):
+            header = pd.DataFrame([[title, None, None, None, None]])
+            table = pd.DataFrame(rows, columns=['HS Code', 'Description', 'Partner Countries', 'Unit', 'Value'])
+            header.to_excel(writer, sheet_name=sheet, header=False, index=False)
+            table.to_excel(writer, sheet_name=sheet, startrow=2, index=False)
+    return path
+
+
+class TestCommodityIndex:
+    """Test tokenizing, searching and re-indexing."""
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        assert tokenize('Photovoltaic cells, whether or not in modules') == \
+            ['photovoltaic', 'cells', 'whether', 'modules']
+        assert tokenize(None) == []
+
+    def test_prefix_and_exact_search(self):
+        index = CommodityIndex({'854140': 'Solar cells', '850440': 'Static converters (solar inverters)',
+                                '100630': 'Semi-milled rice'})
+        assert index.search('sol') == ['850440', '854140']
+        assert index.search('sol', prefix=False) == []
+        assert index.search('solar cel') == ['854140'], "Query tokens are AND-ed"
+        assert index.search('the') == []
+
+    def test_changed_description_is_reindexed(self):
+        index = CommodityIndex({'854140': 'Solar cells'})
+        assert index.update(descriptions([['854140', 'Photovoltaic cells'], ['100630', 'Rice']])) == 2
+        assert index.update(descriptions([['100630', 'Rice']])) == 0
+        assert index.search('solar') == []
+        assert index.search('photo') == ['854140']
+        assert 'solar' not in index.postings
+
+    def test_descriptions_normalize_hs_codes_and_keep_latest(self):
+        first = pd.DataFrame({'HS_Code': [854140, 90240], 'Commodity': ['Solar cells', 'Black tea ']})
+        second = pd.DataFrame({'HS_Code': ['854140'], 'Commodity': ['Photovoltaic cells']})
+        pairs = commodity_descriptions([first, None, second]).set_index('HS_Code')['Commodity']
+        assert pairs.to_dict() == {'090240': 'Black tea', '854140': 'Photovoltaic cells'}
+
+    def test_saved_index_round_trips(self, tmp_path):
+        history_path = tmp_path / 'done.csv'
+        update_commodity_index(history_path, descriptions([['854140', 'Solar cells']]))
+        assert commodity_index_path(history_path).exists()
+
+        assert CommodityIndex.from_json(commodity_index_path(history_path).read_text()).descriptions == \
+            load_commodity_index(history_path).descriptions
+        assert search_commodities(history_path, 'solar') == ['854140']
+        assert search_commodities(tmp_path / 'other' / 'done.csv', 'solar') == []
+
+    def test_backfill_indexes_workbook_descriptions(self, tmp_path):
+        history_path = tmp_path / 'done.csv'
+        pd.DataFrame({
+            'Year': [2080], 'Month': [12], 'Direction': ['I'], 'HS_Code': ['9999'], 'Country': ['IN'],
+            'Value': [1.0], 'Quantity': [0.0], 'Unit': ['kg'], 'Revenue': [0.0]
+        }).to_csv(history_path, index=False)
+        workbook = write_workbook(tmp_path / 'fts_2081_shrawan.xlsx', 'FY 2081/82 (Shrawan-Shrawan)',
+                                  [['854140', 'Solar cells', 'CN', 'pcs', 100]],
+                                  [['090240', 'Black tea', 'IN', 'kg', 10]])
+
+        backfill([workbook], history_path, output_name='done_backfilled.csv')
+        assert search_commodities(history_path, 'solar') == ['854140']
+        assert search_commodities(history_path, 'black tea') == ['090240']
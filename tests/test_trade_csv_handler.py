@@ -1,7 +1,9 @@
 """Tests for trade module CSV handler - fiscal year filter logic."""
 import pytest
 import pandas as pd
-from data_pipeline.trade.csv_handler import filter_prev_data, save_updated_csv
+from data_pipeline.trade import process_data
+from data_pipeline.trade.csv_handler import filter_prev_data, read_cumulative_csv, save_updated_csv
+from data_pipeline.trade.periods import PERIOD_COLUMN, add_period_column, fiscal_period, period_to_year_month
 
 
 class TestFilterPrevData:
@@ -55,6 +57,12 @@ class TestFilterPrevData:
         expected = [1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 12]
         assert months == expected, f"Expected {expected}, got {months}"
     
+    def test_filter_end_year_keeps_repeated_rows(self, sample_done_df):
+        """Test that genuinely repeated rows survive the OR case."""
+        repeated = pd.concat([sample_done_df, sample_done_df.iloc[[0]]], ignore_index=True)
+        filtered = filter_prev_data(repeated, 2081, 1)
+        assert (filtered['Month'] == 1).sum() == 2
+    
     def test_filter_returns_correct_year(self, sample_done_df):
         """Test that filter only returns data for specified year."""
         # Add data for different year
@@ -90,6 +98,30 @@ class TestFilterPrevData:
         assert export_count > 0, "Should have export data"
 
 
+
+class TestFiscalPeriods:
+    """Test the fiscal period ordinal and binary-search filtering."""
+    
+    def test_period_ordinal_is_contiguous_per_fiscal_year(self):
+        assert fiscal_period(2081, 4) == 2081 * 12
+        assert fiscal_period(2081, 3) == 2081 * 12 + 11
+        assert fiscal_period(2082, 4) == fiscal_period(2081, 3) + 1
+        assert period_to_year_month(fiscal_period(2081, 1)) == (2081, 1)
+    
+    def test_sorted_history_slice_matches_column_filter(self):
+        df = pd.DataFrame({
+            'Year': [2082, 2081, 2081, 2081, 2080, 2081, 2081],
+            'Month': [4, 3, 4, 12, 5, 4, 1],
+            'Direction': ['I'] * 7,
+            'Value': [1, 2, 3, 4, 5, 3, 7]
+        })
+        history = add_period_column(df)
+        for previous_month in range(1, 13):
+            sliced = filter_prev_data(history, 2081, previous_month).drop(columns=PERIOD_COLUMN)
+            filtered = filter_prev_data(df, 2081, previous_month)
+            assert sorted(sliced['Value']) == sorted(filtered['Value']), previous_month
+        assert len(filter_prev_data(history, 2081, 4)) == 2, "Repeated rows are kept"
+
 class TestSaveUpdatedCsv:
     """Test CSV saving with month replacement logic."""
     
@@ -196,3 +228,91 @@ class TestSaveUpdatedCsv:
         
         # Should have 2 records for month 5 (old + new)
         assert len(month_5_data) == 2, "Should keep both records when not replacing"
+    
+    def test_save_updated_csv_replaces_many_months(self, temp_csv):
+        """All replaced combinations are removed in one pass."""
+        new_data = pd.DataFrame({
+            'Year': [2081, 2081, 2081],
+            'Month': [4, 6, 6],
+            'Direction': ['I', 'I', 'E'],
+            'HS_Code': ['4444', '6666', '6667'],
+            'Country': ['IN', 'US', 'US'],
+            'Value': [1, 2, 3],
+            'Quantity': [1, 1, 1],
+            'Unit': ['kg', 'kg', 'kg'],
+            'Revenue': [0, 0, 0]
+        })
+        
+        result_path = save_updated_csv(temp_csv, new_data, output_name='test_output.csv')
+        result_df = pd.read_csv(result_path)
+        
+        assert sorted(result_df['HS_Code'].astype(str)) == ['1002', '4444', '6666', '6667']
+
+
+class TestReadCumulativeCsv:
+    """Test the schema-typed cumulative CSV reader and the CSV process_data path."""
+    
+    @pytest.fixture
+    def cumulative_csv(self, tmp_path):
+        path = tmp_path / 'cumulative_2081.csv'
+        pd.DataFrame({
+            'Direction': ['I', 'E', 'I', 'I', 'E'],
+            'HS_Code': ['01012100', '2001', '1002', '01012100', '2001'],
+            'Country': ['IN', 'US', 'CN', 'IN', 'US'],
+            'Value': [100.0, 40.0, 20.0, 5.0, 2.0],
+            'Quantity': [1.0, 2.0, 3.0, 4.0, 5.0],
+            'Unit': ['kg', 'pcs', 'kg', 'kg', 'pcs'],
+            'Revenue': [1.0, 0.0, 2.0, 3.0, 0.0]
+        }).to_csv(path, index=False)
+        return path
+    
+    def test_split_keeps_hs_strings(self, cumulative_csv):
+        imports, exports = read_cumulative_csv(cumulative_csv)
+        assert list(imports['HS_Code']) == ['01012100', '1002', '01012100']
+        assert list(exports['Value']) == [40.0, 2.0]
+    
+    def test_chunked_read_sums_duplicate_keys(self, cumulative_csv):
+        imports, exports = read_cumulative_csv(cumulative_csv, chunksize=2)
+        totals = imports.groupby('HS_Code')['Value'].sum()
+        assert totals.to_dict() == {'01012100': 105.0, '1002': 20.0}
+        assert exports['Value'].sum() == 42.0
+    
+    def test_missing_direction(self, tmp_path):
+        path = tmp_path / 'cumulative_2081.csv'
+        pd.DataFrame({'HS_Code': ['1001'], 'Value': [1.0]}).to_csv(path, index=False)
+        with pytest.raises(ValueError):
+            read_cumulative_csv(path)
+    
+    def test_process_data_takes_explicit_month(self, cumulative_csv, tmp_path):
+        history = tmp_path / 'done.csv'
+        pd.DataFrame({
+            'Year': [2081], 'Month': [4], 'Direction': ['I'], 'HS_Code': ['1002'], 'Country': ['CN'],
+            'Value': [15.0], 'Quantity': [1.0], 'Unit': ['kg'], 'Revenue': [0.0]
+        }).to_csv(history, index=False)
+        
+        with pytest.raises(ValueError):
+            process_data(cumulative_csv, history, output_name='done.csv')
+        
+        updated = process_data(cumulative_csv, history, output_name='done.csv', month=5)
+        month = updated[(updated['Year'] == 2081) & (updated['Month'] == 5)]
+        values = month.groupby('Direction')['Value'].sum()
+        assert values['I'] == 110.0
+        assert values['E'] == 42.0
+    
+    def test_leading_zero_codes_are_differenced_against_history(self, tmp_path):
+        history = tmp_path / 'done.csv'
+        pd.DataFrame({
+            'Year': [2081, 2081], 'Month': [4, 4], 'Direction': ['I', 'E'], 'HS_Code': ['01012100'] * 2,
+            'Country': ['IN', 'IN'], 'Value': [100.0, 50.0], 'Quantity': [1.0, 1.0], 'Unit': ['kg'] * 2,
+            'Revenue': [0.0, 0.0]
+        }).to_csv(history, index=False)
+        cumulative = tmp_path / 'cumulative_2081.csv'
+        pd.DataFrame({
+            'Direction': ['I', 'E'], 'HS_Code': ['01012100'] * 2, 'Country': ['IN', 'IN'],
+            'Value': [150.0, 80.0], 'Quantity': [2.0, 2.0], 'Unit': ['kg'] * 2, 'Revenue': [0.0, 0.0]
+        }).to_csv(cumulative, index=False)
+        
+        updated = process_data(cumulative, history, output_name='done.csv', month=5)
+        month = updated[(updated['Year'] == 2081) & (updated['Month'] == 5)]
+        assert month.groupby('Direction')['Value'].sum().to_dict() == {'E': 30.0, 'I': 50.0}
+        assert set(updated['HS_Code']) == {'01012100'}
@@ -0,0 +1,50 @@
+"""Tests for reading summary tables in the same FTS workbook pass."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade.excel_reader import read_fts_workbook
+from tests.test_trade_backfill import write_workbook
+
+TITLE = 'FY 2081/82 (Shrawan-Bhadra)'
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = write_workbook(tmp_path / 'fts_2081_bhadra.xlsx', TITLE,
+                          [['1001', 'IN', 'kg', 300]], [['2001', 'US', 'pcs', 40]])
+    with pd.ExcelWriter(path, mode='a', if_sheet_exists='overlay') as writer:
+        pd.DataFrame([[TITLE, None, None]]).to_excel(writer, sheet_name='Table 2 Country', header=False, index=False)
+        pd.DataFrame([['India', '1,000', 50], ['China', 400, 10], ['Total', 1400, 60]],
+                     columns=['Partner Country', 'Import', 'Export']
+                     ).to_excel(writer, sheet_name='Table 2 Country', startrow=2, index=False)
+        pd.DataFrame([['Food', 80, 5, 85]], columns=['Commodity Group', 'Import', 'Export', 'Total Trade']
+                     ).to_excel(writer, sheet_name='Table 3 Group', index=False)
+    return path
+
+
+class TestReadFtsWorkbook:
+    """Test named frames from one workbook pass."""
+
+    def test_trade_and_summary_tables(self, workbook):
+        tables = read_fts_workbook(workbook)
+        assert set(tables) == {'import', 'export', 'by_country', 'by_commodity_group'}
+        assert list(tables['import']['HS_Code']) == ['1001']
+
+        by_country = tables['by_country']
+        assert list(by_country['Country']) == ['India', 'China']
+        assert list(by_country['Export']) == [50, 10]
+
+        groups = tables['by_commodity_group']
+        assert list(groups.columns) == ['Group', 'Import', 'Export', 'Total']
+        assert groups.loc[0, 'Total'] == 85
+
+    def test_configurable_tables(self, workbook):
+        tables = read_fts_workbook(workbook, summary_tables={
+            'countries': {'keywords': ['country'],
+                          'signature': {'fields': {'Country': r'country', 'Import': r'import'},
+                                        'required': ['Country']}},
+            'missing': {'keywords': ['no such sheet'],
+                        'signature': {'fields': {'Name': r'name'}, 'required': ['Name']}},
+        })
+        assert set(tables) == {'import', 'export', 'countries'}
+        assert list(tables['countries'].columns) == ['Country', 'Import']
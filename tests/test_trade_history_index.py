@@ -0,0 +1,99 @@
+"""Tests for clustered history files and their offset index."""
+import json
+
+import pytest
+import pandas as pd
+
+from data_pipeline.trade import history_index
+from data_pipeline.trade.csv_handler import save_updated_csv
+from data_pipeline.trade.history_index import (
+    index_path,
+    load_index,
+    period_fingerprints,
+    read_fiscal_year,
+    read_history_range,
+    write_history
+)
+from data_pipeline.trade.periods import PERIOD_COLUMN, fiscal_period
+from data_pipeline.trade.store import direction_fingerprints, fingerprints_match
+
+
+@pytest.fixture
+def history():
+    """Rows in append order across two fiscal years."""
+    return pd.DataFrame({
+        'Year': [2081, 2082, 2081, 2081, 2081, 2082],
+        'Month': [5, 4, 1, 4, 5, 4],
+        'Direction': ['I', 'E', 'I', 'I', 'E', 'I'],
+        'HS_Code': ['2002', '1001', '1001', '1002', '1001', '1001'],
+        'Country': ['IN', 'US', 'CN', 'IN', 'US', 'IN'],
+        'Value': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    })
+
+
+@pytest.fixture
+def written(history, tmp_path):
+    return write_history(history, tmp_path / 'done.csv')
+
+
+class TestClusteredHistory:
+    """Test clustered writes and indexed range reads."""
+
+    def test_rows_are_clustered_in_fiscal_order(self, written):
+        df = pd.read_csv(written)
+        assert list(zip(df['Year'], df['Month'], df['Direction'])) == [
+            (2081, 4, 'I'), (2081, 5, 'E'), (2081, 5, 'I'), (2081, 1, 'I'), (2082, 4, 'E'), (2082, 4, 'I')
+        ]
+
+    def test_index_covers_every_block(self, written):
+        index = load_index(written)
+        assert index['rows'] == 6
+        assert [group[:5] for group in index['groups']][:3] == [
+            [2081, 4, 'I', 0, 1], [2081, 5, 'E', 1, 2], [2081, 5, 'I', 2, 3]
+        ]
+
+    def test_range_read_matches_full_scan(self, written, history):
+        result = read_history_range(written, fiscal_period(2081, 5), fiscal_period(2081, 1), directions=['I'])
+        assert list(result['Value']) == [1.0, 3.0]
+        assert result[PERIOD_COLUMN].is_monotonic_increasing
+
+        year = read_fiscal_year(written, 2082)
+        assert sorted(year['Value']) == [2.0, 6.0]
+
+    def test_stale_index_falls_back_to_full_read(self, written):
+        with open(written, 'a', encoding='utf-8') as f:
+            f.write('2082,4,I,9999,DE,7.0\n')
+
+        assert load_index(written) is None
+        assert sorted(read_fiscal_year(written, 2082)['Value']) == [2.0, 6.0, 7.0]
+
+    def test_index_is_json_sidecar(self, written):
+        assert json.loads(index_path(written).read_text())['size'] == written.stat().st_size
+
+
+class TestBlockFingerprints:
+    """Test fingerprints stored per index block."""
+
+    def test_period_fingerprints_match_hashed_rows(self, written):
+        first, last = fiscal_period(2081, 4), fiscal_period(2081, 5)
+        from_index = period_fingerprints(written, first, last)
+        hashed = direction_fingerprints(read_history_range(written, first, last))
+        assert set(from_index) == set(hashed) == {'I', 'E'}
+        for direction, fingerprint in hashed.items():
+            assert fingerprints_match(from_index[direction], fingerprint)
+
+    def test_unchanged_blocks_are_not_hashed_again(self, written, monkeypatch):
+        hashed = []
+        block_fingerprints = history_index.block_fingerprints
+        monkeypatch.setattr(history_index, 'block_fingerprints',
+                            lambda rows, starts: hashed.append(len(rows)) or block_fingerprints(rows, starts))
+
+        monthly = pd.DataFrame({'Year': [2082], 'Month': [5], 'Direction': ['I'], 'HS_Code': ['1001'],
+                                'Country': ['IN'], 'Value': [7.0]})
+        updated = save_updated_csv(written, monthly, output_name='updated.csv')
+        assert hashed == [1], "Only the new month's block is hashed"
+
+        fingerprints = period_fingerprints(updated, fiscal_period(2081, 4), fiscal_period(2082, 5))
+        rows = read_history_range(updated, fiscal_period(2081, 4), fiscal_period(2082, 5))
+        for direction, fingerprint in direction_fingerprints(rows).items():
+            assert fingerprints_match(fingerprints[direction], fingerprint)
@@ -0,0 +1,95 @@
+"""Tests for the HS code prefix index."""
+import pytest
+import pandas as pd
+
+import numpy as np
+
+from data_pipeline.core.utils import clean_hs_codes_fn
+from data_pipeline.trade.calculator import aggregate_directions
+from data_pipeline.trade.hs_codes import (
+    HSIndex, INVALID_HS_CODE, format_hs_codes, normalize_hs_codes, pack_hs_codes, parent_code,
+    truncate_hs_codes
+)
+from data_pipeline.trade.history_index import write_history
+from data_pipeline.trade.query import hs_index
+
+
+class TestPackedHSCodes:
+    """Test the packed integer HS code representation."""
+
+    def test_round_trip_keeps_leading_zeros_and_levels(self):
+        codes = ['01012100', '84', '8471', '847130', '1', ' 8703.0 ']
+        assert list(format_hs_codes(pack_hs_codes(codes))) == ['01012100', '84', '8471', '847130', '1', '8703']
+
+    def test_invalid_codes(self):
+        packed = pack_hs_codes(pd.Series(['Total', None, '', '1234567890123']))
+        assert (packed == INVALID_HS_CODE).all()
+        assert list(format_hs_codes(packed)) == [None] * 4
+
+    def test_packed_codes_sort_like_strings(self):
+        codes = ['84', '8400', '840000', '8401', '85', '0101', '01']
+        order = np.argsort(pack_hs_codes(codes), kind='stable')
+        assert [codes[i] for i in order] == sorted(codes)
+
+    def test_dotted_codes_are_not_rewritten(self):
+        codes = pd.Series(['8401.00', '10.05', 1012100.0, '8703.0'])
+        assert normalize_hs_codes(codes).tolist() == ['8401.00', '10.05', '01012100', '8703']
+        assert clean_hs_codes_fn(pd.DataFrame({'HS_Code': codes}))['HS_Code'].tolist() == \
+            ['8401.00', '10.05', '1012100', '8703']
+        assert list(format_hs_codes(pack_hs_codes(codes))) == [None, None, '1012100', '8703']
+
+    def test_truncate(self):
+        packed = pack_hs_codes(['87032390', '84', 'Total'])
+        assert list(format_hs_codes(truncate_hs_codes(packed, 4))) == ['8703', '84', None]
+
+    def test_calculator_groups_on_canonical_codes(self):
+        df = pd.DataFrame({
+            'Direction': ['I'] * 5, 'HS_Code': ['1001', '1001.0', 1012100, '01012100', 'Total'],
+            'Country': ['CN'] * 5, 'Value': [1.0, 2.0, 4.0, 16.0, 8.0],
+            'Quantity': [1.0] * 5, 'Unit': ['kg'] * 5
+        })
+        result = aggregate_directions(df).set_index('_key')['Value']
+        assert result.to_dict() == {'01012100|CN': 20.0, '1001|CN': 3.0, 'Total|CN': 8.0}
+
+
+@pytest.fixture
+def index():
+    return HSIndex(pd.Series(['87032390', '87032310', 87032400, '84713000', '84715000',
+                              '85171200', 1012100, '87032390', None]))
+
+
+class TestHSIndex:
+    """Test hierarchical lookups over distinct HS codes."""
+
+    def test_codes_are_distinct_normalized_and_sorted(self, index):
+        assert list(index.codes) == ['01012100', '84713000', '84715000', '85171200',
+                                     '87032310', '87032390', '87032400']
+        assert '01012100' in index
+        assert '0101' not in index
+
+    def test_under_prefix(self, index):
+        assert list(index.under('84')) == ['84713000', '84715000']
+        assert list(index.under('8703')) == ['87032310', '87032390', '87032400']
+        assert len(index.under('99')) == 0
+
+    def test_children_and_siblings(self, index):
+        assert list(index.children('87')) == ['8703']
+        assert list(index.children('8703')) == ['870323', '870324']
+        assert list(index.siblings('870323')) == ['870324']
+        assert list(index.siblings('87032390')) == ['87032310']
+        assert list(index.siblings('84')) == ['01', '85', '87']
+
+    def test_parent_code(self):
+        assert parent_code('87032390') == '870323'
+        assert parent_code('84') == ''
+
+    def test_history_index_matches_mirror_dictionary(self, tmp_path):
+        history = pd.DataFrame({
+            'Year': [2081, 2081], 'Month': [4, 4], 'Direction': ['I', 'I'],
+            'HS_Code': ['87032300', '1012100'], 'Country': ['CN', 'IN'],
+            'Value': [1.0, 2.0], 'Quantity': [1.0, 1.0], 'Unit': ['pcs', 'pcs'], 'Revenue': [0.1, 0.1]
+        })
+        path = write_history(history, tmp_path / 'done.csv')
+        index = hs_index(path)
+        assert list(index.under('01')) == ['01012100']
+        assert index.span('8703') == (1, 2)
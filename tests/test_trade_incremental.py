@@ -0,0 +1,90 @@
+"""Tests for incremental reprocessing of republished workbooks."""
+import shutil
+
+import pytest
+import pandas as pd
+
+from data_pipeline.trade import process_data
+from data_pipeline.trade import store
+from data_pipeline.trade.incremental import changed_keys, input_hash_path, key_hashes
+from tests.test_trade_backfill import write_workbook
+
+TITLE = 'FY 2081/82 (Shrawan-Bhadra)'
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    path = tmp_path / 'done.csv'
+    pd.DataFrame({
+        'Year': [2081, 2081, 2081], 'Month': [4, 4, 4], 'Direction': ['I', 'I', 'E'],
+        'HS_Code': ['1001', '1002', '2001'], 'Country': ['IN', 'CN', 'US'],
+        'Value': [100.0, 20.0, 10.0], 'Quantity': [0.0, 0.0, 0.0],
+        'Unit': ['kg', 'kg', 'pcs'], 'Revenue': [0.0, 0.0, 0.0]
+    }).to_csv(path, index=False)
+    return path
+
+
+def month_rows(df):
+    rows = df[(df['Year'] == 2081) & (df['Month'] == 5)]
+    columns = ['Direction', 'HS_Code', 'Country', 'Value', 'Unit']
+    return rows[columns].sort_values(columns).reset_index(drop=True)
+
+
+class TestChangedKeys:
+    """Test key-level change detection."""
+
+    def test_added_changed_and_removed(self):
+        stored = key_hashes(pd.DataFrame({
+            'Direction': ['I', 'I', 'E'], '_key': ['1|IN', '2|CN', '3|US'],
+            'HS_Code': ['1', '2', '3'], 'Country': ['IN', 'CN', 'US'], 'Value': [1.0, 2.0, 3.0]
+        }))
+        current = key_hashes(pd.DataFrame({
+            'Direction': ['I', 'I', 'I'], '_key': ['1|IN', '2|CN', '4|DE'],
+            'HS_Code': ['1', '2', '4'], 'Country': ['IN', 'CN', 'DE'], 'Value': [1.0, 5.0, 4.0]
+        }))
+
+        changes = changed_keys(stored, current).set_index('_key')['change'].to_dict()
+
+        assert changes == {'2|CN': 'changed', '3|US': 'removed', '4|DE': 'added'}
+
+
+class TestIncrementalProcessing:
+    """Test that patching a republished month matches a full rerun."""
+
+    def test_patch_matches_full_reprocessing(self, history_path, tmp_path):
+        first = write_workbook(tmp_path / 'fts_bhadra.xlsx', TITLE,
+                               [['1001', 'IN', 'kg', 300], ['1002', 'CN', 'kg', 50], ['1003', 'US', 'kg', 7]],
+                               [['2001', 'US', 'pcs', 40]])
+        process_data(first, history_path, output_name='done.csv')
+        assert input_hash_path(history_path, 2081, 5).exists()
+        baseline = history_path.with_name('baseline.csv')
+        shutil.copy(history_path, baseline)
+
+        revised = write_workbook(tmp_path / 'fts_bhadra_revised.xlsx', TITLE,
+                                 [['1001', 'IN', 'kg', 350], ['1002', 'CN', 'kg', 50], ['1004', 'DE', 'kg', 9]],
+                                 [['2001', 'US', 'pcs', 40]])
+        patched = process_data(revised, history_path, output_name='done.csv')
+        full = process_data(revised, baseline, output_name='full.csv', incremental=False)
+
+        pd.testing.assert_frame_equal(month_rows(patched), month_rows(full), check_dtype=False)
+        assert len(patched) == len(full)
+        assert set(month_rows(patched)['HS_Code'].astype(str)) == {'1001', '1002', '1004', '2001'}
+
+        reports = [df.attrs['reconciliation'] for df in (patched, full)]
+        pd.testing.assert_frame_equal(reports[0]['totals'], reports[1]['totals'])
+        assert all(report['balanced'] for report in reports), \
+            "The rewritten month sums back to the revised cumulative"
+
+    def test_rerun_does_not_hash_earlier_months(self, history_path, tmp_path, monkeypatch):
+        workbook = write_workbook(tmp_path / 'fts_bhadra.xlsx', TITLE,
+                                  [['1001', 'IN', 'kg', 300], ['1002', 'CN', 'kg', 50]],
+                                  [['2001', 'US', 'pcs', 40]])
+        process_data(workbook, history_path, output_name='done.csv')
+
+        hashed_months = set()
+        row_hashes = store._row_hashes
+        monkeypatch.setattr(store, '_row_hashes',
+                            lambda rows: hashed_months.update(rows['Month']) or row_hashes(rows))
+        process_data(workbook, history_path, output_name='done.csv')
+
+        assert hashed_months <= {5}, "Fingerprints of earlier months come from the history index"
@@ -0,0 +1,109 @@
+"""Tests for persistent interning dictionaries."""
+import pytest
+import numpy as np
+import pandas as pd
+
+from data_pipeline.trade.calculator import aggregate_directions
+from data_pipeline.trade.interning import (
+    Dictionaries, MISSING_ID, active_dictionaries, dictionary_dir, load_dictionaries, use_dictionaries
+)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return tmp_path / 'done.csv'
+
+
+class TestDictionaries:
+    """Test stable ids across runs."""
+
+    def test_ids_survive_reload(self, history_path):
+        first = Dictionaries(dictionary_dir(history_path))
+        assert list(first.encode('country', ['CN', 'IN', 'CN'])) == [0, 1, 0]
+        first.save()
+
+        second = Dictionaries(dictionary_dir(history_path))
+        assert list(second.encode('country', ['US', 'IN'])) == [2, 1]
+        assert list(second.decode('country', np.array([0, 2]))) == ['CN', 'US']
+
+    def test_missing_values_are_not_interned(self):
+        dictionaries = Dictionaries()
+        codes = dictionaries.encode('unit', pd.Series(['kg', None, np.nan, 'kg']))
+        assert list(codes) == [0, MISSING_ID, MISSING_ID, 0]
+        assert list(dictionaries.decode('unit', codes, missing='?')) == ['kg', '?', '?', 'kg']
+
+    def test_values_are_stored_as_strings(self):
+        dictionaries = Dictionaries()
+        assert list(dictionaries.encode('hs', [1001, '1001'])) == [0, 0]
+
+    def test_hs_codes_are_interned_canonically(self):
+        dictionaries = Dictionaries()
+        codes = dictionaries.encode('hs', [1012100, '01012100', '1012100.0', '8401.00'])
+        assert list(codes) == [0, 0, 0, 1]
+        assert list(dictionaries.decode('hs', codes[[0, 3]])) == ['01012100', '8401.00']
+
+    def test_values_appended_by_another_writer_are_merged(self, history_path):
+        first = Dictionaries(dictionary_dir(history_path))
+        second = Dictionaries(dictionary_dir(history_path))
+        first.encode('country', ['CN', 'US'])
+        second.encode('country', ['IN', 'CN'])
+        first.save()
+        second.save()
+
+        assert Dictionaries(dictionary_dir(history_path)).tables['country'].values.tolist() == ['CN', 'US', 'IN']
+        assert list(second.encode('country', ['CN', 'IN'])) == [0, 2], "The merged ids are adopted"
+
+    def test_reassigned_ids_are_rejected(self, history_path):
+        first = Dictionaries(dictionary_dir(history_path))
+        first.encode('country', ['CN'])
+        first.save()
+        second = Dictionaries(dictionary_dir(history_path))
+        second.encode('country', ['IN'])
+        (dictionary_dir(history_path) / 'country.json').write_text('["US"]', encoding='utf-8')
+        with pytest.raises(ValueError):
+            second.save()
+
+    def test_store_dictionaries_are_shared(self, history_path):
+        assert load_dictionaries(history_path) is load_dictionaries(history_path)
+
+    def test_shared_dictionaries_reload_after_another_writer(self, history_path):
+        shared = load_dictionaries(history_path)
+        shared.encode('country', ['CN'])
+        shared.save()
+        assert load_dictionaries(history_path) is shared, "Its own save does not make it stale"
+
+        other = Dictionaries(dictionary_dir(history_path))
+        other.encode('country', ['IN'])
+        other.save()
+
+        reloaded = load_dictionaries(history_path)
+        assert reloaded is not shared
+        assert list(reloaded.encode('country', ['IN', 'CN'])) == [1, 0]
+
+
+class TestCalculatorOnIds:
+    """Test aggregation over interned ids."""
+
+    def test_keys_and_attributes_round_trip(self, history_path):
+        df = pd.DataFrame({
+            'Direction': ['I', 'I', 'E', 'I'], 'HS_Code': ['1001', '1001', '1001', '2002'],
+            'Country': ['CN', 'CN', 'CN', None], 'Value': [1.0, 2.0, 4.0, 8.0],
+            'Quantity': [1.0] * 4, 'Unit': [None, 'kg', 'pcs', None]
+        })
+        with use_dictionaries(history_path):
+            result = aggregate_directions(df).set_index(['Direction', '_key'])
+        assert result.loc[('I', '1001|CN'), 'Value'] == 3.0
+        assert result.loc[('I', '1001|CN'), 'Unit'] == 'kg'
+        assert result.loc[('E', '1001|CN'), 'Unit'] == 'pcs'
+        assert result.loc[('I', '2002|None'), 'Unit'] is None
+
+    def test_scopes_restore_and_do_not_leak(self, tmp_path):
+        first, second = tmp_path / 'a' / 'done.csv', tmp_path / 'b' / 'done.csv'
+        with use_dictionaries(first) as outer:
+            with use_dictionaries(second) as inner:
+                assert active_dictionaries() is inner
+                active_dictionaries().encode('country', ['DE'])
+            assert active_dictionaries() is outer
+            assert len(outer.tables['country']) == 0, "Another history's values stay out"
+
+        assert active_dictionaries() is not active_dictionaries(), "Unscoped calls use a temporary set"
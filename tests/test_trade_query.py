@@ -0,0 +1,54 @@
+"""Tests for indexed trade history queries."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade import query
+from data_pipeline.trade.columnar import columns_dir
+from data_pipeline.trade.history_index import write_history
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    history = pd.DataFrame({
+        'Year': [2081, 2081, 2081, 2081, 2081, 2082, 2080],
+        'Month': [4, 9, 10, 1, 9, 4, 9],
+        'Direction': ['I', 'I', 'I', 'I', 'E', 'I', 'I'],
+        'HS_Code': ['87032300', '87032390', '87032300', '84713000', '87032300', '87032300', '87032300'],
+        'Country': ['CN', 'CN', 'CN', 'CN', 'CN', 'CN', 'IN'],
+        'Value': [1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0],
+        'Quantity': [1.0] * 7,
+        'Unit': ['pcs'] * 7,
+        'Revenue': [0.1] * 7
+    })
+    return write_history(history, tmp_path / 'done.csv')
+
+
+class TestQuery:
+    """Test filters and aggregates of trade.query."""
+
+    def test_selective_query(self, history_path):
+        result = query(history_path, years=2081, months=range(4, 10), direction='I',
+                       hs_prefix='8703', countries='CN')
+        assert sorted(result['Value']) == [1.0, 2.0]
+        assert set(result['HS_Code']) == {'87032300', '87032390'}
+
+    def test_fiscal_months_span_calendar_years(self, history_path):
+        result = query(history_path, years=2081, months=[12, 1, 2], direction='I')
+        assert list(result['Value']) == [8.0]
+        assert list(result['Month']) == [1]
+
+    def test_group_by(self, history_path):
+        result = query(history_path, years=[2080, 2081], hs_prefix='87', group_by=['Year', 'Direction'])
+        totals = result.set_index(['Year', 'Direction'])['Value']
+        assert totals.loc[(2081, 'I')] == 7.0
+        assert totals.loc[(2081, 'E')] == 16.0
+        assert totals.loc[(2080, 'I')] == 64.0
+
+    def test_missing_mirror_is_rebuilt(self, history_path):
+        for path in columns_dir(history_path).iterdir():
+            path.unlink()
+        assert query(history_path, countries=['IN'])['Value'].tolist() == [64.0]
+
+    def test_unknown_values_match_nothing(self, history_path):
+        assert query(history_path, countries='ZZ').empty
+        assert query(history_path, hs_prefix='99').empty
@@ -0,0 +1,88 @@
+"""Tests for reconciling monthly history against cumulative input."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade.calculator import (
+    aggregate_current,
+    calculate_previous_cumulatives,
+    difference_keys,
+    monthly_from_differences
+)
+from data_pipeline.trade.cleaner import clean_monthly_data
+from data_pipeline.trade.reconciliation import reconcile_month
+
+
+@pytest.fixture
+def history():
+    return pd.DataFrame({
+        'Direction': ['I', 'I', 'E'],
+        'HS_Code': ['1001', '1002', '2001'],
+        'Country': ['IN', 'CN', 'US'],
+        'Value': [100.0, 80.0, 30.0],
+        'Quantity': [10.0, 8.0, 3.0],
+        'Unit': ['kg', 'kg', 'pcs'],
+        'Revenue': [10.0, 8.0, 0.0]
+    })
+
+
+@pytest.fixture
+def current():
+    imports = pd.DataFrame({
+        'HS_Code': ['1001', '1002'], 'Country': ['India', 'China'],
+        'Value': [150.0, 60.0], 'Quantity': [15.0, 6.0], 'Unit': ['kg', 'kg'], 'Revenue': [15.0, 6.0]
+    })
+    exports = pd.DataFrame({
+        'HS_Code': ['2001'], 'Country': ['United States'],
+        'Value': [45.0], 'Quantity': [4.0], 'Unit': ['pcs']
+    })
+    return {'import': imports, 'export': exports}
+
+
+def reconcile(history, current, clean=lambda df: df):
+    aggregated = aggregate_current(current)
+    previous = calculate_previous_cumulatives(history)
+    monthly = clean(monthly_from_differences(difference_keys(aggregated, previous), 2081, 6))
+    return monthly, reconcile_month(monthly, previous, aggregated, 2081, 6)
+
+
+class TestReconcileMonth:
+    """Test the reconciliation report."""
+
+    def test_revised_down_key_is_reported(self, history, current):
+        _, report = reconcile(history, current)
+
+        assert not report['balanced']
+        mismatched = report['mismatched']
+        assert list(mismatched['HS_Code']) == ['1002']
+        assert mismatched['Value_residual'].iloc[0] == -20.0
+
+        imports = report['totals'].loc['I']
+        assert imports['cumulative'] == 210.0
+        assert imports['previous'] == 180.0
+        assert imports['monthly'] == 50.0
+        assert imports['residual'] == -20.0
+        assert imports['dropped_negative_keys'] == 1
+        assert imports['dropped_negative_value'] == 20.0
+        assert imports['unwritten_keys'] == 0
+        assert report['totals'].loc['E', 'residual'] == 0.0
+
+    def test_residual_matches_written_rows(self, history, current):
+        monthly, report = reconcile(history, current)
+
+        for direction in ('I', 'E'):
+            written = monthly.loc[monthly['Direction'] == direction, 'Value'].sum()
+            assert report['totals'].loc[direction, 'monthly'] == written
+
+    def test_rows_dropped_by_validation_are_mismatches(self, history, current):
+        current['import'] = pd.concat([current['import'], pd.DataFrame({
+            'HS_Code': ['1003'], 'Country': [None], 'Value': [25.0], 'Quantity': [2.0],
+            'Unit': ['kg'], 'Revenue': [2.0]})], ignore_index=True)
+        monthly, report = reconcile(history, current, clean_monthly_data)
+
+        assert '1003' not in monthly['HS_Code'].tolist()
+        assert not report['balanced']
+        assert '1003' in report['mismatched']['HS_Code'].tolist()
+        imports = report['totals'].loc['I']
+        assert imports['unwritten_keys'] == 1
+        assert imports['unwritten_value'] == 25.0
+        assert imports['residual'] == 25.0 - 20.0
@@ -0,0 +1,74 @@
+"""Tests for the HS-level rollup cube."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade.hs_codes import normalize_hs_codes
+from data_pipeline.trade.history_index import write_history
+from data_pipeline.trade.rollups import (
+    UNCLASSIFIED_HS, aggregate_rollup, build_rollups, query_rollup, update_rollups
+)
+from data_pipeline.trade.store import history_fingerprint
+
+
+@pytest.fixture
+def history():
+    return pd.DataFrame({
+        'Year': [2081, 2081, 2081, 2081],
+        'Month': [4, 4, 5, 5],
+        'Direction': ['I', 'I', 'I', 'E'],
+        'HS_Code': [1012100, 1019000, 84713000, 1012100],
+        'Country': ['IN', 'IN', 'CN', 'US'],
+        'Value': [10.0, 5.0, 100.0, 7.0],
+        'Quantity': [1.0, 1.0, 2.0, 1.0],
+        'Revenue': [1.0, 0.5, 10.0, None]
+    })
+
+
+def test_normalize_restores_leading_zero():
+    codes = normalize_hs_codes(pd.Series([1012100, '84713000', '101.0', ' 0304 ']))
+    assert list(codes) == ['01012100', '84713000', '0101', '0304']
+
+
+class TestRollups:
+    """Test rollup aggregation, incremental updates and queries."""
+
+    def test_chapter_rollup(self, history):
+        rollup = aggregate_rollup(history, 2).set_index(['Month', 'Direction', 'HS', 'Country'])
+        assert rollup.loc[(4, 'I', '01', 'IN'), 'Value'] == 15.0
+        assert rollup.loc[(5, 'I', '84', 'CN'), 'Revenue'] == 10.0
+
+    def test_invalid_hs_codes_are_kept_unclassified(self, history):
+        rows = pd.concat([history, history.iloc[:2].assign(HS_Code=['Total', None])], ignore_index=True)
+        for level in (2, 4):
+            rollup = aggregate_rollup(rows, level)
+            assert rollup['Value'].sum() == pytest.approx(rows['Value'].sum())
+            unclassified = rollup[rollup['HS'] == UNCLASSIFIED_HS]
+            assert unclassified['Value'].sum() == pytest.approx(history.iloc[:2]['Value'].sum())
+
+    def test_update_replaces_written_month(self, history, tmp_path):
+        history_path = write_history(history, tmp_path / 'done.csv')
+        build_rollups(history_path, history)
+        before = {2081: history_fingerprint(history)}
+
+        monthly = pd.DataFrame({
+            'Year': [2081], 'Month': [5], 'Direction': ['I'], 'HS_Code': ['84713000'],
+            'Country': ['CN'], 'Value': [60.0], 'Quantity': [1.0], 'Revenue': [6.0]
+        })
+        updated = pd.concat([history[(history['Month'] != 5) | (history['Direction'] != 'I')], monthly])
+        write_history(updated, history_path)
+        update_rollups(history_path, history_path, monthly, before)
+
+        expected = aggregate_rollup(updated, 4)
+        result = query_rollup(history_path, 4)
+        pd.testing.assert_frame_equal(result[expected.columns].astype({'HS': str, 'Direction': str, 'Country': str}),
+                                      expected, check_dtype=False)
+
+    def test_stale_year_is_rebuilt(self, history, tmp_path):
+        history_path = write_history(history, tmp_path / 'done.csv')
+        build_rollups(history_path, history.iloc[:1])
+
+        monthly = history[history['Month'] == 5]
+        update_rollups(history_path, history_path, monthly, {2081: history_fingerprint(history)})
+
+        result = query_rollup(history_path, 2, years=[2081], hs_prefix='0')
+        assert result['Value'].sum() == 22.0
@@ -0,0 +1,124 @@
+"""Tests for the optional sparse HS x Country engine."""
+import pytest
+import pandas as pd
+
+pytest.importorskip('scipy')
+
+from data_pipeline.trade.calculator import (
+    calculate_previous_cumulatives,
+    calculate_monthly_combined,
+    advance_cumulative
+)
+from data_pipeline.trade.sparse_engine import (
+    Interner,
+    calculate_monthly_sparse,
+    difference_fiscal_year
+)
+
+
+def canonical(df):
+    """Row order differs between engines; compare sorted rows."""
+    return df.sort_values(['Direction', 'HS_Code', 'Country']).reset_index(drop=True)
+
+
+@pytest.fixture
+def history():
+    return pd.DataFrame({
+        'Direction': ['I', 'I', 'E', 'E', 'I'],
+        'HS_Code': ['1001', '1002', '1001', '2002', '1001'],
+        'Country': ['IN', 'CN', 'IN', 'US', 'IN'],
+        'Value': [100, 50, 30, 20, 10],
+        'Quantity': [10, 5, 3, 2, 1],
+        'Unit': ['kg', 'kg', 'pcs', 'pcs', 'kg'],
+        'Revenue': [10, 5, 0, 0, 1]
+    })
+
+
+@pytest.fixture
+def current():
+    imports = pd.DataFrame({
+        'HS_Code': ['1001', '1002', '1003', '1003'], 'Country': ['India', 'China', 'US', 'US'],
+        'Value': [200, 40, 70, 5], 'Quantity': [20, 4, 7, 1], 'Unit': ['kg', 'kg', None, 'kg'],
+        'Revenue': [30, 4, 7, 1]
+    })
+    exports = pd.DataFrame({
+        'HS_Code': ['1001', '2002'], 'Country': ['India', 'United States'],
+        'Value': [45, 20], 'Quantity': [4, 3], 'Unit': ['pcs', '']
+    })
+    return {'import': imports, 'export': exports}
+
+
+class TestInterner:
+    """Test append-only interning."""
+
+    def test_codes_are_stable(self):
+        interner = Interner()
+        first = interner.intern(['1001', '1002', '1001'])
+        second = interner.intern(['1003', '1002'])
+        assert list(first) == [0, 1, 0]
+        assert list(second) == [2, 1]
+        assert list(interner.decode(second)) == ['1003', '1002']
+
+
+class TestSparseEngine:
+    """Test the sparse engine against calculate_monthly_combined."""
+
+    def test_single_month_matches_combined(self, history, current):
+        previous = calculate_previous_cumulatives(history)
+        expected = calculate_monthly_combined(current, previous, 2081, 6)
+        result = calculate_monthly_sparse(current, previous, 2081, 6)
+
+        pd.testing.assert_frame_equal(canonical(result), canonical(expected), check_dtype=False)
+
+    def test_fiscal_year_matches_month_by_month(self, current):
+        later = {trade_type: df.assign(Value=df['Value'] * 2, Quantity=df['Quantity'] + 1)
+                 for trade_type, df in current.items()}
+        assert_matches_pandas({4: current, 5: later})
+
+    def test_downward_revision_matches_pandas(self):
+        def month(value):
+            return {'import': pd.DataFrame({'HS_Code': ['1001'], 'Country': ['India'], 'Value': [value],
+                                            'Quantity': [1], 'Unit': ['kg'], 'Revenue': [0]})}
+
+        result = assert_matches_pandas({4: month(100), 5: month(80), 6: month(120)})
+        assert result.loc[result['Month'] == 6, 'Value'].tolist() == [20], \
+            "Month 6 is the cumulative minus the rows kept so far (100)"
+
+    def test_missing_country_is_not_the_string_nan(self):
+        imports = pd.DataFrame({'HS_Code': ['1001', '1002'], 'Country': ['India', None],
+                                'Value': [10, 20], 'Quantity': [1, 2], 'Unit': ['kg', 'kg'], 'Revenue': [0, 0]})
+        result = assert_matches_pandas({4: {'import': imports}})
+        assert result['Country'].isna().sum() == 1
+        assert 'nan' not in result['Country'].tolist()
+
+    def test_leading_zero_codes_match_history_read_as_integers(self):
+        history = pd.DataFrame({'Direction': ['I'], 'HS_Code': [1012100], 'Country': ['IN'],
+                                'Value': [100], 'Quantity': [1], 'Unit': ['kg'], 'Revenue': [0]})
+        imports = pd.DataFrame({'HS_Code': ['01012100'], 'Country': ['India'], 'Value': [150],
+                                'Quantity': [2], 'Unit': ['kg'], 'Revenue': [0]})
+        previous = calculate_previous_cumulatives(history)
+        expected = calculate_monthly_combined({'import': imports}, previous, 2081, 5)
+        result = calculate_monthly_sparse({'import': imports}, previous, 2081, 5)
+
+        pd.testing.assert_frame_equal(canonical(result), canonical(expected), check_dtype=False)
+        assert result[['HS_Code', 'Value']].values.tolist() == [['01012100', 50]]
+
+
+def assert_matches_pandas(months):
+    """difference_fiscal_year against calculate_monthly_combined month by month."""
+    empty = pd.DataFrame(columns=['Direction'])
+    running = calculate_previous_cumulatives(empty)
+    expected = []
+    for month, cumulatives in months.items():
+        monthly = calculate_monthly_combined(cumulatives, running, 2082, month)
+        running = {t: advance_cumulative(running[t], monthly, t) for t in running}
+        expected.append(monthly)
+    expected = pd.concat(expected, ignore_index=True)
+
+    result = difference_fiscal_year(months, calculate_previous_cumulatives(empty), 2082)
+
+    for month in months:
+        pd.testing.assert_frame_equal(canonical(result[result['Month'] == month]),
+                                      canonical(expected[expected['Month'] == month]),
+                                      check_dtype=False)
+    return result
@@ -0,0 +1,131 @@
+"""Tests for trade cumulative snapshots."""
+import pytest
+import pandas as pd
+
+from data_pipeline.trade.calculator import calculate_previous_cumulative
+from data_pipeline.trade.csv_handler import filter_prev_data
+from data_pipeline.trade.store import (
+    combine_fingerprints,
+    direction_fingerprints,
+    fingerprints_match,
+    history_fingerprint,
+    invalidate_snapshots,
+    load_snapshot,
+    previous_cumulatives,
+    record_month,
+    save_snapshot,
+    snapshot_path
+)
+
+
+@pytest.fixture
+def history():
+    """Two fiscal months of import and export rows."""
+    return pd.DataFrame({
+        'Year': [2081] * 6,
+        'Month': [4, 4, 4, 5, 5, 5],
+        'Direction': ['I', 'I', 'E', 'I', 'I', 'E'],
+        'HS_Code': ['1001', '1002', '2001', '1001', '1003', '2001'],
+        'Country': ['IN', 'CN', 'US', 'IN', 'US', 'US'],
+        'Value': [100.0, 200.0, 50.0, 150.0, 75.0, 25.0],
+        'Quantity': [10.0, 20.0, 5.0, 15.0, 7.0, 2.0],
+        'Unit': ['kg'] * 6,
+        'Revenue': [50.0, 100.0, 0.0, 75.0, 37.0, 0.0]
+    })
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return tmp_path / 'done.csv'
+
+
+class TestSnapshots:
+    """Test snapshot storage and invalidation."""
+
+    def test_round_trip_requires_matching_fingerprint(self, history, history_path):
+        cumulative = calculate_previous_cumulative(history, 'import')
+        fingerprint = history_fingerprint(history[history['Direction'] == 'I'])
+        save_snapshot(history_path, 2081, 5, 'I', cumulative, fingerprint)
+
+        loaded = load_snapshot(history_path, 2081, 5, 'I', fingerprint)
+        pd.testing.assert_frame_equal(loaded, cumulative)
+        assert load_snapshot(history_path, 2081, 5, 'I', (fingerprint[0] + 1, *fingerprint[1:])) is None
+
+    def test_fingerprint_covers_keys_and_measures(self, history):
+        fingerprint = history_fingerprint(history)
+        for column, value in (('Country', 'DE'), ('HS_Code', '1009'), ('Quantity', 99.0),
+                              ('Unit', 'pcs'), ('Revenue', 1.0)):
+            edited = history.copy()
+            edited.loc[0, column] = value
+            assert not fingerprints_match(fingerprint, history_fingerprint(edited)), column
+
+    def test_fingerprint_survives_csv_round_trip(self, history, tmp_path):
+        history = history.assign(HS_Code=['0101'] + history['HS_Code'].tolist()[1:])
+        history.loc[history['Direction'] == 'E', 'Revenue'] = None
+        history.to_csv(tmp_path / 'round_trip.csv', index=False)
+
+        read_back = pd.read_csv(tmp_path / 'round_trip.csv')
+        assert fingerprints_match(history_fingerprint(history), history_fingerprint(read_back))
+        assert fingerprints_match(history_fingerprint(history.iloc[::-1]), history_fingerprint(history)), \
+            "Row order does not matter"
+
+    def test_direction_fingerprints_combine_to_the_whole(self, history):
+        by_direction = direction_fingerprints(history)
+        assert set(by_direction) == {'I', 'E'}
+        assert by_direction['E'] == history_fingerprint(history[history['Direction'] == 'E'])
+        assert fingerprints_match(combine_fingerprints(*by_direction.values()), history_fingerprint(history))
+
+    def test_invalidate_later_fiscal_months(self, history, history_path):
+        cumulative = calculate_previous_cumulative(history, 'import')
+        for month in (4, 12, 2):
+            save_snapshot(history_path, 2081, month, 'I', cumulative, (1, 1.0))
+        save_snapshot(history_path, 2081, 4, 'E', cumulative, (1, 1.0))
+
+        removed = invalidate_snapshots(history_path, 2081, 12, ['I'])
+
+        assert removed == 2
+        assert snapshot_path(history_path, 2081, 4, 'I').exists()
+        assert not snapshot_path(history_path, 2081, 2, 'I').exists()
+        assert snapshot_path(history_path, 2081, 4, 'E').exists()
+
+
+class TestPreviousCumulative:
+    """Test that snapshots replace re-aggregation of the history."""
+
+    def test_snapshot_matches_reaggregation(self, history, history_path):
+        month4 = filter_prev_data(history, 2081, 4)
+        previous = previous_cumulatives(history_path, month4, ['import'], 2081, 4)['import']
+        monthly = history[(history['Month'] == 5)]
+        record_month(history_path, 2081, 5, 'import', previous,
+                     history_fingerprint(month4[month4['Direction'] == 'I']), monthly)
+
+        upto5 = filter_prev_data(history, 2081, 5)
+        from_snapshot = previous_cumulatives(history_path, upto5, ['import'], 2081, 5)['import']
+        rebuilt = calculate_previous_cumulative(upto5, 'import')
+
+        assert snapshot_path(history_path, 2081, 5, 'I').exists()
+        assert load_snapshot(history_path, 2081, 5, 'I',
+                             history_fingerprint(upto5[upto5['Direction'] == 'I'])) is not None, \
+            "record_month's combined fingerprint matches the history through the month"
+        pd.testing.assert_frame_equal(from_snapshot.sort_values('_key').reset_index(drop=True),
+                                      rebuilt.sort_values('_key').reset_index(drop=True))
+
+    def test_changed_history_is_not_served_from_snapshot(self, history, history_path):
+        upto5 = filter_prev_data(history, 2081, 5)
+        previous_cumulatives(history_path, upto5, ['import', 'export'], 2081, 5)
+
+        edited = upto5.copy()
+        edited.loc[edited['HS_Code'] == '1003', 'Value'] = 1000.0
+        result = previous_cumulatives(history_path, edited, ['import', 'export'], 2081, 5)['import']
+
+        assert result.set_index('_key').loc['1003|US', 'Value'] == 1000.0
+
+    def test_edited_country_is_not_served_from_snapshot(self, history, history_path):
+        upto5 = filter_prev_data(history, 2081, 5)
+        previous_cumulatives(history_path, upto5, ['import'], 2081, 5)
+
+        edited = upto5.copy()
+        edited.loc[edited['HS_Code'] == '1003', 'Country'] = 'DE'
+        result = previous_cumulatives(history_path, edited, ['import'], 2081, 5)['import']
+
+        assert '1003|DE' in set(result['_key'])